@@ -0,0 +1,143 @@
+import importlib
+import inspect
+from typing import Callable, Dict, List
+
+# Line counts every synthetic generator is scaled to
+DEFAULT_SIZES = (10, 100, 1000, 10000, 50000)
+
+# Standard library modules used as the real-world part of the corpus
+REAL_WORLD_MODULES = ('textwrap', 'argparse', 'difflib', 'configparser')
+
+
+def _function_block(index: int) -> List[str]:
+    """A small typed function exercising assignments, loops and branches."""
+    return [
+        f"def compute_{index}(values: list, limit: int) -> int:",
+        "    total = 0",
+        "    for value in values:",
+        "        if value > limit:",
+        "            total = total + value * 2",
+        "        else:",
+        "            total = total - 1",
+        "    while total > 1000:",
+        "        total = total / 2",
+        "    return total",
+        "",
+    ]
+
+
+def _class_block(index: int) -> List[str]:
+    """A class with annotated fields, a constructor and special methods."""
+    return [
+        f"class Record{index}(Base, Mixin):",
+        "    name: str",
+        "    size: int",
+        "    def __init__(self, name: str, size: int):",
+        "        self.name = name",
+        "        self.size = size",
+        "    def __str__(self) -> str:",
+        "        label = \"record\"",
+        "        return label",
+        "    def grow(self, step: int = 1) -> None:",
+        "        extra = [1, 2, 3]",
+        "",
+    ]
+
+
+def _nested_block(index: int, depth: int = 40) -> List[str]:
+    """A function whose body nests if/for/while statements depth levels deep."""
+    lines = [f"def nested_{index}(items, flag):"]
+    for level in range(depth):
+        indent = "    " * (level + 1)
+        kind = level % 3
+        if kind == 0:
+            lines.append(f"{indent}if flag > {level}:")
+        elif kind == 1:
+            lines.append(f"{indent}for item_{level} in items:")
+        else:
+            lines.append(f"{indent}while flag < {level + 100}:")
+        lines.append(f"{indent}    value_{level} = {level}")
+    lines.append("")
+    return lines
+
+
+def _literal_block(index: int, entries: int = 40) -> List[str]:
+    """A large dict literal followed by a large list literal."""
+    lines = [f"TABLE_{index} = {{"]
+    lines.extend(f"    \"key_{i}\": {i}," for i in range(entries))
+    lines.append("}")
+    lines.append(f"VALUES_{index} = [")
+    lines.extend(f"    {i}," for i in range(entries))
+    lines.append("]")
+    lines.append("")
+    return lines
+
+
+def _build(block: Callable[[int], List[str]], lines: int) -> str:
+    """Repeats a block until the module reaches the requested line count."""
+    output: List[str] = []
+    index = 0
+    while len(output) < lines:
+        output.extend(block(index))
+        index += 1
+    return "\n".join(output) + "\n"
+
+
+SYNTHETIC_KINDS: Dict[str, Callable[[int], List[str]]] = {
+    'functions': _function_block,
+    'classes': _class_block,
+    'nested': _nested_block,
+    'literals': _literal_block,
+}
+
+
+def synthetic_module(kind: str, lines: int) -> str:
+    """
+    Builds a synthetic Python module of roughly the given size.
+
+    Modules smaller than a single block are padded with simple
+    assignments so that they still parse.
+
+    Args:
+        kind: One of SYNTHETIC_KINDS
+        lines: Target number of source lines
+
+    Returns:
+        Python source code
+    """
+    block = SYNTHETIC_KINDS[kind]
+    if lines < len(block(0)):
+        return "\n".join(f"value_{i} = {i}" for i in range(lines)) + "\n"
+    return _build(block, lines)
+
+
+def real_world_module(name: str) -> str:
+    """
+    Loads the source of a real standard library module.
+
+    Args:
+        name: Importable module name
+
+    Returns:
+        Python source code
+    """
+    return inspect.getsource(importlib.import_module(name))
+
+
+def build_corpus(sizes=DEFAULT_SIZES) -> Dict[str, str]:
+    """
+    Builds the full benchmark corpus.
+
+    Args:
+        sizes: Line counts for the synthetic modules
+
+    Returns:
+        Mapping of case name to Python source code, in a stable order
+    """
+    corpus: Dict[str, str] = {}
+    for kind in SYNTHETIC_KINDS:
+        for size in sizes:
+            corpus[f"{kind}-{size}"] = synthetic_module(kind, size)
+    for name in REAL_WORLD_MODULES:
+        corpus[f"stdlib-{name}"] = real_world_module(name)
+    return corpus
@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.corpus import DEFAULT_SIZES, build_corpus
+from src import __version__
+from src.java_generator.generator import JavaGenerator
+from src.python_analyzer.analyzer import PythonAnalyzer
+
+STAGES = ('analyze', 'generate', 'highlight', 'roundtrip')
+
+
+def _percentile(samples: List[float], percent: float) -> float:
+    """Nearest-rank percentile of a non-empty list of samples."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(percent / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def _measure(run: Callable[[], Any], repeat: int, lines: int) -> Dict[str, float]:
+    """
+    Times a stage and records its peak memory.
+
+    Memory is measured in a separate, untimed run because tracemalloc
+    slows down allocation-heavy code considerably.
+
+    Args:
+        run: Zero-argument callable executing the stage once
+        repeat: Number of timed runs
+        lines: Source lines processed per run, for throughput
+
+    Returns:
+        Latency percentiles in milliseconds, throughput and peak memory
+    """
+    run()  # Warm up caches and lazy imports
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    p50 = _percentile(samples, 50)
+    return {
+        'lines': lines,
+        'runs': repeat,
+        'p50_ms': p50 * 1000.0,
+        'p99_ms': _percentile(samples, 99) * 1000.0,
+        'mean_ms': sum(samples) / len(samples) * 1000.0,
+        'lines_per_sec': lines / p50 if p50 else 0.0,
+        'peak_kib': peak / 1024.0,
+    }
+
+
+def _web_client():
+    """Builds a Flask test client with the persistent cache disabled."""
+    os.environ.pop('TRANSLATION_CACHE_DIR', None)
+    from src.web_app import app, translation_cache
+    return app.test_client(), translation_cache
+
+
+def benchmark_case(source: str, stages, repeat: int, client=None, cache=None) -> Dict[str, Dict[str, float]]:
+    """
+    Benchmarks every requested stage on one source module.
+
+    Args:
+        source: Python source code
+        stages: Names of the stages to run
+        repeat: Number of timed runs per stage
+        client: Flask test client, required for the roundtrip stage
+        cache: The web app's translation cache, cleared before each request
+
+    Returns:
+        Mapping of stage name to its measurements
+    """
+    lines = source.count("\n") + 1
+    tree = PythonAnalyzer().parse(source)
+    java_code = JavaGenerator().generate(tree)
+    results = {}
+
+    if 'analyze' in stages:
+        results['analyze'] = _measure(lambda: PythonAnalyzer().analyze(source), repeat, lines)
+    if 'generate' in stages:
+        results['generate'] = _measure(lambda: JavaGenerator().generate(tree), repeat, lines)
+    if 'highlight' in stages:
+        from src.utils.highlighting import highlight_code
+
+        def run_highlight():
+            highlight_code(source, 'python')
+            highlight_code(java_code, 'java')
+
+        results['highlight'] = _measure(run_highlight, repeat, lines)
+    if 'roundtrip' in stages:
+        def run_roundtrip():
+            cache.clear()
+            response = client.post('/translate', json={'python_code': source})
+            if response.status_code != 200:
+                raise RuntimeError(response.get_json().get('message'))
+
+        results['roundtrip'] = _measure(run_roundtrip, repeat, lines)
+    return results
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compares two benchmark reports.
+
+    Args:
+        baseline: Previously saved report
+        current: Report of this run
+        threshold: Allowed relative slowdown of the p50 latency, e.g. 0.1
+
+    Returns:
+        Human-readable descriptions of every regression found
+    """
+    regressions = []
+    for case, stages in current['results'].items():
+        for stage, measurement in stages.items():
+            previous = baseline.get('results', {}).get(case, {}).get(stage)
+            if not previous or not previous['p50_ms']:
+                continue
+            ratio = measurement['p50_ms'] / previous['p50_ms']
+            if ratio > 1.0 + threshold:
+                regressions.append(
+                    f"{case}/{stage}: p50 {previous['p50_ms']:.2f} ms -> "
+                    f"{measurement['p50_ms']:.2f} ms ({(ratio - 1.0) * 100:+.0f}%)"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the benchmark suite from the command line.
+
+    Args:
+        argv: Command-line arguments, defaulting to sys.argv
+
+    Returns:
+        Process exit code: 1 when a comparison found regressions
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the Python to Java translator.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='line counts of the synthetic modules')
+    parser.add_argument('--cases', default=None,
+                        help='regular expression selecting case names, e.g. "nested|stdlib"')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help='stages to time')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per stage')
+    parser.add_argument('--save', default=None, help='write the results to this JSON file')
+    parser.add_argument('--compare', default=None, help='baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative p50 slowdown reported as a regression (default: 0.10)')
+    args = parser.parse_args(argv)
+
+    corpus = build_corpus(args.sizes)
+    if args.cases:
+        pattern = re.compile(args.cases)
+        corpus = {name: source for name, source in corpus.items() if pattern.search(name)}
+
+    client = cache = None
+    if 'roundtrip' in args.stages:
+        client, cache = _web_client()
+
+    report: Dict[str, Any] = {
+        'meta': {
+            'version': __version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'repeat': args.repeat,
+        },
+        'results': {},
+    }
+
+    print(f"{'case':<24}{'stage':<11}{'lines':>8}{'p50 ms':>11}{'p99 ms':>11}{'lines/s':>12}{'peak KiB':>11}")
+    for name, source in corpus.items():
+        results = benchmark_case(source, args.stages, args.repeat, client, cache)
+        report['results'][name] = results
+        for stage, m in results.items():
+            print(f"{name:<24}{stage:<11}{m['lines']:>8}{m['p50_ms']:>11.2f}{m['p99_ms']:>11.2f}"
+                  f"{m['lines_per_sec']:>12.0f}{m['peak_kib']:>11.0f}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
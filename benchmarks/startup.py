@@ -0,0 +1,160 @@
+"""
+Startup benchmark for the web app's worker processes
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+MODES = ('cold', 'preload')
+
+# Requests timed per worker after the first one, for the steady state
+_STEADY_REQUESTS = 20
+
+_SAMPLE = '''
+def mean(values: list) -> float:
+    total = 0.0
+    for value in values:
+        total += value
+    return total / len(values)
+
+class Greeter:
+    def __init__(self, name: str):
+        self.name = name
+
+    def greet(self) -> str:
+        return "Hello, " + self.name.upper()
+'''
+
+
+def _serve(client, cache) -> Dict[str, float]:
+    """
+    Times the first and following /translate requests of a worker.
+
+    Args:
+        client: Flask test client of the worker's app
+        cache: The app's translation cache, cleared before each request
+
+    Returns:
+        First-request latency and steady-state p50 in milliseconds
+    """
+    samples = []
+    for _ in range(_STEADY_REQUESTS + 1):
+        cache.clear()
+        start = time.perf_counter()
+        response = client.post('/translate', json={'python_code': _SAMPLE})
+        samples.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(response.get_json().get('message'))
+    return {
+        'first_ms': samples[0] * 1000.0,
+        'steady_p50_ms': statistics.median(samples[1:]) * 1000.0,
+    }
+
+
+def _worker(mode: str) -> Dict[str, float]:
+    """
+    Measures one worker start in this fresh interpreter.
+
+    ``cold`` imports the app and serves at once, like a worker without
+    preloading. ``preload`` imports and warms the app, then forks a
+    worker that starts its pools and serves, like gunicorn with
+    ``preload_app``; the import and warm-up are paid once by the master.
+
+    Args:
+        mode: One of MODES
+
+    Returns:
+        Import, warm-up and request latencies in milliseconds
+    """
+    os.environ.pop('TRANSLATION_CACHE_DIR', None)
+    start = time.perf_counter()
+    from src.web_app import app, translation_cache, warm_up, warm_worker
+    result = {'import_ms': (time.perf_counter() - start) * 1000.0, 'warm_up_ms': 0.0}
+    if mode == 'cold':
+        result.update(_serve(app.test_client(), translation_cache))
+        return result
+
+    start = time.perf_counter()
+    warm_up()
+    result['warm_up_ms'] = (time.perf_counter() - start) * 1000.0
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        warm_worker()
+        with os.fdopen(write_end, 'w') as pipe:
+            json.dump(_serve(app.test_client(), translation_cache), pipe)
+        os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as pipe:
+        result.update(json.load(pipe))
+    os.waitpid(pid, 0)
+    return result
+
+
+def benchmark_startup(mode: str, repeat: int) -> Dict[str, float]:
+    """
+    Starts workers in fresh interpreters and aggregates their latencies.
+
+    Args:
+        mode: One of MODES
+        repeat: Number of interpreters started
+
+    Returns:
+        Median of every measurement in milliseconds
+    """
+    runs: List[Dict[str, float]] = []
+    for _ in range(repeat):
+        worker = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup', '--worker', mode],
+            capture_output=True, text=True,
+        )
+        if worker.returncode != 0:
+            raise RuntimeError(f"{mode} worker failed:\n{worker.stderr}")
+        runs.append(json.loads(worker.stdout))
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the startup benchmark from the command line.
+
+    Args:
+        argv: Command-line arguments, defaulting to sys.argv
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description='Benchmark web worker startup.')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES),
+                        help='startup modes to measure')
+    parser.add_argument('--repeat', type=int, default=5, help='interpreters started per mode')
+    parser.add_argument('--save', default=None, help='write the results to this JSON file')
+    parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        json.dump(_worker(args.worker), sys.stdout)
+        return 0
+
+    report: Dict[str, Any] = {}
+    print(f"{'mode':<10}{'import ms':>11}{'warm-up ms':>12}{'first ms':>11}{'steady ms':>11}")
+    for mode in args.modes:
+        m = report[mode] = benchmark_startup(mode, args.repeat)
+        print(f"{mode:<10}{m['import_ms']:>11.1f}{m['warm_up_ms']:>12.1f}"
+              f"{m['first_ms']:>11.2f}{m['steady_p50_ms']:>11.2f}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.save}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,45 @@
+import gc
+import os
+
 bind = "0.0.0.0:10000"
 workers = 2
-threads = 4
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
 worker_class = "gthread"
-timeout = 120 
\ No newline at end of file
+timeout = 120
+
+# Import and warm the app once in the master, then fork warm workers;
+# GUNICORN_PRELOAD=0 warms each worker after it boots instead
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+
+def _size_pool(cfg):
+    # One pooled generator per request thread, taken from the resolved
+    # config so a --threads flag counts; TRANSLATOR_POOL_SIZE overrides it
+    from src.web_app import translator_pool
+
+    translator_pool.resize(int(os.environ.get("TRANSLATOR_POOL_SIZE", cfg.threads)))
+
+
+def _warm_up(log):
+    from src.web_app import warm_up
+
+    timings = warm_up()
+    log.info("Warm-up done: %s", timings.server_timing())
+
+
+def when_ready(server):
+    if preload_app:
+        _size_pool(server.cfg)
+        _warm_up(server.log)
+        # Keep the warmed objects out of collections so forked workers
+        # share their pages instead of copying them
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    from src.web_app import warm_worker
+
+    _size_pool(worker.cfg)
+    if not preload_app:
+        _warm_up(worker.log)
+    warm_worker()
@@ -12,4 +12,9 @@ setup(
         'pygments>=2.16.1',
         'astroid>=2.15.0',
     ],
+    entry_points={
+        'console_scripts': [
+            'py2java=src.cli:main',
+        ],
+    },
 ) 
\ No newline at end of file
@@ -1,3 +1,5 @@
 """
 Python to Java Translator package
-""" 
\ No newline at end of file
+"""
+
+__version__ = "0.1"
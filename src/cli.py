@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+from src.java_generator.generator import COMPREHENSION_MODES, DEFAULT_LITERAL_CHUNK
+from src.project_translator.translator import translate_project
+from src.utils.source_file import MAX_SOURCE_BYTES
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point translating Python files or projects to Java.
+    
+    Args:
+        argv: Command-line arguments, defaulting to sys.argv
+        
+    Returns:
+        Process exit code: 0 on success, 1 if any file failed
+    """
+    parser = argparse.ArgumentParser(
+        prog='py2java',
+        description='Translate Python modules or whole projects to Java.'
+    )
+    parser.add_argument('paths', nargs='+', help='Python files or directories to translate')
+    parser.add_argument('-o', '--output-dir', default='java_out',
+                        help='directory receiving one .java file per module (default: java_out)')
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of worker processes (default: CPU count)')
+    parser.add_argument('--report', default=None,
+                        help='path of the JSON semantic-differences report '
+                             '(default: OUTPUT_DIR/translation_report.json)')
+    parser.add_argument('--numeric', action='store_true',
+                        help='emit int[]/double[] and indexed loops for numeric lists')
+    parser.add_argument('--comprehensions', choices=COMPREHENSION_MODES, default='loops',
+                        help='translate comprehensions to fused loops or Stream pipelines (default: loops)')
+    parser.add_argument('--literal-chunk-size', type=int, default=DEFAULT_LITERAL_CHUNK, metavar='ENTRIES',
+                        help='entries of a module-level table filled per static initializer method '
+                             f'(default: {DEFAULT_LITERAL_CHUNK})')
+    parser.add_argument('--split', action='store_true',
+                        help='write one .java file per class plus a module functions class, '
+                             'in a directory per module')
+    parser.add_argument('--symbol-index', default=None, metavar='PATH',
+                        help='SQLite index of the symbols of every module, used with --split to resolve '
+                             'imports between modules (default: OUTPUT_DIR/symbol_index.sqlite3)')
+    parser.add_argument('--no-symbol-index', action='store_true',
+                        help='translate every module on its own, without a symbol index')
+    parser.add_argument('--differences-only', action='store_true',
+                        help='only write the semantic-differences report, without generating Java')
+    parser.add_argument('--max-file-size', type=int, default=MAX_SOURCE_BYTES, metavar='BYTES',
+                        help=f'skip modules larger than this, reporting them as failed (default: {MAX_SOURCE_BYTES})')
+    args = parser.parse_args(argv)
+    
+    symbol_index = None
+    if args.split and not args.no_symbol_index:
+        symbol_index = args.symbol_index or os.path.join(args.output_dir, 'symbol_index.sqlite3')
+    report = translate_project(args.paths, output_dir=args.output_dir,
+                               workers=args.workers, report_path=args.report,
+                               options={'optimize_numeric': args.numeric,
+                                        'comprehensions': args.comprehensions,
+                                        'literal_chunk_size': args.literal_chunk_size},
+                               max_source_bytes=args.max_file_size, split=args.split,
+                               differences_only=args.differences_only,
+                               symbol_index=symbol_index)
+    
+    for result in report['files']:
+        if result['error']:
+            print(f"error: {result['path']}: {result['error']}", file=sys.stderr)
+    summary = report['summary']
+    if args.differences_only:
+        print(f"Scanned {summary['translated']} of {summary['total']} modules "
+              f"({summary['failed']} failed), {len(report['semantic_differences'])} semantic differences")
+        return 1 if summary['failed'] else 0
+    print(f"Translated {summary['translated']} of {summary['total']} modules "
+          f"({summary['failed']} failed) into {args.output_dir}")
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
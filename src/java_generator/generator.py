@@ -1,62 +1,430 @@
-import ast
-from typing import Dict, List, Optional, Set
+import re
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from src.python_analyzer import ir
+from src.python_analyzer.type_inference import (
+    FUNCTION, INT, NONE, STR, UNKNOWN, ImportedSymbol, PyType, ScopeTypes, TypeInfo, element_type,
+    is_array_literal, join, string_append,
+)
+from src.utils.mapping_registry import MappingRegistry, get_registry
+from src.utils.pass_manager import PassManager
+
+# Imports every translation starts from
+_STANDARD_IMPORTS = ("import java.util.*;", "import java.util.Arrays;")
+
+# Imports required once the code opens files
+_FILE_IO_IMPORTS = (
+    "import java.io.*;",
+    "import java.nio.file.*;",
+    "import java.nio.charset.StandardCharsets;",
+)
+
+# Imports required once the code contains comprehensions
+_STREAM_IMPORTS = ("import java.util.stream.*;",)
+
+# Methods that may be translated to streams, whatever the receiver
+_STREAM_METHODS = frozenset({'join', 'union', 'intersection', 'difference'})
+
+# Builtins translated to stream collectors
+_STREAM_BUILTINS = frozenset({'sorted'})
+
+# Nodes that require the stream imports wherever they appear
+_COMPREHENSION_NODES = (ir.ListComp, ir.SetComp, ir.DictComp, ir.GeneratorExp)
+
+# Ways of translating comprehensions and generator expressions
+COMPREHENSION_MODES = ('loops', 'streams')
+
+# Comprehensions whose elements can be consumed one at a time while iterating
+_FUSABLE = (ir.GeneratorExp, ir.ListComp)
+
+# Reductions over a comprehension lowered to a loop, with the accumulator's initial value
+_LOOP_REDUCTIONS = {'sum': "0", 'any': "false", 'all': "true"}
+
+# Special methods with a Java counterpart of another name
+_SPECIAL_METHODS = {'__str__': 'toString', '__eq__': 'equals', '__len__': 'size'}
+
+# Dict methods whose Java equivalent is a live view, copied into this
+# collection type unless the result is only iterated
+_VIEW_METHODS = {('dict', 'keys'): 'set', ('dict', 'values'): 'list'}
+
+# Java functions combining an existing map value with an added one, by value type
+_MERGE_FUNCTIONS = {'int': "Integer::sum", 'float': "Double::sum", 'str': "String::concat"}
+
+# Most entries of a literal built with Map.of, List.of or Set.of; Map.of
+# takes at most ten pairs
+_SMALL_LITERAL = 10
+
+# Entries one static initializer method fills by default, far below the
+# JVM's limit of 64KB of bytecode per method
+DEFAULT_LITERAL_CHUNK = 1000
+
+# Interface and factory of read-only module tables small enough for a
+# single call, by Python collection type
+_IMMUTABLE_TABLES = {'list': ('List', "List.of"), 'set': ('Set', "Set.of"), 'dict': ('Map', "Map.of")}
+
+# Collection type of each literal node
+_LITERAL_TYPES = {ir.List: 'list', ir.Set: 'set', ir.Dict: 'dict'}
+
+
+# str.translate table quoting a Python string for a Java string literal. Control
+# characters use octal escapes, as Java decodes a \u000a escape before lexing the literal
+_JAVA_STRING_ESCAPES = {code: f"\\{code:03o}" for code in (*range(0x20), 0x7f)}
+_JAVA_STRING_ESCAPES.update({ord('"'): '\\"', ord('\\'): '\\\\', ord('\n'): '\\n', ord('\r'): '\\r',
+                             ord('\t'): '\\t', ord('\b'): '\\b', ord('\f'): '\\f'})
+_JAVA_STRING_ESCAPES.update({code: f"\\u{code:04x}" for code in range(0xd800, 0xe000)})
+
+
+def _java_string(value: str) -> str:
+    """Quotes a string as a Java string literal."""
+    return f'"{value.translate(_JAVA_STRING_ESCAPES)}"'
+
+
+def _is_constant(node: Optional[ir.Node]) -> bool:
+    """Whether an expression is a constant, possibly negated, with the same value at every evaluation."""
+    if isinstance(node, ir.UnaryOp):
+        node = node.operand
+    return isinstance(node, ir.Constant)
+
+
+def _int_literal(node: Optional[ir.Node]) -> Optional[int]:
+    """Returns the value of an integer literal, possibly negated, or None for any other expression."""
+    if isinstance(node, ir.UnaryOp) and isinstance(node.op, ir.USub):
+        value = _int_literal(node.operand)
+        return None if value is None else -value
+    if isinstance(node, ir.Constant) and type(node.value) is int:
+        return node.value
+    return None
+
+
+def _is_none(node: Optional[ir.Node]) -> bool:
+    """Whether an expression is the None constant."""
+    return isinstance(node, ir.Constant) and node.value is None
+
+
+def _builtin_import(name: str, java_import: Optional[str]) -> Optional[str]:
+    """Returns the import statement a mapped builtin needs beyond the wildcard imports, if any."""
+    if java_import is None:
+        return None
+    package = java_import.rpartition('.')[0]
+    if f"import {package}.*;" in _STANDARD_IMPORTS:
+        return None
+    if name in _STREAM_BUILTINS and f"import {package}.*;" in _STREAM_IMPORTS:
+        return None
+    return f"import {java_import};"
+
+
+def _map_capacity(entries: int) -> int:
+    """Initial capacity of a HashMap or HashSet holding entries without rehashing."""
+    return entries * 4 // 3 + 1
+
 
 class JavaGenerator:
     """
-    Generates Java code from Python AST.
+    Generates Java code from the Python IR (see src.python_analyzer.ir).
+    
+    A generator holds the state of the module being translated, so it
+    serves one translation at a time. Every translation starts from a
+    clean state, which lets a generator be reused for any number of
+    modules (see TranslatorPool) without one leaking into the next.
     """
     
-    def __init__(self):
+    def __init__(self, optimize_numeric: bool = False, comprehensions: str = 'loops',
+                 mappings: Optional[MappingRegistry] = None,
+                 literal_chunk_size: int = DEFAULT_LITERAL_CHUNK):
+        """
+        Args:
+            optimize_numeric: Emit int[]/double[] for numeric lists that are
+                never resized, with indexed loops for reductions over them
+            comprehensions: "loops" lowers comprehensions assigned, returned,
+                reduced or iterated by a statement to fused loops filling a
+                pre-sized collection; "streams" emits Stream pipelines. Other
+                comprehensions become Stream pipelines in both modes.
+            mappings: Type and operator mappings, the shared registry by default
+            literal_chunk_size: Most entries of a module-level table filled
+                by one static initializer method; larger tables are split
+                across several methods so none exceeds the JVM's size limit
+        """
+        if comprehensions not in COMPREHENSION_MODES:
+            raise ValueError(f"Unsupported comprehension mode: {comprehensions}")
+        if literal_chunk_size < 1:
+            raise ValueError(f"Literal chunk size must be positive: {literal_chunk_size}")
+        self.optimize_numeric = optimize_numeric
+        self.comprehensions = comprehensions
+        self.literal_chunk_size = literal_chunk_size
+        self.mappings = mappings or get_registry()
+        # Builtin name -> import statement, for mappings declaring an import
+        self._builtin_imports: Dict[str, str] = {}
+        for name, (_, java_import) in self.mappings.builtins.items():
+            statement = _builtin_import(name, java_import)
+            if statement is not None:
+                self._builtin_imports[name] = statement
+        # Import discovery, possibly sharing the analyzer's traversal
+        self._passes: Optional[PassManager] = None
+        self._uses_file_io = False
+        self._uses_streams = False
+        self._called_builtin_imports: Set[str] = set()
+        self._reset_state()
+        
+    def _reset_state(self) -> None:
+        """Clears everything a previous translation left behind, failed ones included."""
         self.indent_level = 0
         self.java_imports: Set[str] = set()
-        self.type_map = {
-            'int': 'int',
-            'float': 'double',
-            'str': 'String',
-            'bool': 'boolean',
-            'list': 'ArrayList',
-            'dict': 'HashMap',
-            'set': 'HashSet',
-            'tuple': 'List',
-        }
+        self._out: List[str] = []
+        self._types: Optional[TypeInfo] = None
+        self._scope: Optional[ScopeTypes] = None
+        self._top_level: Optional[ir.Node] = None
+        # Class being generated, and the module functions class when classes
+        # are generated as separate compilation units (see generate_unit)
+        self._class: Optional[ir.ClassDef] = None
+        self._module_class: Optional[str] = None
+        # Enclosing blocks and the variables already declared in each
+        self._blocks: List[Tuple[Optional[Sequence[ir.stmt]], Set[str]]] = []
+        # Numeric lists of the current function emitted as arrays, with their element type
+        self._arrays: Dict[str, str] = {}
+        # String accumulators of the current function emitted as StringBuilders
+        self._builders: FrozenSet[str] = frozenset()
+        self._temp_names: Set[str] = set()
+        # Comprehension variables renamed to avoid clashing with Java locals
+        self._renames: Dict[str, str] = {}
+        # Final copies of reassigned locals captured by the lambdas being
+        # generated, and all copies written for the current statement
+        self._captured: Dict[str, str] = {}
+        self._copies: Dict[str, str] = {}
         
-    def generate(self, tree: ast.AST, class_name: str = "PythonTranslated") -> str:
+    def register_passes(self, passes: PassManager) -> None:
+        """
+        Registers import discovery on a shared traversal, so that a tree
+        already walked by the analyzer is not walked again by generate().
+        
+        Args:
+            passes: The pass manager that will walk the tree
+        """
+        self._passes = passes
+        self._uses_file_io = False
+        self._uses_streams = False
+        self._called_builtin_imports = set()
+        passes.register(ir.With, self._discover_with_imports)
+        for node_type in _COMPREHENSION_NODES:
+            passes.register(node_type, self._discover_stream_imports)
+        passes.register(ir.Call, self._discover_call_imports)
+        if self._builtin_imports:
+            passes.register(ir.Call, self._discover_builtin_imports)
+        
+    def _discover_with_imports(self, node: ir.With) -> None:
+        """Record whether a with statement opens a file."""
+        context_expr = node.items[0].context_expr
+        if (isinstance(context_expr, ir.Call) and
+                isinstance(context_expr.func, ir.Name) and
+                context_expr.func.id == 'open'):
+            self._uses_file_io = True
+            self._passes.unregister(ir.With, self._discover_with_imports)
+        
+    def _discover_stream_imports(self, node: ir.Node) -> None:
+        """Record that the code contains a comprehension."""
+        self._found_streams()
+        
+    def _discover_call_imports(self, node: ir.Call) -> None:
+        """Record calls that may be translated to stream collectors."""
+        func = node.func
+        if (isinstance(func, ir.Name) and func.id in _STREAM_BUILTINS or
+                isinstance(func, ir.Attribute) and func.attr in _STREAM_METHODS):
+            self._found_streams()
+            
+    def _discover_builtin_imports(self, node: ir.Call) -> None:
+        """Record the imports declared by the mapped builtins the code calls."""
+        func = node.func
+        if isinstance(func, ir.Name) and func.id in self._builtin_imports:
+            self._called_builtin_imports.add(self._builtin_imports[func.id])
+            if len(self._called_builtin_imports) == len(set(self._builtin_imports.values())):
+                self._passes.unregister(ir.Call, self._discover_builtin_imports)
+            
+    def _found_streams(self) -> None:
+        """Record that stream imports are needed and stop looking for them."""
+        self._uses_streams = True
+        for node_type in _COMPREHENSION_NODES:
+            self._passes.unregister(node_type, self._discover_stream_imports)
+        self._passes.unregister(ir.Call, self._discover_call_imports)
+        
+    def generate(self, tree: ir.Node, class_name: str = "PythonTranslated") -> str:
         """
         Generates Java code from a Python AST.
         
         Args:
-            tree: The Python AST to convert
+            tree: The module IR built by PythonAnalyzer; an ast tree is
+                converted first
             class_name: Name of the Java class to generate
             
         Returns:
             String containing the equivalent Java code
         """
-        # Add standard imports
-        self.java_imports.add("import java.util.*;")
-        self.java_imports.add("import java.util.Arrays;")
+        return "".join(self.generate_iter(tree, class_name))
         
-        # Add file handling imports when needed
-        if any(isinstance(node, ast.With) and 
-               isinstance(node.items[0].context_expr, ast.Call) and 
-               isinstance(node.items[0].context_expr.func, ast.Name) and 
-               node.items[0].context_expr.func.id == 'open' 
-               for node in ast.walk(tree)):
-            self.java_imports.add("import java.io.*;")
-            self.java_imports.add("import java.nio.file.*;")
-            self.java_imports.add("import java.nio.charset.StandardCharsets;")
+    def infer_types(self, tree: ir.Node,
+                    imports: Optional[Mapping[str, ImportedSymbol]] = None) -> TypeInfo:
+        """
+        Runs type inference over a module for the definitions generated next.
         
+        Function bodies are only inferred once generated or referenced, so
+        callers regenerating a few definitions pay for those alone.
+        
+        Args:
+            tree: The Python AST of the whole module
+            imports: Symbols imported from other project modules, keyed by
+                local name; only generate_unit() refers to them by name
+            
+        Returns:
+            The inference results used for declarations and signatures
+        """
+        self._reset_state()
+        self._types = TypeInfo(ir.from_ast(tree), imports)
+        return self._types
+        
+    def generate_iter(self, tree: ir.Node, class_name: str = "PythonTranslated") -> Iterator[str]:
+        """
+        Generates Java code from a Python AST chunk by chunk.
+        
+        The imports and class header are yielded first, followed by one
+        chunk per top-level statement and finally the closing brace, so
+        callers can stream large translations without holding the whole
+        output.
+        
+        Args:
+            tree: The module IR built by PythonAnalyzer; an ast tree is
+                converted first
+            class_name: Name of the Java class to generate
+            
+        Yields:
+            Consecutive fragments of the Java code
+        """
         # Generate the Java class wrapper
-        java_code = self._generate_imports()
-        java_code += f"\npublic class {class_name} {{\n"
-        self.indent_level += 1
+        tree = ir.from_ast(tree)
+        self.infer_types(tree)
+        yield self.generate_header(self.discover_imports(tree), class_name)
         
-        # Convert the Python AST to Java code
-        for node in ast.iter_child_nodes(tree):
-            java_code += self._generate_from_ast(node)
+        # Convert the Python AST to Java code, one top-level node at a time
+        for node in ir.iter_child_nodes(tree):
+            chunk = self._generate_member(node)
+            if chunk:
+                yield chunk
         
-        self.indent_level -= 1
-        java_code += "}\n"
-        return java_code
+        yield "}\n"
+        
+    def discover_imports(self, tree: ir.Node) -> Set[str]:
+        """
+        Returns the imports required by a tree beyond the standard ones.
+        
+        A traversal shared through register_passes() is reused when it
+        already walked this tree; otherwise the tree is walked here.
+        
+        Args:
+            tree: The Python AST to inspect
+            
+        Returns:
+            Set of Java import statements
+        """
+        tree = ir.from_ast(tree)
+        if self._passes is None or self._passes.last_tree is not tree:
+            passes = PassManager()
+            self.register_passes(passes)
+            passes.run(tree)
+        
+        # Add file handling imports when needed
+        imports: Set[str] = set()
+        if self._uses_file_io:
+            imports.update(_FILE_IO_IMPORTS)
+        if self._uses_streams:
+            imports.update(_STREAM_IMPORTS)
+        imports.update(self._called_builtin_imports)
+        return imports
+        
+    def generate_header(self, imports: Set[str], class_name: str = "PythonTranslated") -> str:
+        """
+        Generates the import block and the opening of the wrapper class.
+        
+        Args:
+            imports: Imports required in addition to the standard ones
+            class_name: Name of the Java class to generate
+            
+        Returns:
+            String containing the imports and class declaration
+        """
+        self.java_imports = set(_STANDARD_IMPORTS) | imports
+        return self._generate_imports() + f"\npublic class {class_name} {{\n"
+        
+    def generate_definition(self, node: ir.Node) -> Tuple[str, Set[str]]:
+        """
+        Generates a single top-level statement as a member of the wrapper class.
+        
+        Types come from the last infer_types() call, which should cover the
+        module containing the node.
+        
+        Args:
+            node: A top-level statement of the module
+            
+        Returns:
+            Tuple of the Java code and the imports it requires
+        """
+        node = ir.from_ast(node)
+        imports = self.discover_imports(node)
+        return self._generate_member(node), imports
+        
+    def generate_unit(self, name: str, body: Sequence[ir.stmt], module_class: str) -> str:
+        """
+        Generates one compilation unit of a module split into several files.
+        
+        A unit holding a single class declares it as a top-level class.
+        Any other unit is the module functions class: its methods and
+        fields become static so that the classes can reach them as
+        ``module_class.name``. Each unit only imports what it uses. Types
+        come from the last infer_types() call, which should cover the
+        whole module.
+        
+        Args:
+            name: Name of the unit's public class
+            body: The top-level statements of the unit
+            module_class: Name of the module functions class
+            
+        Returns:
+            The Java source of the unit
+        """
+        self._module_class = module_class
+        try:
+            imports: Set[str] = set()
+            for node in body:
+                imports |= self.discover_imports(node)
+            if len(body) == 1 and isinstance(body[0], ir.ClassDef) and body[0].name == name:
+                self.java_imports = set(_STANDARD_IMPORTS) | imports
+                return self._generate_imports() + "\n" + self._generate_member(body[0], indent=0)
+            members = [self._generate_member(node) for node in body]
+            return self.generate_header(imports, name) + "".join(members) + "}\n"
+        finally:
+            self._module_class = None
+        
+    def _generate_member(self, node: ir.Node, indent: int = 1) -> str:
+        """
+        Generates a top-level statement at class member indentation.
+        
+        Args:
+            node: A top-level statement of the module
+            indent: Indentation level, 0 for a top-level class
+            
+        Returns:
+            String containing the Java code for the statement
+        """
+        if self._types is None:
+            self.infer_types(ir.Module(body=(node,), type_ignores=()))
+        self._out = []
+        self.indent_level = indent
+        self._scope = None
+        self._top_level = node
+        self._blocks = [(self._types.tree.body, set())]
+        self._renames = {}
+        self._generate_from_ast(node)
+        chunk = "".join(self._out)
+        self._out = []
+        self._blocks = []
+        self.indent_level = 0
+        return chunk
         
     def _generate_imports(self) -> str:
         """
@@ -67,96 +435,205 @@ class JavaGenerator:
         """
         return "\n".join(sorted(self.java_imports)) + "\n"
         
-    def _generate_from_ast(self, node: ast.AST) -> str:
+    def _generate_from_ast(self, node: ir.Node) -> None:
         """
-        Recursively generates Java code from a Python AST node.
+        Recursively generates Java code from a Python AST node into the
+        output buffer.
         
         Args:
             node: The AST node to convert
+        """
+        handler = self._STATEMENT_GENERATORS.get(type(node))
+        if handler is not None:
+            self._copies = {}
+            handler(self, node)
             
-        Returns:
-            String containing the equivalent Java code
+    def _generate_body(self, body: Sequence[ir.stmt], declared: Tuple[str, ...] = ()) -> None:
         """
-        if isinstance(node, ast.FunctionDef):
-            return self._generate_function(node)
-        elif isinstance(node, ast.ClassDef):
-            return self._generate_class(node)
-        elif isinstance(node, ast.Assign):
-            return self._generate_assignment(node)
-        elif isinstance(node, ast.If):
-            return self._generate_if_statement(node)
-        elif isinstance(node, ast.For):
-            return self._generate_for_loop(node)
-        elif isinstance(node, ast.While):
-            return self._generate_while_loop(node)
-        elif isinstance(node, ast.With):
-            return self._generate_with_statement(node)
-        return ""
+        Generates an indented block of statements into the output buffer.
         
-    def _generate_function(self, node: ast.FunctionDef) -> str:
+        Args:
+            body: The statements of the block
+            declared: Variables the block header already declares
+        """
+        self.indent_level += 1
+        self._blocks.append((body, set(declared)))
+        for stmt in body:
+            self._generate_from_ast(stmt)
+        self._blocks.pop()
+        self.indent_level -= 1
+        
+    def _write_line(self, line: str) -> None:
+        """
+        Appends one line at the current indentation to the output buffer.
+        
+        Args:
+            line: The Java source line without indentation or newline
+        """
+        self._out.append(f"{self._indent()}{line}\n")
+        
+    def _generate_function(self, node: ir.FunctionDef, name: Optional[str] = None) -> None:
         """
         Converts a Python function to Java method.
         
         Args:
             node: The function definition node
+            name: Java method name, defaulting to the Python function name
+        """
+        # Signature types come from annotations, defaults and the returned values
+        scope = self._types.function_scope(node, self._scope)
+        # Module functions are static when classes are separate units
+        static = self._module_class is not None and self._class is None and self._scope is None
+        outer = (self._scope, self._blocks, self._arrays, self._builders, self._temp_names, self._renames)
+        self._scope = scope
+        self._blocks = [(None, {arg for arg, _ in scope.params})]
+        self._arrays = self._function_arrays(scope) if self.optimize_numeric else {}
+        self._builders = self._types.string_builders(scope)
+        self._temp_names = set()
+        self._renames = {}
+        
+        return_type = "void" if scope.return_type == NONE else self._java_type(scope.return_type)
+        params = [f"{self._variable_type(arg, arg_type)} {arg}" for arg, arg_type in scope.params]
+        modifiers = "public static" if static else "public"
+        self._write_line(f"{modifiers} {return_type} {name or node.name}({', '.join(params)}) {{")
+        
+        # Convert function body in its own scope
+        self._generate_body(node.body)
+        self._scope, self._blocks, self._arrays, self._builders, self._temp_names, self._renames = outer
+        
+        self._write_line("}")
+        
+    def _java_type(self, py_type: PyType, boxed: bool = False) -> str:
+        """
+        Converts an inferred Python type to a Java type.
+        
+        Args:
+            py_type: The inferred type
+            boxed: Whether a wrapper class is required, e.g. in generics
             
         Returns:
-            String containing the Java method
-        """
-        # Extract return type annotation if available
-        return_type = "void"
-        if node.returns:
-            if isinstance(node.returns, ast.Name):
-                return_type = self.type_map.get(node.returns.id, "Object")
-        
-        # Build method signature
-        params = []
-        for arg in node.args.args:
-            arg_type = "Object"  # Default type
-            if arg.annotation and isinstance(arg.annotation, ast.Name):
-                arg_type = self.type_map.get(arg.annotation.id, "Object")
-            params.append(f"{arg_type} {arg.arg}")
-        
-        java_code = f"{self._indent()}public {return_type} {node.name}({', '.join(params)}) {{\n"
-        self.indent_level += 1
+            String containing the Java type
+        """
+        name = py_type.name
+        if name in ('list', 'set', 'dict'):
+            args = ", ".join(self._java_type(arg, boxed=True) for arg in py_type.args)
+            return f"{self.mappings.types[name]}<{args}>"
+        if name == 'tuple':
+            element = None
+            for arg in py_type.args:
+                element = join(element, arg)
+            return f"List<{self._java_type(element or UNKNOWN, boxed=True)}>"
+        if name == 'iterator':
+            return f"Iterable<{self._java_type(py_type.args[0], boxed=True)}>"
+        if name == 'items':
+            key, value = (self._java_type(arg, boxed=True) for arg in py_type.args)
+            return f"Set<Map.Entry<{key}, {value}>>"
+        java_type = self.mappings.types.get(name)
+        if java_type is not None and java_type != 'void':
+            return self.mappings.boxed.get(java_type, java_type) if boxed else java_type
+        if name in self._types.classes:
+            return self._imported_name(name) or name
+        return "Object"
         
-        # Convert function body
-        for stmt in node.body:
-            java_code += self._generate_from_ast(stmt)
+    def _imported_name(self, name: str) -> Optional[str]:
+        """
+        Returns the Java name of a class, function or variable imported
+        from another module, or None for names the module defines itself.
         
-        self.indent_level -= 1
-        java_code += f"{self._indent()}}}\n"
-        return java_code
+        Only compilation units reach other modules: there, classes are
+        top-level and module functions and variables are static members of
+        the defining module's functions class. In a single-class
+        translation they are instance members and inner classes, which
+        other modules cannot name, so None is returned as well.
+        """
+        symbol = self._types.imports.get(name)
+        if symbol is None or not self._module_class:
+            return None
+        if isinstance(symbol.stub, ir.ClassDef):
+            return symbol.name
+        return f"{symbol.unit_class}.{symbol.name}"
         
-    def _generate_if_statement(self, node: ast.If) -> str:
+    def _function_arrays(self, scope: ScopeTypes) -> Dict[str, str]:
         """
-        Converts a Python if statement to Java if statement.
+        Returns the numeric lists of a function that become primitive arrays.
         
         Args:
-            node: The if statement node
+            scope: The function's inference results
             
         Returns:
-            String containing the Java if statement
+            Mapping of variable name to the array's element type
         """
-        java_code = f"{self._indent()}if ({self._generate_expression(node.test)}) {{\n"
-        self.indent_level += 1
+        bindings = self._types.block_bindings(scope.node.body)
+        params = dict(scope.params)
+        return {
+            name: self._java_type(element_type(join(params.get(name), bindings.get(name))))
+            for name in self._types.array_variables(scope)
+        }
         
-        for stmt in node.body:
-            java_code += self._generate_from_ast(stmt)
+    def _variable_type(self, name: str, py_type: PyType) -> str:
+        """Returns the Java type of a variable, using arrays and StringBuilders where possible."""
+        if name in self._arrays:
+            return f"{self._arrays[name]}[]"
+        if name in self._builders:
+            return "StringBuilder"
+        return self._java_type(py_type)
         
-        self.indent_level -= 1
+    def _fresh_name(self, base: str) -> str:
+        """
+        Returns a variable name unused in the current function, for loop
+        indices the generator introduces.
+        """
+        taken = set(self._scope.env) if self._scope is not None else set()
+        name, suffix = base, 1
+        while name in taken or name in self._temp_names:
+            suffix += 1
+            name = f"{base}{suffix}"
+        self._temp_names.add(name)
+        return name
+        
+    def _declaration_type(self, name: str) -> Optional[str]:
+        """
+        Returns the Java type to declare a variable with at its first
+        assignment, or None when an enclosing block already declared it.
+        
+        Args:
+            name: The assigned variable
+            
+        Returns:
+            The declaration type, joined over all assignments in the block
+        """
+        for _, declared in self._blocks:
+            if name in declared:
+                return None
+        if self._scope is None:
+            # Module-level names are declared by their first top-level binding
+            first = self._types.module_first_binding.get(name)
+            if first is not None and first is not self._top_level:
+                return None
+        body, declared = self._blocks[-1]
+        declared.add(name)
+        declaration = self._variable_type(name, self._types.block_bindings(body).get(name, UNKNOWN))
+        if self._scope is None and self._module_class:
+            return f"static {declaration}"
+        return declaration
+        
+    def _generate_if_statement(self, node: ir.If) -> None:
+        """
+        Converts a Python if statement to Java if statement.
+        
+        Args:
+            node: The if statement node
+        """
+        self._write_line(f"if ({self._generate_expression(node.test)}) {{")
+        self._generate_body(node.body)
         
         if node.orelse:
-            java_code += f"{self._indent()}" + "} else {\n"
-            self.indent_level += 1
-            for stmt in node.orelse:
-                java_code += self._generate_from_ast(stmt)
-            self.indent_level -= 1
+            self._write_line("} else {")
+            self._generate_body(node.orelse)
         
-        java_code += f"{self._indent()}}}\n"
-        return java_code
+        self._write_line("}")
         
-    def _generate_expression(self, node: ast.AST) -> str:
+    def _generate_expression(self, node: ir.Node) -> str:
         """
         Converts a Python expression to Java expression.
         
@@ -166,85 +643,923 @@ class JavaGenerator:
         Returns:
             String containing the Java expression
         """
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Num):
-            return str(node.n)
-        elif isinstance(node, ast.Str):
-            return f'"{node.s}"'
-        elif isinstance(node, ast.List):
-            elements = [self._generate_expression(elt) for elt in node.elts]
-            self.java_imports.add("import java.util.ArrayList;")
-            return f"new ArrayList<>(Arrays.asList({', '.join(elements)}))"
-        elif isinstance(node, ast.Dict):
-            self.java_imports.add("import java.util.HashMap;")
-            java_code = "new HashMap<>() {{\n"
-            for key, value in zip(node.keys, node.values):
-                java_code += f"{self._indent()}    put({self._generate_expression(key)}, {self._generate_expression(value)});\n"
-            java_code += f"{self._indent()}}}"
-            return java_code
-        elif isinstance(node, ast.Compare):
-            # Handle comparison operators
-            ops = {
-                ast.Eq: "==",
-                ast.NotEq: "!=",
-                ast.Lt: "<",
-                ast.LtE: "<=",
-                ast.Gt: ">",
-                ast.GtE: ">=",
-            }
-            op = ops.get(type(node.ops[0]), "==")
-            return f"{self._generate_expression(node.left)} {op} {self._generate_expression(node.comparators[0])}"
-        elif isinstance(node, ast.BinOp):
-            # Handle binary operators
-            ops = {
-                ast.Add: "+",
-                ast.Sub: "-",
-                ast.Mult: "*",
-                ast.Div: "/",
-                ast.Mod: "%",
-            }
-            op = ops.get(type(node.op), "+")
-            return f"{self._generate_expression(node.left)} {op} {self._generate_expression(node.right)}"
-        elif isinstance(node, ast.Constant):
-            if isinstance(node.value, str):
-                return f'"{node.value}"'
-            elif isinstance(node.value, bool):
-                return str(node.value).lower()
-            return str(node.value)
+        handler = self._EXPRESSION_GENERATORS.get(type(node))
+        if handler is not None:
+            return handler(self, node)
         return "null"
         
-    def _generate_assignment(self, node: ast.Assign) -> str:
+    def _generate_name(self, node: ir.Name) -> str:
+        """Converts a Python name to a Java identifier, ``self`` becoming ``this``."""
+        if self._scope is not None and node.id == self._scope.receiver:
+            return "this"
+        if node.id in self._captured:
+            return self._captured[node.id]
+        if node.id in self._builders:
+            return f"{node.id}.toString()"
+        imported = self._types.imports.get(node.id)
+        if (imported is not None and isinstance(imported.stub, ir.AnnAssign)
+                and (self._scope is None or node.id not in self._scope.env)):
+            # Module variables of other modules live in their module functions class
+            return self._imported_name(node.id)
+        if (self._module_class and self._class is not None and self._scope is not None
+                and node.id not in self._scope.env and node.id in self._types.module.env
+                and node.id not in self._types.functions and node.id not in self._types.classes):
+            # Module variables live in the module functions class
+            return f"{self._module_class}.{node.id}"
+        return self._renames.get(node.id, node.id)
+        
+    def _generate_attribute(self, node: ir.Attribute) -> str:
+        """Converts attribute access, e.g. ``self.items`` to ``this.items``."""
+        value = self._generate_expression(node.value)
+        return "null" if value == "null" else f"{value}.{node.attr}"
+        
+    def _generate_constant(self, node: ir.Constant) -> str:
+        """Converts a Python literal constant to a Java literal."""
+        if isinstance(node.value, str):
+            return _java_string(node.value)
+        elif isinstance(node.value, bool):
+            return str(node.value).lower()
+        elif node.value is None:
+            return "null"
+        return str(node.value)
+        
+    def _generate_list_literal(self, node: ir.List) -> str:
+        """Converts a Python list literal to a Java ArrayList."""
+        elements = [self._generate_expression(elt) for elt in node.elts]
+        self.java_imports.add("import java.util.ArrayList;")
+        return f"new ArrayList<>(Arrays.asList({', '.join(elements)}))"
+        
+    def _generate_set_literal(self, node: ir.Set) -> str:
+        """Converts a Python set literal to a Java HashSet."""
+        elements, _ = self._literal_entries(node)
+        return f"new HashSet<>(Arrays.asList({', '.join(elements)}))"
+        
+    def _generate_dict_literal(self, node: ir.Dict) -> str:
+        """
+        Converts a Python dict literal to a Java HashMap copied from
+        Map.of, or from Map.ofEntries beyond ten entries. Assigned and
+        returned dicts that are larger, or that Map.of would reject, fill a
+        pre-sized map instead (see _write_dict_entries).
+        """
+        self.java_imports.add("import java.util.HashMap;")
+        entries, _ = self._literal_entries(node)
+        if not entries:
+            return "new HashMap<>()"
+        if len(entries) <= _SMALL_LITERAL:
+            return f"new HashMap<>(Map.of({', '.join(entries)}))"
+        return f"new HashMap<>(Map.ofEntries({', '.join(f'Map.entry({entry})' for entry in entries)}))"
+        
+    def _literal_entries(self, node: ir.Node) -> Tuple[List[str], bool]:
+        """
+        Generates the entries of a list, set or dict literal, e.g. ``"a", 1``
+        for a dict entry.
+        
+        Constant set elements and dict keys are de-duplicated, keeping the
+        first position and the last value as Python does, so that Set.of
+        and Map.of accept them.
+        
+        Args:
+            node: The literal
+            
+        Returns:
+            The entries, and whether List.of, Set.of or Map.of accept them:
+            no element or value is None, and set elements and dict keys are
+            constants
+        """
+        if isinstance(node, ir.Dict):
+            pairs = list(zip(node.keys, node.values))
+        else:
+            pairs = [(elt, None) for elt in node.elts]
+        keyed = not isinstance(node, ir.List)
+        entries: Dict[object, str] = {}
+        accepted = True
+        for index, (key, value) in enumerate(pairs):
+            entry = self._generate_expression(key) if key is not None else "null"
+            constant = _is_constant(key) and not _is_none(key)
+            accepted = accepted and (constant if keyed else not _is_none(key))
+            if isinstance(node, ir.Dict):
+                accepted = accepted and not _is_none(value)
+                identity = entry if constant else index
+                entry = f"{entry}, {self._generate_expression(value)}"
+            else:
+                identity = entry if keyed and constant else index
+            entries[identity] = entry
+        return list(entries.values()), accepted
+        
+    def _fills_dict(self, name: str, value: ir.Node) -> bool:
+        """Whether a dict assigned in a function is filled entry by entry rather than copied from Map.of."""
+        if self._scope is None or not isinstance(value, ir.Dict) or self._references(value, name):
+            return False
+        entries, accepted = self._literal_entries(value)
+        return len(entries) > _SMALL_LITERAL or not accepted
+        
+    def _write_dict_entries(self, name: str, node: ir.Dict, declaration: Optional[str]) -> None:
+        """
+        Writes a dict literal as a HashMap pre-sized for its entries and
+        filled with put(), which allows None values and keys that are only
+        known at run time.
+        
+        Args:
+            name: The assigned variable
+            node: The dict literal
+            declaration: Type to declare the variable with, None if declared
+        """
+        entries, _ = self._literal_entries(node)
+        prefix = f"{declaration} " if declaration else ""
+        self._write_line(f"{prefix}{name} = new HashMap<>({_map_capacity(len(entries))});")
+        for entry in entries:
+            self._write_line(f"{name}.put({entry});")
+        
+    def _write_static_table(self, name: str, node: ir.Node) -> None:
+        """
+        Writes a module variable bound to a constant literal as a static
+        final table (see TypeInfo.static_tables), so the literal is built
+        once per class instead of once per instance.
+        
+        A small read-only table is a single List.of, Set.of or Map.of
+        call. Any other table is pre-sized and filled by a static
+        initializer; beyond literal_chunk_size entries the initializer
+        calls one method per chunk, keeping each under the JVM's limit on
+        method size.
+        
+        Args:
+            name: The module variable
+            node: Its list, set or dict literal
+        """
+        java_type = self._declaration_type(name)
+        if java_type.startswith("static "):
+            java_type = java_type[len("static "):]
+        collection = _LITERAL_TYPES[type(node)]
+        entries, accepted = self._literal_entries(node)
+        if self._types.static_tables()[name] and accepted and len(entries) <= _SMALL_LITERAL:
+            interface, factory = _IMMUTABLE_TABLES[collection]
+            java_type = interface + java_type[java_type.index('<'):]
+            self._write_line(f"static final {java_type} {name} = {factory}({', '.join(entries)});")
+            return
+        
+        capacity = len(entries) if collection == 'list' else _map_capacity(len(entries))
+        self._write_line(f"static final {java_type} {name} = new {java_type[:java_type.index('<')]}<>({capacity});")
+        if not entries:
+            return
+        method = "put" if collection == 'dict' else "add"
+        chunks = [entries[start:start + self.literal_chunk_size]
+                  for start in range(0, len(entries), self.literal_chunk_size)]
+        self._write_line("static {")
+        if len(chunks) == 1:
+            for entry in chunks[0]:
+                self._write_line(f"    {name}.{method}({entry});")
+            self._write_line("}")
+            return
+        for index in range(len(chunks)):
+            self._write_line(f"    init{name}{index}();")
+        self._write_line("}")
+        for index, chunk in enumerate(chunks):
+            self._write_line(f"private static void init{name}{index}() {{")
+            for entry in chunk:
+                self._write_line(f"    {name}.{method}({entry});")
+            self._write_line("}")
+        
+    def _generate_compare(self, node: ir.Compare) -> str:
+        """Converts a Python comparison to a Java comparison."""
+        op = self.mappings.compare_operators.get(type(node.ops[0]), "==")
+        return f"{self._generate_expression(node.left)} {op} {self._generate_expression(node.comparators[0])}"
+        
+    def _generate_binary_operation(self, node: ir.BinOp) -> str:
+        """Converts a Python binary operation to a Java binary operation."""
+        op = self._operator_symbol(node.op)
+        return f"{self._generate_expression(node.left)} {op} {self._generate_expression(node.right)}"
+        
+    def _operator_symbol(self, op: ir.operator) -> str:
+        """Returns the Java symbol of a binary or augmented assignment operator."""
+        return self.mappings.binary_operators.get(type(op), "+")
+        
+    def _generate_unary_operation(self, node: ir.UnaryOp) -> str:
+        """Converts a Python unary operation to a Java unary operation."""
+        op = self.mappings.unary_operators.get(type(node.op), "")
+        return f"{op}{self._generate_expression(node.operand)}"
+        
+    def _generate_subscript(self, node: ir.Subscript) -> str:
+        """Converts indexing of an array, list, dict or string to Java."""
+        if isinstance(node.slice, ir.Slice):
+            return "null"
+        container = self._generate_expression(node.value)
+        if isinstance(node.value, ir.Name) and node.value.id in self._arrays:
+            return f"{container}[{self._generate_index(node.slice, f'{container}.length')}]"
+        container_type = self._types.expression_type(node.value).name
+        if container_type == 'list':
+            return f"{container}.get({self._generate_index(node.slice, f'{container}.size()')})"
+        if container_type == 'dict':
+            return f"{container}.get({self._generate_expression(node.slice)})"
+        if container_type == 'str':
+            return f"String.valueOf({container}.charAt({self._generate_index(node.slice, f'{container}.length()')}))"
+        return "null"
+        
+    def _generate_index(self, index: ir.Node, length: str) -> str:
+        """Converts a sequence index, counting negative constants from the end."""
+        if (isinstance(index, ir.UnaryOp) and isinstance(index.op, ir.USub)
+                and isinstance(index.operand, ir.Constant) and isinstance(index.operand.value, int)):
+            return f"{length} - {index.operand.value}"
+        return self._generate_expression(index)
+        
+    def _generate_call(self, node: ir.Call) -> str:
+        """
+        Converts a Python call to Java.
+        
+        Module functions and classes keep their names, with keyword
+        arguments and defaults placed by parameter position. Builtins go
+        through _BUILTIN_CALLS and the registry's builtin table, and method
+        calls are dispatched on the receiver's inferred type.
+        """
+        func = node.func
+        if isinstance(func, ir.Attribute):
+            return self._generate_method_call(node)
+        if not isinstance(func, ir.Name) or self._is_local_callable(func.id):
+            return "null"
+        name = func.id
+        if name in self._types.classes:
+            init = self._find_method(self._types.classes[name], '__init__')
+            args = self._call_arguments(init, node)
+            return "null" if args is None else f"new {self._imported_name(name) or name}({', '.join(args)})"
+        if name in self._types.functions:
+            args = self._call_arguments(self._types.functions[name], node)
+            if args is None:
+                return "null"
+            if name in self._types.imports:
+                name = self._imported_name(name)
+            elif self._module_class and self._class is not None:
+                name = f"{self._module_class}.{name}"
+            return f"{name}({', '.join(args)})"
+        if (name in ('sum', 'any', 'all', 'min', 'max') and len(node.args) == 1
+                and not node.keywords and isinstance(node.args[0], _FUSABLE)):
+            return self._generate_stream_reduction(name, node.args[0])
+        if len(node.args) == 1 and not node.keywords:
+            arg = node.args[0]
+            if isinstance(arg, ir.Name) and arg.id in self._arrays:
+                # Reductions over primitive arrays avoid boxing
+                if name == 'len':
+                    return f"{arg.id}.length"
+                if name == 'sum':
+                    return f"Arrays.stream({arg.id}).sum()"
+                if name in ('min', 'max'):
+                    getter = 'getAsDouble' if self._arrays[arg.id] == 'double' else 'getAsInt'
+                    return f"Arrays.stream({arg.id}).{name}().{getter}()"
+        if any(isinstance(arg, ir.Starred) for arg in node.args):
+            return "null"
+        translate = self._BUILTIN_CALLS.get(name)
+        if translate is not None:
+            return translate(self, node)
+        builtin = self.mappings.builtins.get(name)
+        if builtin is not None and not node.keywords:
+            args = ", ".join(self._generate_expression(arg) for arg in node.args)
+            return f"{builtin[0]}({args})"
+        return "null"
+        
+    def _is_local_callable(self, name: str) -> bool:
+        """Whether a called name is a local variable rather than a module definition or builtin."""
+        if self._scope is None:
+            return False
+        local = self._scope.env.get(name)
+        return local is not None and local != FUNCTION and local.name != 'class'
+        
+    @staticmethod
+    def _find_method(class_node: ir.ClassDef, name: str) -> Optional[ir.FunctionDef]:
+        """Returns the method of a class with the given name, if defined."""
+        for item in class_node.body:
+            if isinstance(item, ir.FunctionDef) and item.name == name:
+                return item
+        return None
+        
+    def _call_arguments(self, callee: Optional[ir.FunctionDef], node: ir.Call) -> Optional[List[str]]:
+        """
+        Generates the Java arguments of a call to a module function, method
+        or constructor.
+        
+        Java has no keyword arguments, so keywords and omitted defaults are
+        placed at their parameter's position. Numeric lists passed where the
+        callee takes a primitive array are converted.
+        
+        Args:
+            callee: The called definition, None for a class without __init__
+            node: The call
+            
+        Returns:
+            The argument expressions, or None when the call cannot be
+            expressed positionally
+        """
+        if any(isinstance(arg, ir.Starred) for arg in node.args):
+            return None
+        if callee is None:
+            return None if node.args or node.keywords else []
+        scope = self._types.function_scope(callee)
+        names = [name for name, _ in scope.params]
+        positional = callee.args.posonlyargs + callee.args.args
+        defaults = dict(zip([arg.arg for arg in positional[len(positional) - len(callee.args.defaults):]],
+                            callee.args.defaults))
+        values: List[Optional[ir.Node]] = list(node.args[:len(names)]) + [None] * (len(names) - len(node.args))
+        if len(node.args) > len(names):
+            return None
+        for keyword in node.keywords:
+            if keyword.arg not in names:
+                return None
+            values[names.index(keyword.arg)] = keyword.value
+        arrays = self._function_arrays(scope) if self.optimize_numeric else {}
+        args = []
+        for name, value in zip(names, values):
+            if value is None:
+                value = defaults.get(name)
+            if value is None:
+                args.append("null")
+            elif name in arrays:
+                args.append(self._array_argument(value, arrays[name]))
+            else:
+                args.append(self._generate_expression(value))
+        return args
+        
+    def _array_argument(self, value: ir.Node, element: str) -> str:
+        """Generates an argument passed where the callee takes a primitive array."""
+        if isinstance(value, ir.Name) and value.id in self._arrays:
+            return value.id
+        if isinstance(value, ir.List) and is_array_literal(value):
+            return f"new {element}[]{{{', '.join(self._generate_expression(elt) for elt in value.elts)}}}"
+        wrapper = self.mappings.boxed.get(element, element)
+        stream = 'mapToDouble' if element == 'double' else 'mapToInt'
+        return f"{self._generate_expression(value)}.stream().{stream}({wrapper}::{element}Value).toArray()"
+        
+    def _generate_method_call(self, node: ir.Call) -> str:
+        """
+        Converts a method call, dispatching on the receiver's inferred type.
+        
+        (type, method) pairs with a dedicated translation in _METHOD_CALLS
+        come first unless a mapping plugin maps them, then methods of module
+        classes, then the registry's (type, method) table. Calls on
+        receivers of unknown type are kept as they are.
+        """
+        func = node.func
+        receiver = self._generate_expression(func.value)
+        if receiver == "null":
+            return "null"
+        receiver_type = self._types.expression_type(func.value)
+        type_name = 'list' if receiver_type.name == 'tuple' else receiver_type.name
+        pair = (type_name, func.attr)
+        translate = None if pair in self.mappings.plugin_methods else self._METHOD_CALLS.get(pair)
+        if translate is not None:
+            return translate(self, receiver, node, receiver_type)
+        if type_name in self._types.classes:
+            method = self._find_method(self._types.classes[type_name], func.attr)
+            args = self._call_arguments(method, node) if method is not None else None
+            if args is None:
+                return "null"
+            return f"{receiver}.{_SPECIAL_METHODS.get(func.attr, func.attr)}({', '.join(args)})"
+        if node.keywords or any(isinstance(arg, ir.Starred) for arg in node.args):
+            return "null"
+        java_method = self.mappings.method_calls.get(pair)
+        if java_method is None:
+            if type_name in self.mappings.collection_methods:
+                return "null"  # A builtin type's method without a Java mapping
+            java_method = func.attr
+        args = [self._generate_expression(arg) for arg in node.args]
+        if "." in java_method:
+            return f"{java_method}({', '.join([receiver] + args)})"
+        return f"{receiver}.{java_method}({', '.join(args)})"
+        
+    def _generate_iterated(self, node: ir.Node) -> str:
+        """Generates an expression that is only iterated, using views instead of copies."""
+        if (isinstance(node, ir.Call) and isinstance(node.func, ir.Attribute) and not node.args
+                and (self._types.expression_type(node.func.value).name, node.func.attr) in _VIEW_METHODS):
+            receiver = self._generate_expression(node.func.value)
+            return f"{receiver}.{self.mappings.method_calls[('dict', node.func.attr)]}()"
+        return self._generate_expression(node)
+        
+    # ------------------------------------------------------------------
+    # Builtin translations, see _BUILTIN_CALLS
+    
+    def _call_print(self, node: ir.Call) -> str:
+        """Converts print() to System.out.println, or System.out.print with ``end=""``."""
+        keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+        separator = keywords.pop('sep', ir.Constant(value=" "))
+        end = keywords.pop('end', None)
+        if keywords or not isinstance(separator, ir.Constant) or not isinstance(separator.value, str):
+            return "null"
+        method = self.mappings.builtins['print'][0]
+        if end is not None:
+            if not (isinstance(end, ir.Constant) and end.value == ""):
+                return "null"
+            method = method.replace("println", "print")
+        parts = [self._operand(arg) for arg in node.args]
+        if "null" in parts:
+            return "null"  # An argument that could not be translated
+        if len(parts) <= 1:
+            return f"{method}({''.join(self._generate_expression(arg) for arg in node.args)})"
+        if separator.value:
+            return f"{method}({f' + {self._generate_constant(separator)} + '.join(parts)})"
+        return f"{method}(\"\" + {' + '.join(parts)})"
+        
+    def _call_len(self, node: ir.Call) -> str:
+        """Converts len() of a string or collection."""
+        if len(node.args) != 1 or node.keywords:
+            return "null"
+        arg = node.args[0]
+        if isinstance(arg, (ir.ListComp, ir.SetComp)) and all(
+                self._can_stream(generator) for generator in arg.generators):
+            # Count the elements instead of collecting them
+            pipeline = self._stream_pipeline(arg.generators, lambda: self._generate_expression(arg.elt),
+                                             node=arg)
+            distinct = ".distinct()" if isinstance(arg, ir.SetComp) else ""
+            return f"(int) {pipeline}{distinct}.count()"
+        value = self._generate_expression(arg)
+        if self._types.expression_type(arg).name == 'str':
+            return f"{value}.length()"
+        return f"{value}.{self.mappings.builtins['len'][0]}"
+        
+    def _call_conversion(self, node: ir.Call) -> str:
+        """Converts str(), int() and float() according to the argument's type."""
+        name = node.func.id
+        if len(node.args) != 1 or node.keywords:
+            return "null"
+        arg_type = self._types.expression_type(node.args[0]).name
+        value = self._generate_expression(node.args[0])
+        if arg_type == name:
+            return value
+        if name != 'str' and arg_type in ('int', 'float'):
+            return f"({self.mappings.types[name]}) {self._operand(node.args[0])}"
+        return f"{self.mappings.builtins[name][0]}({value})"
+        
+    def _call_min_max(self, node: ir.Call) -> str:
+        """Converts min()/max() of a collection or of several values."""
+        name = node.func.id
+        if node.keywords or not node.args:
+            return "null"
+        if len(node.args) == 1:
+            if self._types.expression_type(node.args[0]).name not in ('list', 'set', 'dict', 'tuple'):
+                return "null"
+            return f"{self.mappings.builtins[name][0]}({self._iterable_expression(node.args[0])})"
+        args = [self._generate_expression(arg) for arg in node.args]
+        result = args[-1]
+        for arg in reversed(args[:-1]):
+            result = f"Math.{name}({arg}, {result})"
+        return result
+        
+    def _call_sum(self, node: ir.Call) -> str:
+        """Converts sum() of a numeric collection."""
+        if len(node.args) != 1 or node.keywords or self._types.expression_type(node.args[0]).name not in (
+                'list', 'set', 'dict', 'tuple'):
+            return "null"
+        collection = self._iterable_expression(node.args[0])
+        if element_type(self._types.expression_type(node.args[0])).name == 'float':
+            return f"{collection}.stream().mapToDouble(Double::doubleValue).sum()"
+        return f"{collection}.{self.mappings.builtins['sum'][0]}"
+        
+    def _call_sorted(self, node: ir.Call) -> str:
+        """Converts sorted() of a collection, optionally in reverse order."""
+        keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+        reverse = keywords.pop('reverse', None)
+        if len(node.args) != 1 or keywords or self._types.expression_type(node.args[0]).name not in (
+                'list', 'set', 'dict', 'tuple'):
+            return "null"
+        collection = self._iterable_expression(node.args[0])
+        if reverse is None or (isinstance(reverse, ir.Constant) and reverse.value is False):
+            return f"{collection}.{self.mappings.builtins['sorted'][0]}"
+        if isinstance(reverse, ir.Constant) and reverse.value is True:
+            return (f"{collection}.stream().sorted(Comparator.reverseOrder())"
+                    f".collect(Collectors.toCollection(ArrayList::new))")
+        return "null"
+        
+    def _call_collection(self, node: ir.Call) -> str:
+        """Converts list(), set() and dict() to an empty or copied collection."""
+        name = node.func.id
+        constructor = self.mappings.builtins[name][0]
+        if node.keywords or len(node.args) > 1:
+            return "null"
+        if not node.args:
+            return f"{constructor}<>()"
+        arg_type = self._types.expression_type(node.args[0]).name
+        if name == 'dict' and arg_type != 'dict':
+            return "null"
+        if arg_type not in ('list', 'set', 'dict', 'tuple'):
+            return "null"
+        source = self._generate_expression(node.args[0]) if name == 'dict' else self._iterable_expression(node.args[0])
+        return f"{constructor}<>({source})"
+        
+    # ------------------------------------------------------------------
+    # Method translations, see _METHOD_CALLS. Each receives the generated
+    # receiver, the call and the receiver's inferred type.
+    
+    def _call_list_pop(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """Converts list.pop() and list.pop(i)."""
+        if node.keywords or len(node.args) > 1:
+            return "null"
+        index = (self._generate_index(node.args[0], f"{receiver}.size()") if node.args
+                 else f"{receiver}.size() - 1")
+        return f"{receiver}.remove({index})"
+        
+    def _call_list_remove(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """Converts list.remove(x), which removes by value rather than index."""
+        if node.keywords or len(node.args) != 1:
+            return "null"
+        value = self._generate_expression(node.args[0])
+        if element_type(receiver_type).name == 'int':
+            value = f"(Integer) {self._operand(node.args[0])}"
+        return f"{receiver}.remove({value})"
+        
+    def _call_list_sort(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """Converts list.sort(), optionally in reverse order."""
+        keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+        reverse = keywords.pop('reverse', None)
+        if node.args or keywords:
+            return "null"
+        if reverse is None or (isinstance(reverse, ir.Constant) and reverse.value is False):
+            return f"{receiver}.sort(null)"
+        if isinstance(reverse, ir.Constant) and reverse.value is True:
+            return f"{receiver}.sort(Comparator.reverseOrder())"
+        return "null"
+        
+    def _call_copy(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """Converts copy() of a list, set or dict."""
+        if node.args or node.keywords:
+            return "null"
+        collection = 'list' if receiver_type.name == 'tuple' else receiver_type.name
+        return f"new {self.mappings.types[collection]}<>({receiver})"
+        
+    def _call_dict_get(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """Converts dict.get(k) and dict.get(k, default)."""
+        if node.keywords or len(node.args) not in (1, 2):
+            return "null"
+        args = ", ".join(self._generate_expression(arg) for arg in node.args)
+        method = self.mappings.method_calls[('dict', 'get')] if len(node.args) == 1 else "getOrDefault"
+        return f"{receiver}.{method}({args})"
+        
+    def _call_dict_pop(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """Converts dict.pop(k) and dict.pop(k, default)."""
+        if node.keywords or len(node.args) not in (1, 2):
+            return "null"
+        removed = f"{receiver}.{self.mappings.method_calls[('dict', 'pop')]}({self._generate_expression(node.args[0])})"
+        if len(node.args) == 1:
+            return removed
+        return f"Objects.requireNonNullElse({removed}, {self._generate_expression(node.args[1])})"
+        
+    def _call_dict_setdefault(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """Converts dict.setdefault(k, default) to computeIfAbsent."""
+        if node.keywords or len(node.args) != 2:
+            return "null"
+        key, default = (self._generate_expression(arg) for arg in node.args)
+        unused = self._fresh_name('key')
+        return f"{receiver}.computeIfAbsent({key}, {unused} -> {default})"
+        
+    def _call_dict_view(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """Converts dict.keys()/values() outside loops to a copied collection."""
+        if node.args or node.keywords:
+            return "null"
+        copy = self.mappings.types[_VIEW_METHODS[('dict', node.func.attr)]]
+        return f"new {copy}<>({receiver}.{self.mappings.method_calls[('dict', node.func.attr)]}())"
+        
+    def _call_set_operation(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """
+        Converts union/intersection/difference, which return a new set, to
+        a stream collected into one. Every operand is evaluated once, where
+        the call is, and no subclass capturing the enclosing instance is
+        created.
+        """
+        if node.keywords or not node.args:
+            return "null"
+        others = []
+        for arg in node.args:
+            other = self._generate_expression(arg)
+            if other == "null":
+                return "null"
+            others.append(f"{other}.keySet()" if self._types.expression_type(arg).name == 'dict' else other)
+        collect = f".collect(Collectors.toCollection({self.mappings.types['set']}::new))"
+        if node.func.attr == 'union':
+            if len(others) == 1:
+                return f"Stream.concat({receiver}.stream(), {others[0]}.stream()){collect}"
+            return f"Stream.of({', '.join([receiver] + others)}).flatMap(Collection::stream){collect}"
+        if node.func.attr == 'intersection':
+            filters = "".join(f".filter({other}::contains)" for other in others)
+        else:
+            filters = "".join(f".filter(java.util.function.Predicate.not({other}::contains))" for other in others)
+        return f"{receiver}.stream(){filters}{collect}"
+        
+    def _call_str_split(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """Converts str.split() and str.split(separator) to a list of strings."""
+        if node.keywords or len(node.args) > 1:
+            return "null"
+        if not node.args or (isinstance(node.args[0], ir.Constant) and node.args[0].value is None):
+            parts = f'{receiver}.strip().split("\\\\s+")'
+        else:
+            separator = node.args[0]
+            pattern = self._generate_expression(separator)
+            if not (isinstance(separator, ir.Constant) and isinstance(separator.value, str)
+                    and re.escape(separator.value) == separator.value):
+                pattern = f"java.util.regex.Pattern.quote({pattern})"
+            parts = f"{receiver}.split({pattern}, -1)"
+        return f"new ArrayList<>(Arrays.asList({parts}))"
+        
+    def _call_str_join(self, receiver: str, node: ir.Call, receiver_type: PyType) -> str:
+        """
+        Converts sep.join(strings) to String.join, or to a stream collected
+        with Collectors.joining for comprehensions and non-string elements.
+        """
+        if node.keywords or len(node.args) != 1:
+            return "null"
+        arg = node.args[0]
+        if isinstance(arg, (ir.ListComp, ir.SetComp, ir.GeneratorExp)):
+            if not all(self._can_stream(generator) for generator in arg.generators):
+                return "null"
+            pipeline = self._stream_pipeline(arg.generators, lambda: self._generate_expression(arg.elt),
+                                             node=arg)
+            if self._types.expression_type(arg.elt) != STR:
+                pipeline += ".map(String::valueOf)"
+            return f"{pipeline}.collect(Collectors.joining({receiver}))"
+        iterable_type = self._types.expression_type(arg)
+        if iterable_type.name == 'str' or (isinstance(arg, ir.Name) and arg.id in self._arrays):
+            return "null"
+        iterable = self._iterable_expression(arg)
+        if iterable == "null":
+            return "null"
+        if element_type(iterable_type) == STR:
+            return f"String.join({receiver}, {iterable})"
+        if iterable_type.name in ('list', 'set', 'tuple', 'dict'):
+            return f"{iterable}.stream().map(String::valueOf).collect(Collectors.joining({receiver}))"
+        return "null"
+        
+    def _operand(self, node: ir.Node) -> str:
+        """Generates an expression used as an operand, parenthesized when compound."""
+        expression = self._generate_expression(node)
+        if isinstance(node, (ir.BinOp, ir.BoolOp, ir.Compare, ir.IfExp)):
+            return f"({expression})"
+        return expression
+        
+    def _array_sum_operand(self, node: ir.Node) -> Optional[str]:
+        """Returns the array summed by ``sum(array)``, if node is such a call."""
+        if (self._arrays and isinstance(node, ir.Call) and isinstance(node.func, ir.Name)
+                and node.func.id == 'sum' and 'sum' not in self._types.functions
+                and len(node.args) == 1 and not node.keywords
+                and isinstance(node.args[0], ir.Name) and node.args[0].id in self._arrays):
+            return node.args[0].id
+        return None
+        
+    def _write_array_sum(self, target: str, array: str) -> None:
+        """Writes ``target += sum(array)`` as an indexed loop."""
+        index = self._fresh_name('i')
+        self._write_line(f"for (int {index} = 0; {index} < {array}.length; {index}++) {{")
+        self._write_line(f"    {target} += {array}[{index}];")
+        self._write_line("}")
+        
+    def _generate_assignment(self, node: ir.Assign) -> None:
         """
         Converts a Python assignment statement to Java.
         
+        The first assignment in a block declares the variable with the type
+        inferred for all of the block's assignments; later ones assign it.
+        
         Args:
             node: The assignment node
+        """
+        appended = string_append(node)
+        if appended is not None and appended[0] in self._builders:
+            self._write_append(*appended)
+            return
+        if self._is_static_table(node.targets[0]):
+            self._write_static_table(node.targets[0].id, node.value)
+            return
+        for target in node.targets:
+            if isinstance(target, ir.Name):
+                array = self._array_sum_operand(node.value)
+                comprehension = self._lowered_comprehension(node.value)
+                reduced = self._lowered_reduction(node.value)
+                if array is not None:
+                    self._write_assignment(target.id, "0")
+                    self._write_array_sum(target.id, array)
+                elif comprehension is not None and not self._references(comprehension, target.id):
+                    self._write_collection_loops(target.id, comprehension, self._declaration_type(target.id))
+                elif reduced is not None and not self._references(reduced, target.id):
+                    self._write_reduction_loops(target.id, node.value, self._declaration_type(target.id))
+                elif self._fills_dict(target.id, node.value):
+                    self._write_dict_entries(target.id, node.value, self._declaration_type(target.id))
+                else:
+                    self._write_assignment(target.id, self._generate_value(target.id, node.value))
+            elif isinstance(target, ir.Subscript):
+                merge = self._dict_merge(target, node.value)
+                if merge is not None:
+                    self._write_line(f"{merge};")
+                else:
+                    self._write_subscript_store(target, self._generate_expression(node.value))
+            elif isinstance(target, ir.Attribute):
+                self._write_line(f"{self._generate_attribute(target)} = {self._generate_expression(node.value)};")
+        
+    def _dict_merge(self, target: ir.Subscript, value: ir.Node) -> Optional[str]:
+        """
+        Compiles ``d[k] = d.get(k, 0) + v`` (or ``v + d.get(k, 0)`` for
+        numbers, ``""`` as the default for strings) to a single
+        ``d.merge(k, v, Integer::sum)`` instead of a lookup followed by a put.
+        
+        Args:
+            target: The assigned dict entry
+            value: The assigned expression
             
         Returns:
-            String containing the Java assignment
+            The merge call, or None when the assignment is not this idiom
         """
-        java_code = ""
-        for target in node.targets:
-            if isinstance(target, ast.Name):
-                # Try to infer type from the value
-                value_type = "Object"
-                if isinstance(node.value, ast.Num):
-                    if isinstance(node.value.n, int):
-                        value_type = "int"
-                    else:
-                        value_type = "double"
-                elif isinstance(node.value, ast.Str):
-                    value_type = "String"
-                elif isinstance(node.value, ast.List):
-                    value_type = "ArrayList<Object>"
-                    self.java_imports.add("import java.util.ArrayList;")
-                elif isinstance(node.value, ast.Dict):
-                    value_type = "HashMap<Object, Object>"
-                    self.java_imports.add("import java.util.HashMap;")
-                
-                java_code += f"{self._indent()}{value_type} {target.id} = {self._generate_expression(node.value)};\n"
-        return java_code
+        if not (isinstance(target.value, ir.Name) and isinstance(value, ir.BinOp)
+                and isinstance(value.op, ir.Add) and not isinstance(target.slice, ir.Slice)):
+            return None
+        container = target.value.id
+        key = ir.dumps(target.slice)
+        for lookup, added in ((value.left, value.right), (value.right, value.left)):
+            if not (isinstance(lookup, ir.Call) and isinstance(lookup.func, ir.Attribute)
+                    and lookup.func.attr == 'get' and isinstance(lookup.func.value, ir.Name)
+                    and lookup.func.value.id == container and len(lookup.args) == 2
+                    and not lookup.keywords and ir.dumps(lookup.args[0]) == key):
+                continue
+            default = lookup.args[1]
+            if not (isinstance(default, ir.Constant) and default.value in (0, "")
+                    and not isinstance(default.value, bool)):
+                continue
+            if default.value == "" and lookup is not value.left:
+                continue  # String concatenation is not commutative
+            function = self._merge_function(target.value, default)
+            if function is None or self._references(added, container):
+                return None
+            return (f"{self._generate_expression(target.value)}.merge("
+                    f"{self._generate_expression(target.slice)}, {self._generate_expression(added)}, {function})")
+        return None
+        
+    def _merge_function(self, container: ir.Node, added: Optional[ir.Node] = None) -> Optional[str]:
+        """Returns the function merging values of a dict, None unless it is a dict of numbers or strings."""
+        container_type = self._types.expression_type(container)
+        if container_type.name != 'dict':
+            return None
+        value_type = container_type.args[1]
+        if value_type.name not in _MERGE_FUNCTIONS and added is not None:
+            value_type = self._types.expression_type(added)
+        return _MERGE_FUNCTIONS.get(value_type.name)
+        
+    def _generate_aug_assignment(self, node: ir.AugAssign) -> None:
+        """
+        Converts a Python augmented assignment to Java.
+        
+        Args:
+            node: The augmented assignment node
+        """
+        op = self._operator_symbol(node.op)
+        target = node.target
+        if isinstance(target, ir.Name) and target.id in self._builders:
+            self._write_append(target.id, (node.value,))
+        elif isinstance(target, ir.Name):
+            array = self._array_sum_operand(node.value) if op == "+" else None
+            reduced = self._lowered_reduction(node.value) if op == "+" else None
+            if array is not None:
+                self._write_array_sum(target.id, array)
+            elif (reduced is not None and node.value.func.id == 'sum'
+                    and not self._references(reduced, target.id)):
+                self._write_reduction_loops(target.id, node.value, None, initialize=False)
+            else:
+                self._write_line(f"{target.id} {op}= {self._generate_expression(node.value)};")
+        elif isinstance(target, ir.Subscript):
+            value = self._generate_expression(node.value)
+            merge = self._merge_function(target.value) if op == "+" else None
+            if isinstance(target.value, ir.Name) and target.value.id in self._arrays:
+                self._write_line(f"{self._generate_subscript(target)} {op}= {value};")
+            elif merge is not None and not isinstance(target.slice, ir.Slice):
+                # d[k] += v updates the entry with a single lookup
+                container = self._generate_expression(target.value)
+                self._write_line(f"{container}.merge({self._generate_expression(target.slice)}, {value}, {merge});")
+            else:
+                self._write_subscript_store(target, f"{self._generate_subscript(target)} {op} {value}")
+        elif isinstance(target, ir.Attribute):
+            self._write_line(f"{self._generate_attribute(target)} {op}= {self._generate_expression(node.value)};")
+        
+    def _write_append(self, name: str, operands: Sequence[ir.Node]) -> None:
+        """
+        Writes an append to a StringBuilder, one append() per concatenated
+        string so that no intermediate strings are built.
+        
+        Args:
+            name: The builder variable
+            operands: The appended expressions, in order
+        """
+        parts: List[str] = []
+        pending = list(reversed(operands))
+        while pending:
+            operand = pending.pop()
+            if (isinstance(operand, ir.BinOp) and isinstance(operand.op, ir.Add)
+                    and self._types.expression_type(operand) == STR):
+                pending.extend((operand.right, operand.left))
+            elif (isinstance(operand, ir.Call) and isinstance(operand.func, ir.Name) and operand.func.id == 'str'
+                    and 'str' not in self._types.functions and len(operand.args) == 1 and not operand.keywords):
+                # append() converts values itself, like String.valueOf
+                parts.append(f".append({self._generate_expression(operand.args[0])})")
+            elif isinstance(operand, ir.Name) and operand.id in self._builders:
+                parts.append(f".append({operand.id})")  # Copies the characters without a String
+            else:
+                parts.append(f".append({self._generate_expression(operand)})")
+        self._write_line(f"{name}{''.join(parts)};")
+        
+    def _write_subscript_store(self, target: ir.Subscript, value: str) -> None:
+        """Writes an assignment to an array element, list index or dict key."""
+        if isinstance(target.slice, ir.Slice):
+            return
+        container = self._generate_expression(target.value)
+        if isinstance(target.value, ir.Name) and target.value.id in self._arrays:
+            self._write_line(f"{self._generate_subscript(target)} = {value};")
+            return
+        container_type = self._types.expression_type(target.value).name
+        if container_type == 'list':
+            self._write_line(f"{container}.set({self._generate_index(target.slice, f'{container}.size()')}, {value});")
+        elif container_type == 'dict':
+            self._write_line(f"{container}.put({self._generate_expression(target.slice)}, {value});")
+        
+    def _generate_value(self, name: str, value: ir.Node) -> str:
+        """Generates an assigned value, initializing arrays and StringBuilders directly."""
+        if name in self._builders:
+            if isinstance(value, ir.Constant) and value.value == "":
+                return "new StringBuilder()"
+            return f"new StringBuilder({self._generate_expression(value)})"
+        if name not in self._arrays or not is_array_literal(value):
+            return self._generate_expression(value)
+        element = self._arrays[name]
+        if isinstance(value, ir.List):
+            return f"new {element}[]{{{', '.join(self._generate_expression(elt) for elt in value.elts)}}}"
+        # [0] * n: Java zero-fills new arrays
+        size = value.right if isinstance(value.left, ir.List) else value.left
+        return f"new {element}[{self._generate_expression(size)}]"
+        
+    def _generate_annotated_assignment(self, node: ir.AnnAssign) -> None:
+        """
+        Converts a Python annotated assignment or declaration to Java.
+        
+        Args:
+            node: The annotated assignment node
+        """
+        if not isinstance(node.target, ir.Name):
+            return
+        if node.value is not None and self._is_static_table(node.target):
+            self._write_static_table(node.target.id, node.value)
+            return
+        if self._fills_dict(node.target.id, node.value):
+            self._write_dict_entries(node.target.id, node.value, self._declaration_type(node.target.id))
+            return
+        if node.value is None:
+            value_type = self._declaration_type(node.target.id)
+            if value_type:
+                self._write_line(f"{value_type} {node.target.id};")
+            return
+        self._write_assignment(node.target.id, self._generate_value(node.target.id, node.value))
+        
+    def _is_static_table(self, target: ir.Node) -> bool:
+        """Whether an assignment target is a module variable emitted as a static table."""
+        return (self._scope is None and self._class is None and isinstance(target, ir.Name)
+                and target.id in self._types.static_tables())
+        
+    def _write_assignment(self, name: str, value: str) -> None:
+        """Writes an assignment, declaring the variable when it is new."""
+        value_type = self._declaration_type(name)
+        if value_type:
+            self._write_line(f"{value_type} {name} = {value};")
+        else:
+            self._write_line(f"{name} = {value};")
+        
+    def _generate_expression_statement(self, node: ir.Expr) -> None:
+        """
+        Converts a call used as a statement, e.g. ``items.append(x)``.
+        Other expression statements, such as docstrings, have no effect
+        and are dropped, as are calls that cannot be translated.
+        
+        Args:
+            node: The expression statement node
+        """
+        if isinstance(node.value, ir.Call):
+            expression = self._generate_call(node.value)
+            if expression != "null":
+                self._write_line(f"{expression};")
+        
+    def _generate_return(self, node: ir.Return) -> None:
+        """
+        Converts a Python return statement to Java.
+        
+        Args:
+            node: The return statement node
+        """
+        if node.value is None:
+            self._write_line("return;")
+            return
+        
+        # Lowered comprehensions and filled dicts are built in a local and returned
+        comprehension = self._lowered_comprehension(node.value)
+        reduced = self._lowered_reduction(node.value)
+        if self._fills_dict('', node.value):
+            result = self._fresh_name('result')
+            self._write_dict_entries(result, node.value, self._java_type(self._types.expression_type(node.value)))
+            self._write_line(f"return {result};")
+        elif comprehension is not None or reduced is not None:
+            result = self._fresh_name('result')
+            result_type = self._java_type(self._types.expression_type(node.value))
+            if comprehension is not None:
+                self._write_collection_loops(result, comprehension, result_type)
+            else:
+                self._write_reduction_loops(result, node.value, result_type)
+            self._write_line(f"return {result};")
+        else:
+            self._write_line(f"return {self._generate_expression(node.value)};")
         
     def _indent(self) -> str:
         """
@@ -255,161 +1570,652 @@ class JavaGenerator:
         """
         return "    " * self.indent_level 
 
-    def _generate_for_loop(self, node: ast.For) -> str:
+    def _generate_for_loop(self, node: ir.For) -> None:
         """
         Converts a Python for loop to Java for-each loop.
         
         Args:
             node: The for loop node
+        """
+        if not self._can_open_loop(node.target, node.iter):
+            return
+        
+        # Loops over comprehensions are fused with the comprehension's own loops
+        renames = dict(self._renames)
+        opened = self._open_loop(node.target, node.iter, node.body, statement=True)
+        body, declared = self._blocks[-1]
+        self._blocks[-1] = (node.body, declared)
+        for stmt in node.body:
+            self._generate_from_ast(stmt)
+        self._close_blocks(opened)
+        self._renames = renames
+        
+    def _can_open_loop(self, target: ir.Node, iterable: ir.Node) -> bool:
+        """Whether a loop target and iterable can be translated to Java."""
+        if isinstance(target, ir.Tuple):
+            # Only dict.items() unpacking maps onto Java (Map.Entry)
+            return (len(target.elts) == 2 and all(isinstance(elt, ir.Name) for elt in target.elts)
+                    and self._types.expression_type(iterable).name == 'items'
+                    and isinstance(iterable, ir.Call) and isinstance(iterable.func, ir.Attribute))
+        if not isinstance(target, ir.Name):
+            return False
+        if self.comprehensions == 'loops' and isinstance(iterable, _FUSABLE):
+            return self._can_lower(iterable)
+        return True
+        
+    def _open_loop(self, target: ir.Node, iterable: ir.Node, body: Sequence[ir.stmt] = (),
+                   statement: bool = False) -> int:
+        """
+        Writes the header of a loop over an iterable and enters its block.
+        
+        Args:
+            target: The loop variable or (key, value) pair of dict.items()
+            iterable: The iterated expression
+            body: The statements of the loop, for range() loops rebinding
+                the variable or the names their bounds read
+            statement: True for a for statement, whose variable outlives
+                the loop, False for a comprehension clause
             
         Returns:
-            String containing the Java for loop
-        """
-        # Handle for-each loop
-        if isinstance(node.target, ast.Name):
-            # Try to infer the type of the iterator elements
-            iter_type = "Object"
-            if isinstance(node.iter, ast.Name):
-                # If iterating over a known variable, try to use its type
-                if node.iter.id in self.type_map:
-                    iter_type = self.type_map[node.iter.id]
-            
-            java_code = f"{self._indent()}for ({iter_type} {node.target.id} : {self._generate_expression(node.iter)}) {{\n"
-            self.indent_level += 1
-            
-            for stmt in node.body:
-                java_code += self._generate_from_ast(stmt)
-            
+            Number of blocks opened, to pass to _close_blocks()
+        """
+        if self.comprehensions == 'loops' and isinstance(iterable, _FUSABLE):
+            # Iterate the comprehension's source and compute each element in place
+            opened = self._open_comprehension(iterable.generators)
+            element = self._generate_expression(iterable.elt)
+            outer = self._outer_loop_variable(target.id) if statement else None
+            if outer is not None:
+                self._write_line(f"{outer} = {element};")
+                return opened
+            name = self._bind_loop_variable(target.id)
+            element_type_name = self._java_type(self._types.expression_type(iterable.elt))
+            self._write_line(f"{element_type_name} {name} = {element};")
+            return opened
+        
+        if isinstance(target, ir.Tuple):
+            key_type, value_type = (self._java_type(arg, boxed=True)
+                                    for arg in self._types.expression_type(iterable).args)
+            entry = self._fresh_name('entry')
+            receiver = self._generate_expression(iterable.func.value)
+            self._write_line(f"for (Map.Entry<{key_type}, {value_type}> {entry} : {receiver}.entrySet()) {{")
+            self._enter_block(())
+            for elt, java_type, getter in zip(target.elts, (key_type, value_type), ('getKey', 'getValue')):
+                outer = self._outer_loop_variable(elt.id) if statement else None
+                if outer is not None:
+                    self._write_line(f"{outer} = {entry}.{getter}();")
+                else:
+                    self._write_line(f"{java_type} {self._bind_loop_variable(elt.id)} = {entry}.{getter}();")
+            return 1
+        
+        # A for statement over a variable declared before the loop assigns it
+        # from a hidden loop variable, so that it keeps the last value after
+        # the loop and the old one when the loop does not run
+        outer = self._outer_loop_variable(target.id) if statement else None
+        name = self._bind_loop_variable(target.id) if outer is None else self._fresh_name(target.id)
+        rebound = False
+        if self._is_range_call(iterable):
+            # Loops over range() become counted loops; a body rebinding the
+            # variable must not change the iterations, so it gets a copy of
+            # a hidden index
+            rebound = outer is None and target.id in self._assigned_names(body)
+            index = self._fresh_name('index') if rebound else name
+            self._write_line(f"for ({self._counted_loop_header(index, iterable, body)}) {{")
+        else:
+            # Element type of the iterable at this point of the function
+            iter_type = self._java_type(element_type(self._types.expression_type(iterable)))
+            self._write_line(f"for ({iter_type} {name} : {self._iterable_expression(iterable)}) {{")
+        if outer is not None:
+            self._enter_block(())
+            self._write_line(f"{outer} = {name};")
+            return 1
+        self._enter_block((name,))
+        if rebound:
+            py_type = join(INT, self._types.block_bindings(body).get(target.id))
+            self._write_line(f"{self._variable_type(target.id, py_type)} {name} = {index};")
+        return 1
+        
+    def _bind_loop_variable(self, name: str) -> str:
+        """
+        Returns the Java name of a variable a loop header declares, renaming
+        it when an enclosing block already declares that name.
+        """
+        if any(name in declared for _, declared in self._blocks):
+            java_name = self._fresh_name(name)
+            self._renames[name] = java_name
+            return java_name
+        self._renames.pop(name, None)
+        return name
+        
+    def _outer_loop_variable(self, name: str) -> Optional[str]:
+        """Returns the Java name of a for statement's variable if an enclosing block already declares it."""
+        if any(name in declared for _, declared in self._blocks):
+            return self._renames.get(name, name)
+        return None
+        
+    def _enter_block(self, declared: Tuple[str, ...]) -> None:
+        """Indents for a block whose header was written by the caller."""
+        self.indent_level += 1
+        self._blocks.append((None, set(declared)))
+        
+    def _close_blocks(self, count: int) -> None:
+        """Closes blocks opened with _enter_block()."""
+        for _ in range(count):
+            self._blocks.pop()
             self.indent_level -= 1
-            java_code += f"{self._indent()}}}\n"
-            return java_code
-        return ""
+            self._write_line("}")
+        
+    def _iterable_expression(self, node: ir.Node) -> str:
+        """Converts an iterated expression to something Java can iterate."""
+        expression = self._generate_iterated(node)
+        iterable_type = self._types.expression_type(node)
+        if iterable_type.name == 'dict':
+            return f"{expression}.keySet()"
+        if iterable_type.name == 'iterator' and isinstance(node, ir.GeneratorExp):
+            return f"({self._java_type(iterable_type)}) {expression}"
+        return expression
 
-    def _generate_while_loop(self, node: ast.While) -> str:
+    def _is_range_call(self, node: ir.Node) -> bool:
+        """Whether an iterable is a call to the builtin range()."""
+        return (isinstance(node, ir.Call) and isinstance(node.func, ir.Name)
+                and node.func.id == 'range' and 'range' not in self._types.functions
+                and 1 <= len(node.args) <= 3 and not node.keywords)
+        
+    def _can_lower(self, node: ir.Node) -> bool:
+        """Whether a comprehension's clauses can all be written as Java loops."""
+        return all(not generator.is_async and self._can_open_loop(generator.target, generator.iter)
+                   for generator in node.generators)
+        
+    def _open_comprehension(self, generators: Sequence[ir.comprehension]) -> int:
         """
-        Converts a Python while loop to Java while loop.
+        Writes the loops and filters of comprehension clauses, leaving the
+        innermost block open for the element.
         
         Args:
-            node: The while loop node
+            generators: The comprehension's for/if clauses
             
         Returns:
-            String containing the Java while loop
+            Number of blocks opened, to pass to _close_blocks()
         """
-        java_code = f"{self._indent()}while ({self._generate_expression(node.test)}) {{\n"
-        self.indent_level += 1
+        opened = 0
+        for generator in generators:
+            opened += self._open_loop(generator.target, generator.iter)
+            for condition in generator.ifs:
+                self._write_line(f"if ({self._generate_expression(condition)}) {{")
+                self._enter_block(())
+                opened += 1
+        return opened
         
-        for stmt in node.body:
-            java_code += self._generate_from_ast(stmt)
+    def _loop_count(self, generators: Sequence[ir.comprehension]) -> int:
+        """Number of Java loops the clauses of a lowered comprehension open."""
+        count = 0
+        for generator in generators:
+            count += 1
+            if self.comprehensions == 'loops' and isinstance(generator.iter, _FUSABLE):
+                count += self._loop_count(generator.iter.generators) - 1
+        return count
         
-        self.indent_level -= 1
-        java_code += f"{self._indent()}}}\n"
-        return java_code
+    def _lowered_comprehension(self, node: ir.Node) -> Optional[ir.Node]:
+        """Returns node if it is a comprehension to lower to loops in this mode."""
+        if (self.comprehensions == 'loops' and isinstance(node, (ir.ListComp, ir.SetComp, ir.DictComp))
+                and self._can_lower(node)):
+            return node
+        return None
+        
+    def _lowered_reduction(self, node: ir.Node) -> Optional[ir.Node]:
+        """Returns the comprehension reduced by ``sum/any/all(...)`` to lower to a loop."""
+        if (self.comprehensions == 'loops' and isinstance(node, ir.Call)
+                and isinstance(node.func, ir.Name) and node.func.id in _LOOP_REDUCTIONS
+                and node.func.id not in self._types.functions
+                and len(node.args) == 1 and not node.keywords
+                and isinstance(node.args[0], _FUSABLE) and self._can_lower(node.args[0])):
+            return node.args[0]
+        return None
+        
+    def _references(self, node: ir.Node, name: str) -> bool:
+        """Whether an expression mentions a variable."""
+        return any(isinstance(inner, ir.Name) and inner.id == name for inner in ir.walk(node))
+        
+    def _write_collection_loops(self, name: str, node: ir.Node, declaration: Optional[str]) -> None:
+        """
+        Writes a list, set or dict comprehension as loops filling a collection.
+        
+        Lists built from a single unfiltered clause over a sized source are
+        pre-sized; nested comprehensions used as sources are fused into the
+        same loops instead of being materialized.
+        
+        Args:
+            name: Variable receiving the collection
+            node: The comprehension
+            declaration: Java type to declare the variable with, if new
+        """
+        collection = {ir.ListComp: "ArrayList", ir.SetComp: "HashSet", ir.DictComp: "HashMap"}[type(node)]
+        capacity = self._presized_capacity(node) if isinstance(node, ir.ListComp) else ""
+        value = f"new {collection}<>({capacity})"
+        self._write_line(f"{declaration} {name} = {value};" if declaration else f"{name} = {value};")
+        
+        renames = dict(self._renames)
+        opened = self._open_comprehension(node.generators)
+        if isinstance(node, ir.DictComp):
+            self._write_line(f"{name}.put({self._generate_expression(node.key)}, {self._generate_expression(node.value)});")
+        else:
+            self._write_line(f"{name}.add({self._generate_expression(node.elt)});")
+        self._close_blocks(opened)
+        self._renames = renames
+        
+    def _presized_capacity(self, node: ir.ListComp) -> str:
+        """Returns the exact result size of a list comprehension, if known up front."""
+        if len(node.generators) != 1 or node.generators[0].ifs:
+            return ""
+        iterable = node.generators[0].iter
+        if isinstance(iterable, ir.Name) and iterable.id in self._arrays:
+            return f"{self._generate_expression(iterable)}.length"
+        if self._is_range_call(iterable) and len(iterable.args) == 1:
+            return self._generate_expression(iterable.args[0])
+        if self._types.expression_type(iterable).name in ('list', 'set', 'dict'):
+            return f"{self._generate_expression(iterable)}.size()"
+        return ""
+        
+    def _write_reduction_loops(self, name: str, call: ir.Call, declaration: Optional[str],
+                               initialize: bool = True) -> None:
+        """
+        Writes ``sum``, ``any`` or ``all`` over a comprehension as a single
+        loop accumulating into a variable, without an intermediate collection.
+        
+        Args:
+            name: Variable receiving the result
+            call: The reduction call
+            declaration: Java type to declare the variable with, if new
+            initialize: False for ``name += sum(...)``, which keeps the value
+        """
+        reduction = call.func.id
+        node = call.args[0]
+        if initialize:
+            initial = _LOOP_REDUCTIONS[reduction]
+            self._write_line(f"{declaration} {name} = {initial};" if declaration else f"{name} = {initial};")
+        
+        # any/all stop at the first decisive element
+        label = None
+        if reduction != 'sum' and self._loop_count(node.generators) > 1:
+            label = self._fresh_name('search')
+            self._write_line(f"{label}:")
+        
+        renames = dict(self._renames)
+        opened = self._open_comprehension(node.generators)
+        element = self._generate_expression(node.elt)
+        if reduction == 'sum':
+            self._write_line(f"{name} += {element};")
+        else:
+            condition = element if reduction == 'any' else f"!({element})"
+            self._write_line(f"if ({condition}) {{")
+            self._write_line(f"    {name} = {'true' if reduction == 'any' else 'false'};")
+            self._write_line(f"    break{' ' + label if label else ''};")
+            self._write_line("}")
+        self._close_blocks(opened)
+        self._renames = renames
+        
+    def _generate_comprehension(self, node: ir.Node) -> str:
+        """
+        Converts a comprehension or generator expression to a Stream pipeline.
+        
+        Generator expressions become lazy ``Iterable`` views of the pipeline.
+        """
+        if not all(self._can_stream(generator) for generator in node.generators):
+            return "null"
+        if isinstance(node, ir.DictComp):
+            pipeline = self._stream_pipeline(
+                node.generators,
+                lambda: f"Map.entry({self._generate_expression(node.key)}, {self._generate_expression(node.value)})",
+                node=node
+            )
+            # Later keys win, as in Python
+            first, second = self._fresh_name('previous'), self._fresh_name('replacement')
+            return (f"{pipeline}.collect(Collectors.toMap(Map.Entry::getKey, Map.Entry::getValue, "
+                    f"({first}, {second}) -> {second}, HashMap::new))")
+        pipeline = self._stream_pipeline(node.generators, lambda: self._generate_expression(node.elt),
+                                         node=node)
+        if isinstance(node, ir.ListComp):
+            return f"{pipeline}.collect(Collectors.toCollection(ArrayList::new))"
+        if isinstance(node, ir.SetComp):
+            return f"{pipeline}.collect(Collectors.toCollection(HashSet::new))"
+        return f"{pipeline}::iterator"
+        
+    def _generate_stream_reduction(self, reduction: str, node: ir.Node) -> str:
+        """
+        Converts ``sum/any/all/min/max`` over a comprehension to a Stream
+        pipeline ending in the matching terminal operation.
+        """
+        if not all(self._can_stream(generator) for generator in node.generators):
+            return "null"
+        element = lambda: self._generate_expression(node.elt)
+        single = len(node.generators) == 1
+        if reduction == 'sum':
+            is_float = self._types.expression_type(node.elt).name == 'float'
+            mapper, unbox = ("mapToDouble", "Double::doubleValue") if is_float else ("mapToInt", "Integer::intValue")
+            if single:
+                return f"{self._stream_pipeline(node.generators, element, mapper, node)}.sum()"
+            return f"{self._stream_pipeline(node.generators, element, node=node)}.{mapper}({unbox}).sum()"
+        if reduction in ('any', 'all'):
+            match = "anyMatch" if reduction == 'any' else "allMatch"
+            if single:
+                return self._stream_pipeline(node.generators, element, match, node)
+            return f"{self._stream_pipeline(node.generators, element, node=node)}.{match}(Boolean::booleanValue)"
+        pipeline = self._stream_pipeline(node.generators, element, node=node)
+        return f"{pipeline}.{reduction}(Comparator.naturalOrder()).get()"
+        
+    def _can_stream(self, generator: ir.comprehension) -> bool:
+        """Whether a comprehension clause can become a Stream source."""
+        if generator.is_async:
+            return False
+        if isinstance(generator.target, ir.Tuple):
+            return self._can_open_loop(generator.target, generator.iter)
+        if isinstance(generator.iter, _FUSABLE):
+            return all(self._can_stream(inner) for inner in generator.iter.generators)
+        return isinstance(generator.target, ir.Name)
+        
+    def _stream_pipeline(self, generators: Sequence[ir.comprehension], element, mapper: str = "map",
+                         node: Optional[ir.Node] = None) -> str:
+        """
+        Builds a Stream over comprehension clauses: one source per clause,
+        filters for its conditions and flatMap for nested clauses.
+        
+        Args:
+            generators: The comprehension's for/if clauses
+            element: Callable generating the element expression once the
+                clause variables are in scope
+            mapper: Operation applied to the elements of a single clause,
+                e.g. "mapToInt" for sums or "anyMatch" for any()
+            node: The whole comprehension, given by the outermost call so
+                that the locals its lambdas capture are made final
+            
+        Returns:
+            String containing the Java stream expression
+        """
+        renames = dict(self._renames)
+        captured = dict(self._captured)
+        if node is not None:
+            self._copy_captured_locals(node)
+        generator = generators[0]
+        variable, source = self._stream_source(generator)
+        stages = [source]
+        for condition in generator.ifs:
+            stages.append(f".filter({variable} -> {self._generate_expression(condition)})")
+        if len(generators) > 1:
+            stages.append(f".flatMap({variable} -> {self._stream_pipeline(generators[1:], element)})")
+        else:
+            value = element()
+            if mapper != "map" or value != variable:
+                stages.append(f".{mapper}({variable} -> {value})")
+        self._renames = renames
+        self._captured = captured
+        return "".join(stages)
+        
+    def _copy_captured_locals(self, node: ir.Node) -> None:
+        """
+        Copies the reassigned locals a comprehension's lambdas read into
+        final locals, written before the statement, since Java lambdas may
+        only capture effectively final variables.
+        
+        Args:
+            node: The comprehension; the source of its first clause is
+                evaluated outside the lambdas unless it is fused
+        """
+        if self._scope is None:
+            return
+        reassigned = self._types.reassigned_locals(self._scope)
+        if not reassigned:
+            return
+        first = node.generators[0]
+        parts = [child for child in ir.iter_child_nodes(node) if child is not first] + list(first.ifs)
+        if isinstance(first.iter, _FUSABLE):
+            parts.append(first.iter)
+        # Clause variables become lambda parameters
+        bound = {name.id for name in ir.walk(node) if isinstance(name, ir.Name) and isinstance(name.ctx, ir.Store)}
+        for part in parts:
+            for name in ir.walk(part):
+                if (isinstance(name, ir.Name) and isinstance(name.ctx, ir.Load)
+                        and name.id in reassigned and name.id not in bound
+                        and name.id in self._scope.env and name.id not in self._captured
+                        and name.id not in self._renames and name.id != self._scope.receiver):
+                    copy = self._copies.get(name.id)
+                    if copy is None:
+                        # Expressions may be generated more than once; copy once per statement
+                        value = self._generate_name(name)
+                        java_type = "String" if name.id in self._builders else self._variable_type(
+                            name.id, self._types.expression_type(name))
+                        copy = self._copies[name.id] = self._fresh_name(name.id)
+                        self._write_line(f"final {java_type} {copy} = {value};")
+                    self._captured[name.id] = copy
+        
+    def _stream_source(self, generator: ir.comprehension) -> Tuple[str, str]:
+        """
+        Returns the lambda variable and Stream source of a comprehension clause,
+        binding the clause variables for the expressions that follow.
+        """
+        iterable = generator.iter
+        if isinstance(generator.target, ir.Tuple):
+            # dict.items(): the pair is read from a Map.Entry
+            entry = self._fresh_name('entry')
+            key, value = (elt.id for elt in generator.target.elts)
+            self._renames[key] = f"{entry}.getKey()"
+            self._renames[value] = f"{entry}.getValue()"
+            return entry, f"{self._generate_expression(iterable.func.value)}.entrySet().stream()"
+        
+        if isinstance(iterable, _FUSABLE):
+            source = self._stream_pipeline(iterable.generators, lambda: self._generate_expression(iterable.elt))
+        elif self._is_range_call(iterable):
+            start, stop, step = self._range_bounds(iterable)
+            if step == "1":
+                source = f"IntStream.range({start}, {stop}).boxed()"
+            else:
+                counter = self._fresh_name('value')
+                sign = _int_literal(iterable.args[2]) if len(iterable.args) > 2 else 1
+                condition = self._range_condition(counter, stop, step, sign)
+                source = (f"IntStream.iterate({start}, {counter} -> {condition}, "
+                          f"{counter} -> {counter} + {step}).boxed()")
+        else:
+            expression = self._generate_iterated(iterable)
+            iterable_type = self._types.expression_type(iterable).name
+            if isinstance(iterable, ir.Name) and iterable.id in self._arrays:
+                source = f"Arrays.stream({expression}).boxed()"
+            elif iterable_type == 'dict':
+                source = f"{expression}.keySet().stream()"
+            elif iterable_type == 'str':
+                code = self._fresh_name('code')
+                source = f"{expression}.chars().mapToObj({code} -> String.valueOf((char) {code}))"
+            elif iterable_type == 'iterator':
+                source = f"StreamSupport.stream({expression}.spliterator(), false)"
+            else:
+                source = f"{expression}.stream()"
+        
+        # Java lambdas may not shadow locals of the enclosing method
+        name = generator.target.id
+        variable = name
+        if any(name in declared for _, declared in self._blocks):
+            variable = self._fresh_name(name)
+        self._renames[name] = variable
+        return variable, source
+        
+    def _counted_loop_header(self, name: str, node: ir.Call, body: Sequence[ir.stmt] = ()) -> str:
+        """
+        Converts ``range(...)`` into the header of an indexed Java for loop.
+        
+        Python evaluates the bounds once, while Java re-evaluates the
+        condition on every iteration, so a stop or step that the loop could
+        change is first stored in a final local, written before the loop.
+        
+        Args:
+            name: The loop variable
+            node: The range() call
+            body: The statements of the loop
+            
+        Returns:
+            Initialization, condition and update of the for statement
+        """
+        start = self._generate_expression(node.args[0]) if len(node.args) > 1 else "0"
+        stop_node = node.args[1] if len(node.args) > 1 else node.args[0]
+        step_node = node.args[2] if len(node.args) > 2 else None
+        assigned = self._assigned_names(body)
+        stop = self._loop_bound(stop_node, 'stop', assigned)
+        step = self._loop_bound(step_node, 'step', assigned) if step_node is not None else "1"
+        condition = self._range_condition(name, stop, step, _int_literal(step_node) if step_node else 1)
+        if step == "1":
+            update = f"{name}++"
+        elif step == "-1":
+            update = f"{name}--"
+        elif step.startswith("-") and _int_literal(step_node) is not None:
+            update = f"{name} -= {step[1:]}"
+        else:
+            update = f"{name} += {step}"
+        return f"int {name} = {start}; {condition}; {update}"
+        
+    def _loop_bound(self, node: ir.Node, base: str, assigned: Set[str]) -> str:
+        """
+        Returns a range() bound for a loop condition: literals, names the
+        loop does not rebind and the length of such an array as they are,
+        anything else in a final local.
+        """
+        expression = self._generate_expression(node)
+        if (isinstance(node, ir.Call) and isinstance(node.func, ir.Name) and node.func.id == 'len'
+                and len(node.args) == 1 and isinstance(node.args[0], ir.Name)
+                and node.args[0].id in self._arrays):
+            node = node.args[0]
+        if _int_literal(node) is not None or (isinstance(node, ir.Name) and node.id not in assigned):
+            return expression
+        name = self._fresh_name(base)
+        self._write_line(f"final int {name} = {expression};")
+        return name
+        
+    @staticmethod
+    def _range_condition(counter: str, stop: str, step: str, sign: Optional[int]) -> str:
+        """
+        Returns the condition continuing a range() loop, testing the sign
+        of the step at run time unless it is a literal.
+        """
+        if sign is None:
+            return f"{step} > 0 ? {counter} < {stop} : {counter} > {stop}"
+        return f"{counter} > {stop}" if sign < 0 else f"{counter} < {stop}"
+        
+    @staticmethod
+    def _assigned_names(body: Sequence[ir.stmt]) -> Set[str]:
+        """Returns the names a block of statements binds, including nested blocks."""
+        return {node.id for stmt in body for node in ir.walk(stmt)
+                if isinstance(node, ir.Name) and isinstance(node.ctx, ir.Store)}
+        
+    def _range_bounds(self, node: ir.Call) -> Tuple[str, str, str]:
+        """Returns the start, stop and step of a range() call as Java expressions."""
+        args = [self._generate_expression(arg) for arg in node.args]
+        if len(args) == 1:
+            return "0", args[0], "1"
+        return tuple((args + ["1"])[:3])
+
+    def _generate_while_loop(self, node: ir.While) -> None:
+        """
+        Converts a Python while loop to Java while loop.
+        
+        Args:
+            node: The while loop node
+        """
+        start = len(self._out)
+        test = self._generate_expression(node.test)
+        if len(self._out) == start:
+            self._write_line(f"while ({test}) {{")
+        else:
+            # The test copied locals for its lambdas: copy them on every iteration
+            copies = self._out[start:]
+            del self._out[start:]
+            self._write_line("while (true) {")
+            self._out.extend(f"    {line}" for line in copies)
+            self._write_line(f"    if (!({test})) {{")
+            self._write_line("        break;")
+            self._write_line("    }")
+        self._generate_body(node.body)
+        self._write_line("}")
 
-    def _generate_class(self, node: ast.ClassDef) -> str:
+    def _generate_class(self, node: ir.ClassDef) -> None:
         """
         Converts a Python class to Java class.
         
         Args:
             node: The class definition node
-            
-        Returns:
-            String containing the Java class
         """
         # Handle inheritance
         extends = []
         implements = []
         for base in node.bases:
-            if isinstance(base, ast.Name):
-                extends.append(base.id)
+            if isinstance(base, ir.Name):
+                extends.append(self._imported_name(base.id) or base.id)
         
         # Build class declaration
-        java_code = f"{self._indent()}public class {node.name}"
+        declaration = f"public class {node.name}"
         if extends:
             # In Java, we can only extend one class, so we'll use the first one
-            java_code += f" extends {extends[0]}"
+            declaration += f" extends {extends[0]}"
             # Any additional bases become interfaces
             if len(extends) > 1:
                 implements.extend(extends[1:])
         if implements:
-            java_code += f" implements {', '.join(implements)}"
-        java_code += " {\n"
+            declaration += f" implements {', '.join(implements)}"
+        self._write_line(declaration + " {")
         
+        outer_class, self._class = self._class, node
         self.indent_level += 1
         
-        # Track instance variables for constructor
-        instance_vars = {}
-        
-        # First pass: collect instance variables and methods
-        for item in node.body:
-            if isinstance(item, ast.AnnAssign) and isinstance(item.target, ast.Name):
-                var_type = "Object"
-                if isinstance(item.annotation, ast.Name):
-                    var_type = self.type_map.get(item.annotation.id, "Object")
-                instance_vars[item.target.id] = var_type
-            elif isinstance(item, ast.Assign):
-                for target in item.targets:
-                    if isinstance(target, ast.Name):
-                        instance_vars[target.id] = "Object"  # Default type if not annotated
+        # Declare the fields set at class level and in __init__
+        # Separate units share fields with subclasses and the module class
+        class_scope = self._types.class_scope(node)
+        visibility = "protected" if self._module_class else "private"
+        for field, field_type in class_scope.fields.items():
+            self._write_line(f"{visibility} {self._java_type(field_type)} {field};")
+        if class_scope.fields:
+            self._out.append("\n")
         
         # Generate constructor if __init__ is present
         init_method = None
         for item in node.body:
-            if isinstance(item, ast.FunctionDef) and item.name == "__init__":
+            if isinstance(item, ir.FunctionDef) and item.name == "__init__":
                 init_method = item
                 break
         
         if init_method:
             # Generate constructor
-            params = []
-            for arg in init_method.args.args[1:]:  # Skip 'self'
-                arg_type = "Object"
-                if arg.annotation and isinstance(arg.annotation, ast.Name):
-                    arg_type = self.type_map.get(arg.annotation.id, "Object")
-                params.append(f"{arg_type} {arg.arg}")
+            init_scope = self._types.function_scope(init_method)
+            params = [f"{self._java_type(arg_type)} {arg}" for arg, arg_type in init_scope.params]
             
-            java_code += f"{self._indent()}public {node.name}({', '.join(params)}) {{\n"
+            self._write_line(f"public {node.name}({', '.join(params)}) {{")
             self.indent_level += 1
             
             # Add constructor body
             for stmt in init_method.body:
-                if isinstance(stmt, ast.Assign):
-                    if isinstance(stmt.targets[0], ast.Attribute):
-                        if isinstance(stmt.targets[0].value, ast.Name) and stmt.targets[0].value.id == "self":
+                if isinstance(stmt, ir.Assign):
+                    if isinstance(stmt.targets[0], ir.Attribute):
+                        if isinstance(stmt.targets[0].value, ir.Name) and stmt.targets[0].value.id == "self":
                             # Convert self.attr = value to this.attr = value
                             attr_name = stmt.targets[0].attr
-                            java_code += f"{self._indent()}this.{attr_name} = {self._generate_expression(stmt.value)};\n"
+                            self._write_line(f"this.{attr_name} = {self._generate_expression(stmt.value)};")
             
             self.indent_level -= 1
-            java_code += f"{self._indent()}}}\n\n"
+            self._write_line("}")
+            self._out.append("\n")
         
         # Generate other methods
         for item in node.body:
-            if isinstance(item, ast.FunctionDef) and item.name != "__init__":
-                # Handle special methods
-                if item.name == "__str__":
-                    item.name = "toString"
-                elif item.name == "__eq__":
-                    item.name = "equals"
-                elif item.name == "__len__":
-                    item.name = "size"
-                
-                java_code += self._generate_function(item)
+            if isinstance(item, ir.FunctionDef) and item.name != "__init__":
+                # Handle special methods without mutating the tree
+                self._generate_function(item, _SPECIAL_METHODS.get(item.name, item.name))
         
         self.indent_level -= 1
-        java_code += f"{self._indent()}}}\n"
-        return java_code
+        self._class = outer_class
+        self._write_line("}")
 
-    def _generate_with_statement(self, node: ast.With) -> str:
+    def _generate_with_statement(self, node: ir.With) -> None:
         """
         Converts Python with statement to Java try-with-resources.
         """
-        java_code = ""
-        
         # Handle file operations
         if len(node.items) > 0:  # Check if there are any items
             item = node.items[0]
-            if (isinstance(item.context_expr, ast.Call) and 
-                isinstance(item.context_expr.func, ast.Name) and 
+            if (isinstance(item.context_expr, ir.Call) and 
+                isinstance(item.context_expr.func, ir.Name) and 
                 item.context_expr.func.id == 'open'):
                 
                 args = item.context_expr.args
@@ -434,24 +2240,87 @@ class JavaGenerator:
                 
                 # Generate appropriate Java file handling code
                 if mode == '"r"':
-                    java_code += f"{self._indent()}try (BufferedReader reader = Files.newBufferedReader(Paths.get({file_path}), {encoding})) {{\n"
+                    self._write_line(f"try (BufferedReader reader = Files.newBufferedReader(Paths.get({file_path}), {encoding})) {{")
                 elif mode == '"w"':
-                    java_code += f"{self._indent()}try (BufferedWriter writer = Files.newBufferedWriter(Paths.get({file_path}), {encoding})) {{\n"
+                    self._write_line(f"try (BufferedWriter writer = Files.newBufferedWriter(Paths.get({file_path}), {encoding})) {{")
                 elif mode == '"wb"':
-                    java_code += f"{self._indent()}try (OutputStream out = Files.newOutputStream(Paths.get({file_path}))) {{\n"
+                    self._write_line(f"try (OutputStream out = Files.newOutputStream(Paths.get({file_path}))) {{")
                 elif mode == '"rb"':
-                    java_code += f"{self._indent()}try (InputStream in = Files.newInputStream(Paths.get({file_path}))) {{\n"
-                
-                self.indent_level += 1
+                    self._write_line(f"try (InputStream in = Files.newInputStream(Paths.get({file_path}))) {{")
                 
                 # Convert the body of the with statement
-                for item in node.body:
-                    java_code += self._generate_from_ast(item)
+                self._generate_body(node.body)
                 
-                self.indent_level -= 1
-                java_code += f"{self._indent()}}}\n"
-                java_code += f"{self._indent()}catch (IOException e) {{\n"
-                java_code += f"{self._indent()}    e.printStackTrace();\n"
-                java_code += f"{self._indent()}}}\n"
-        
-        return java_code 
\ No newline at end of file
+                self._write_line("}")
+                self._write_line("catch (IOException e) {")
+                self._write_line("    e.printStackTrace();")
+                self._write_line("}")
+
+    # Type-keyed dispatch tables used instead of isinstance chains
+    _STATEMENT_GENERATORS = {
+        ir.FunctionDef: _generate_function,
+        ir.ClassDef: _generate_class,
+        ir.Assign: _generate_assignment,
+        ir.AnnAssign: _generate_annotated_assignment,
+        ir.AugAssign: _generate_aug_assignment,
+        ir.Return: _generate_return,
+        ir.If: _generate_if_statement,
+        ir.For: _generate_for_loop,
+        ir.While: _generate_while_loop,
+        ir.With: _generate_with_statement,
+        ir.Expr: _generate_expression_statement,
+    }
+
+    _EXPRESSION_GENERATORS = {
+        ir.Name: _generate_name,
+        ir.Constant: _generate_constant,
+        ir.List: _generate_list_literal,
+        ir.Set: _generate_set_literal,
+        ir.Dict: _generate_dict_literal,
+        ir.Compare: _generate_compare,
+        ir.BinOp: _generate_binary_operation,
+        ir.UnaryOp: _generate_unary_operation,
+        ir.Subscript: _generate_subscript,
+        ir.Call: _generate_call,
+        ir.Attribute: _generate_attribute,
+        ir.ListComp: _generate_comprehension,
+        ir.SetComp: _generate_comprehension,
+        ir.DictComp: _generate_comprehension,
+        ir.GeneratorExp: _generate_comprehension,
+    }
+
+    # Builtin name -> translation taking (self, call)
+    _BUILTIN_CALLS = {
+        'print': _call_print,
+        'len': _call_len,
+        'str': _call_conversion,
+        'int': _call_conversion,
+        'float': _call_conversion,
+        'min': _call_min_max,
+        'max': _call_min_max,
+        'sum': _call_sum,
+        'sorted': _call_sorted,
+        'list': _call_collection,
+        'set': _call_collection,
+        'dict': _call_collection,
+    }
+
+    # (receiver type, method) -> translation taking (self, receiver, call, receiver type)
+    _METHOD_CALLS = {
+        ('list', 'pop'): _call_list_pop,
+        ('list', 'remove'): _call_list_remove,
+        ('list', 'sort'): _call_list_sort,
+        ('list', 'copy'): _call_copy,
+        ('set', 'copy'): _call_copy,
+        ('dict', 'copy'): _call_copy,
+        ('dict', 'get'): _call_dict_get,
+        ('dict', 'pop'): _call_dict_pop,
+        ('dict', 'setdefault'): _call_dict_setdefault,
+        ('dict', 'keys'): _call_dict_view,
+        ('dict', 'values'): _call_dict_view,
+        ('set', 'union'): _call_set_operation,
+        ('set', 'intersection'): _call_set_operation,
+        ('set', 'difference'): _call_set_operation,
+        ('str', 'split'): _call_str_split,
+        ('str', 'join'): _call_str_join,
+    }
@@ -0,0 +1,213 @@
+import io
+import zipfile
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from src.java_generator.generator import JavaGenerator
+from src.python_analyzer import ir
+from src.python_analyzer.type_inference import ImportedSymbol
+
+
+def module_class_name(tree: ir.Node, class_name: str = "PythonTranslated") -> str:
+    """
+    Returns the name of the module functions class of a split module:
+    class_name, with ``Module`` appended while a Python class has that name.
+    """
+    names = {stmt.name for stmt in ir.from_ast(tree).body if isinstance(stmt, ir.ClassDef)}
+    while class_name in names:
+        class_name += "Module"
+    return class_name
+
+
+def partition(tree: ir.Node, class_name: str = "PythonTranslated") -> List[Tuple[str, Tuple[ir.stmt, ...]]]:
+    """
+    Splits a module into Java compilation units.
+
+    Every top-level class becomes its own unit; the remaining statements
+    form the module functions class, listed first. It is left out when
+    empty and the module has classes.
+
+    Args:
+        tree: The module IR
+        class_name: Requested name of the module functions class
+
+    Returns:
+        (public class name, statements) pairs in source order
+    """
+    body = ir.from_ast(tree).body
+    members = tuple(stmt for stmt in body if not isinstance(stmt, ir.ClassDef))
+    units = [(stmt.name, (stmt,)) for stmt in body if isinstance(stmt, ir.ClassDef)]
+    if members or not units:
+        units.insert(0, (module_class_name(tree, class_name), members))
+    return units
+
+
+def _generate_batch(tree: ir.Node, class_name: str, options: Optional[Dict[str, Any]],
+                    indices: Sequence[int],
+                    imports: Optional[Mapping[str, ImportedSymbol]] = None) -> List[Tuple[str, str]]:
+    """
+    Generates some units of a module with one generator.
+
+    Args:
+        tree: The module IR
+        class_name: Requested name of the module functions class
+        options: JavaGenerator options
+        indices: Positions of the units to generate in partition()
+        imports: Symbols imported from other project modules
+
+    Returns:
+        (file name, Java source) pairs in the order of indices
+    """
+    units = partition(tree, class_name)
+    module_class = module_class_name(tree, class_name)
+    generator = JavaGenerator(**(options or {}))
+    generator.infer_types(tree, imports)
+    results = []
+    for index in indices:
+        name, body = units[index]
+        results.append((f"{name}.java", generator.generate_unit(name, body, module_class)))
+    return results
+
+
+def _generate_serialized_batch(data: bytes, class_name: str, options: Optional[Dict[str, Any]],
+                               indices: Sequence[int],
+                               imports: Optional[Mapping[str, ImportedSymbol]] = None) -> List[Tuple[str, str]]:
+    """Generates units of a module serialized with ir.dumps(), in a worker process."""
+    return _generate_batch(ir.loads(data), class_name, options, indices, imports)
+
+
+def generate_units(tree: ir.Node, class_name: str = "PythonTranslated",
+                   options: Optional[Dict[str, Any]] = None,
+                   executor: Optional[Executor] = None, workers: int = 1,
+                   imports: Optional[Mapping[str, ImportedSymbol]] = None) -> List[Tuple[str, str]]:
+    """
+    Translates a module to one Java file per class plus a module functions
+    class, instead of a single class nesting everything.
+
+    With an executor, the units are split into contiguous batches that
+    are generated concurrently. The module travels to the workers as
+    compact serialized IR, and each worker infers only the types its
+    units need.
+
+    Args:
+        tree: The module IR built by PythonAnalyzer; an ast tree is
+            converted first
+        class_name: Name of the module functions class
+        options: JavaGenerator options, e.g. ``{'optimize_numeric': True}``
+        executor: Pool generating the batches, e.g. a ProcessPoolExecutor;
+            the units are generated in this thread when omitted
+        workers: Number of batches to submit to the executor
+        imports: Symbols of other project modules bound by the module's
+            imports, keyed by local name (see SymbolIndex)
+
+    Returns:
+        (file name, Java source) pairs, the module functions class first
+        and the classes in source order
+    """
+    tree = ir.from_ast(tree)
+    count = len(partition(tree, class_name))
+    if executor is None or workers <= 1 or count <= 1:
+        return _generate_batch(tree, class_name, options, range(count), imports)
+
+    data = ir.dumps(tree)
+    size = -(-count // min(workers, count))
+    futures = [executor.submit(_generate_serialized_batch, data, class_name, options,
+                               range(start, min(start + size, count)), imports)
+               for start in range(0, count, size)]
+    return [unit for future in futures for unit in future.result()]
+
+
+def definitions(tree: ir.Node) -> List[int]:
+    """Returns the positions of the top-level classes and functions of a module."""
+    return [index for index, stmt in enumerate(ir.from_ast(tree).body)
+            if isinstance(stmt, (ir.ClassDef, ir.FunctionDef, ir.AsyncFunctionDef))]
+
+
+def _generate_definitions(data: bytes, options: Optional[Dict[str, Any]],
+                          indices: Sequence[int]) -> Tuple[List[str], Set[str]]:
+    """
+    Generates some top-level statements of a module serialized with
+    ir.dumps() as members of its wrapper class, in a worker process.
+
+    Args:
+        data: The serialized module IR
+        options: JavaGenerator options
+        indices: Positions of the statements in the module body
+
+    Returns:
+        The members in the order of indices and the imports they require
+    """
+    tree = ir.loads(data)
+    generator = JavaGenerator(**(options or {}))
+    generator.infer_types(tree)
+    members = []
+    required: Set[str] = set()
+    for index in indices:
+        member, member_imports = generator.generate_definition(tree.body[index])
+        members.append(member)
+        required |= member_imports
+    return members, required
+
+
+def generate_parallel(tree: ir.Node, class_name: str = "PythonTranslated",
+                      options: Optional[Dict[str, Any]] = None,
+                      executor: Optional[Executor] = None, workers: int = 1) -> str:
+    """
+    Translates a module to a single Java class like JavaGenerator.generate,
+    generating its top-level classes and functions concurrently.
+
+    The module body is split into contiguous batches holding about the
+    same number of definitions, which travel to the workers as compact
+    serialized IR. The members are stitched back in source order under
+    a header importing what any batch requires, so the result matches
+    the serial translation.
+
+    Args:
+        tree: The module IR built by PythonAnalyzer; an ast tree is
+            converted first
+        class_name: Name of the Java class to generate
+        options: JavaGenerator options, e.g. ``{'optimize_numeric': True}``
+        executor: Pool generating the batches, e.g. a ProcessPoolExecutor;
+            the module is generated in this thread when omitted
+        workers: Number of batches to submit to the executor
+
+    Returns:
+        String containing the equivalent Java code
+    """
+    tree = ir.from_ast(tree)
+    positions = definitions(tree)
+    if executor is None or workers <= 1 or len(positions) <= 1:
+        return JavaGenerator(**(options or {})).generate(tree, class_name)
+
+    # Cut after every size-th definition; other statements join the batch before them
+    size = -(-len(positions) // min(workers, len(positions)))
+    ends = [positions[index] + 1 for index in range(size - 1, len(positions) - 1, size)]
+    bounds = zip([0] + ends, ends + [len(tree.body)])
+    data = ir.dumps(tree)
+    futures = [executor.submit(_generate_definitions, data, options, range(start, end))
+               for start, end in bounds]
+    members: List[str] = []
+    required: Set[str] = set()
+    for future in futures:
+        batch, batch_imports = future.result()
+        members.extend(batch)
+        required |= batch_imports
+    header = JavaGenerator(**(options or {})).generate_header(required, class_name)
+    return header + "".join(members) + "}\n"
+
+
+def zip_units(units: Sequence[Tuple[str, str]]) -> bytes:
+    """
+    Packs generated units into a zip archive.
+
+    Args:
+        units: (file name, Java source) pairs
+
+    Returns:
+        The deflated archive
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, code in units:
+            archive.writestr(name, code)
+    return buffer.getvalue()
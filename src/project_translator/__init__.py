@@ -0,0 +1,3 @@
+"""
+Whole-project translation module
+"""
@@ -0,0 +1,339 @@
+import ast
+import hashlib
+import os
+import sqlite3
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.java_generator.units import module_class_name as unit_class_name
+from src.python_analyzer import ir
+from src.python_analyzer.analyzer import PythonAnalyzer
+from src.python_analyzer.type_inference import UNKNOWN, ImportedSymbol, PyType, TypeInfo, annotation_source
+from src.utils.build_info import translator_version
+from src.utils.mapping_registry import get_registry
+from src.utils.source_file import MAX_SOURCE_BYTES, MappedSource, SourceTooLarge
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS modules (name TEXT PRIMARY KEY, path TEXT NOT NULL, "
+    "mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, digest TEXT NOT NULL, "
+    "java_class TEXT NOT NULL, unit_class TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS symbols (module TEXT NOT NULL, name TEXT NOT NULL, "
+    "stub BLOB NOT NULL, PRIMARY KEY (module, name))",
+)
+
+# Body of every stubbed function and empty class
+_ELLIPSIS_BODY = tuple(ir.from_ast(stmt) for stmt in ast.parse("...").body)
+
+# Index task: (source path, Java class, size limit, digest already indexed)
+IndexTask = Tuple[str, str, Optional[int], Optional[str]]
+
+# Indexed module: (digest, module functions class, (name, serialized stub) pairs),
+# the last two None when the indexed digest is still current
+IndexedModule = Optional[Tuple[str, Optional[str], Optional[List[Tuple[str, bytes]]]]]
+
+
+def _format() -> str:
+    """Identifies what the stored stubs depend on: translator, Python grammar and mappings."""
+    return f"{translator_version()}:{sys.version_info[0]}.{sys.version_info[1]}:{get_registry().fingerprint}"
+
+
+def module_name(path: str, relative_path: str) -> str:
+    """
+    Derives the dotted name a module is imported by.
+
+    The relative path below the translated directory gives the name, and
+    the directory itself and its parents are prepended for as long as
+    they are packages, like Python resolves them.
+
+    Args:
+        path: Path of the module
+        relative_path: Its path relative to the translated directory
+
+    Returns:
+        Dotted module name, the package name for an ``__init__.py``
+    """
+    parts = os.path.splitext(os.path.normpath(relative_path))[0].split(os.sep)
+    if parts[-1] == '__init__':
+        parts.pop()
+    root = os.path.abspath(path)
+    for _ in range(relative_path.count(os.sep) + 1):
+        root = os.path.dirname(root)
+    while os.path.isfile(os.path.join(root, '__init__.py')):
+        parts.insert(0, os.path.basename(root))
+        root = os.path.dirname(root)
+    return '.'.join(parts)
+
+
+def _replace(node: ir.Node, **changes) -> ir.Node:
+    """Returns a copy of an IR node with some fields replaced."""
+    fields = {name: getattr(node, name) for name in node._fields}
+    fields.update(changes)
+    return type(node)(**fields)
+
+
+def _annotation(py_type: PyType, classes: Iterable[str]) -> ir.Node:
+    """Returns an annotation expression denoting an inferred type."""
+    return ir.from_ast(ast.parse(annotation_source(py_type, classes), mode='eval').body)
+
+
+def _function_stub(types: TypeInfo, node: ir.FunctionDef) -> ir.FunctionDef:
+    """Stubs a function or method, annotating its inferred parameter and return types."""
+    scope = types.function_scope(node)
+    params = dict(scope.params)
+
+    def annotate(arg: ir.arg) -> ir.arg:
+        arg_type = params.get(arg.arg, UNKNOWN)
+        if arg.annotation is not None or arg_type == UNKNOWN:
+            return arg
+        return _replace(arg, annotation=_annotation(arg_type, types.classes))
+
+    args = _replace(node.args, posonlyargs=tuple(map(annotate, node.args.posonlyargs)),
+                    args=tuple(map(annotate, node.args.args)))
+    returns = node.returns
+    if returns is None:
+        returns = _annotation(scope.return_type or UNKNOWN, types.classes)
+    return _replace(node, args=args, body=_ELLIPSIS_BODY, returns=returns)
+
+
+def _class_stub(types: TypeInfo, node: ir.ClassDef) -> ir.ClassDef:
+    """Stubs a class as annotated field declarations followed by its stubbed methods."""
+    fields = tuple(
+        ir.from_ast(ast.parse(f"{field}: {annotation_source(field_type, types.classes)}").body[0])
+        for field, field_type in types.class_scope(node).fields.items()
+    )
+    methods = tuple(_function_stub(types, item) for item in node.body if isinstance(item, ir.FunctionDef))
+    return _replace(node, body=fields + methods or _ELLIPSIS_BODY)
+
+
+def module_stubs(tree: ir.Node) -> Iterator[Tuple[str, ir.stmt]]:
+    """
+    Reduces a module to the stubs of the definitions other modules can
+    import, with every type inferred for their signatures written as an
+    annotation.
+
+    Args:
+        tree: The module IR
+
+    Yields:
+        (name, stub) pairs: FunctionDef and ClassDef stubs, and an
+        AnnAssign for every module variable
+    """
+    tree = ir.from_ast(tree)
+    types = TypeInfo(tree)
+    defined = set(types.functions) | set(types.classes)
+    for stmt in tree.body:
+        if isinstance(stmt, ir.FunctionDef) and types.functions.get(stmt.name) is stmt:
+            yield stmt.name, _function_stub(types, stmt)
+        elif isinstance(stmt, ir.ClassDef) and types.classes.get(stmt.name) is stmt:
+            yield stmt.name, _class_stub(types, stmt)
+    for name, value_type in types.module.env.items():
+        if name not in defined and name in types.module_first_binding:
+            annotation = annotation_source(value_type, types.classes)
+            yield name, ir.from_ast(ast.parse(f"{name}: {annotation}").body[0])
+
+
+def index_module(task: IndexTask) -> IndexedModule:
+    """
+    Computes the index entry of one module, in a worker process.
+
+    Args:
+        task: (source path, Java class, size limit, digest already indexed)
+
+    Returns:
+        The module's digest, then its module functions class and
+        serialized stubs, which are None when the digest is unchanged;
+        a module that cannot be parsed has no stubs, and None is returned
+        for a module that cannot be read or exceeds the size limit
+    """
+    path, java_class, max_bytes, indexed_digest = task
+    try:
+        with MappedSource.open(path, max_bytes) as source:
+            digest = hashlib.sha256(source.buffer).hexdigest()
+            if digest == indexed_digest:
+                return digest, None, None
+            try:
+                tree = PythonAnalyzer().parse(source.buffer)
+            except ValueError:
+                return digest, java_class, []
+    except (OSError, SourceTooLarge):
+        return None
+    stubs = [(name, ir.dumps(stub)) for name, stub in module_stubs(tree)]
+    return digest, unit_class_name(tree, java_class), stubs
+
+
+class SymbolIndex:
+    """
+    Persistent index of the classes, functions and module variables of a
+    project's modules, with their inferred signatures.
+
+    The index is a SQLite database holding one stub per definition as
+    serialized IR. update() re-indexes only the modules whose size or
+    modification time changed and whose content hash differs, so repeated
+    runs over a large project only parse what was edited. Translating a
+    module resolves its imports through the index instead of parsing the
+    modules it depends on.
+
+    The connection is opened on first use, so an index can be handed to
+    worker processes before it is updated. Each process or thread should
+    use its own instance.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._modules: Dict[str, Optional[Dict[str, ImportedSymbol]]] = {}
+
+    def __enter__(self) -> 'SymbolIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the database connection; the index reopens it when used again."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Opens the database, discarding entries written by an incompatible translator."""
+        if self._db is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30)
+            with db:
+                for statement in _SCHEMA:
+                    db.execute(statement)
+                row = db.execute("SELECT value FROM meta WHERE key = 'format'").fetchone()
+                if row is None or row[0] != _format():
+                    db.execute("DELETE FROM symbols")
+                    db.execute("DELETE FROM modules")
+                    db.execute("INSERT OR REPLACE INTO meta VALUES ('format', ?)", (_format(),))
+            self._db = db
+        return self._db
+
+    def update(self, modules: Iterable[Tuple[str, str, str]],
+               map: Callable[..., Iterable[IndexedModule]] = map,
+               max_bytes: Optional[int] = MAX_SOURCE_BYTES) -> Dict[str, int]:
+        """
+        Brings the index up to date with the given modules.
+
+        Unchanged files are recognized by their size and modification
+        time without being read; files that were touched but kept their
+        content only have their hash recomputed. Modules whose file no
+        longer exists are dropped.
+
+        Args:
+            modules: (path, dotted module name, Java class) triples
+            map: Map function running index_module over the stale
+                modules, e.g. a process pool's map
+            max_bytes: Modules larger than this are left out of the index
+
+        Returns:
+            Counts of indexed, unchanged and removed modules
+        """
+        db = self._connection()
+        self._modules.clear()
+        known = {name: (path, mtime_ns, size, digest) for name, path, mtime_ns, size, digest
+                 in db.execute("SELECT name, path, mtime_ns, size, digest FROM modules")}
+        stale = []
+        unchanged = 0
+        for path, name, java_class in modules:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Reported as a failure by the translation
+            entry = known.get(name)
+            if entry is not None and entry[0] == path and entry[1:3] == (stat.st_mtime_ns, stat.st_size):
+                unchanged += 1
+                continue
+            indexed_digest = entry[3] if entry is not None and entry[0] == path else None
+            stale.append((path, name, java_class, stat, indexed_digest))
+
+        tasks = [(path, java_class, max_bytes, indexed_digest)
+                 for path, _, java_class, _, indexed_digest in stale]
+        indexed = 0
+        with db:
+            for (path, name, java_class, stat, _), result in zip(stale, map(index_module, tasks)):
+                if result is None:
+                    continue
+                digest, unit_class, stubs = result
+                if stubs is None:
+                    db.execute("UPDATE modules SET mtime_ns = ?, size = ? WHERE name = ?",
+                               (stat.st_mtime_ns, stat.st_size, name))
+                    unchanged += 1
+                    continue
+                db.execute("INSERT OR REPLACE INTO modules VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           (name, path, stat.st_mtime_ns, stat.st_size, digest, java_class, unit_class))
+                db.execute("DELETE FROM symbols WHERE module = ?", (name,))
+                db.executemany("INSERT INTO symbols VALUES (?, ?, ?)",
+                               [(name, symbol, stub) for symbol, stub in stubs])
+                indexed += 1
+            removed = [name for name, (path, *_) in known.items() if not os.path.exists(path)]
+            for name in removed:
+                db.execute("DELETE FROM symbols WHERE module = ?", (name,))
+                db.execute("DELETE FROM modules WHERE name = ?", (name,))
+        return {'indexed': indexed, 'unchanged': unchanged, 'removed': len(removed)}
+
+    def symbols(self, module: str) -> Optional[Dict[str, ImportedSymbol]]:
+        """
+        Returns the importable definitions of an indexed module.
+
+        Args:
+            module: Dotted module name
+
+        Returns:
+            Symbols keyed by name, or None when the module is not indexed
+        """
+        if module not in self._modules:
+            db = self._connection()
+            row = db.execute("SELECT java_class, unit_class FROM modules WHERE name = ?", (module,)).fetchone()
+            symbols = None
+            if row is not None:
+                symbols = {}
+                for name, stub in db.execute("SELECT name, stub FROM symbols WHERE module = ?", (module,)):
+                    try:
+                        symbols[name] = ImportedSymbol(module, name, row[0], row[1], ir.loads(stub))
+                    except ValueError:
+                        continue  # Written by another Python version
+            self._modules[module] = symbols
+        return self._modules[module]
+
+    def resolve_imports(self, tree: ir.Node, module: str = '', is_package: bool = False) -> Dict[str, ImportedSymbol]:
+        """
+        Resolves the names a module imports from other indexed modules.
+
+        Top-level ``from module import name`` statements are resolved,
+        relative ones included, and ``*`` imports every public name.
+        Names from modules outside the index are left out.
+
+        Args:
+            tree: The importing module's IR
+            module: Dotted name of the importing module
+            is_package: Whether the importing module is an ``__init__.py``
+
+        Returns:
+            Imported symbols keyed by the name they are bound to
+        """
+        package = module if is_package else module.rpartition('.')[0]
+        imports: Dict[str, ImportedSymbol] = {}
+        for stmt in ir.from_ast(tree).body:
+            if not isinstance(stmt, ir.ImportFrom):
+                continue
+            source = stmt.module or ''
+            if stmt.level:
+                parts = package.split('.') if package else []
+                if stmt.level - 1 > len(parts):
+                    continue
+                base = '.'.join(parts[:len(parts) - (stmt.level - 1)])
+                source = '.'.join(part for part in (base, source) if part)
+            symbols = self.symbols(source)
+            if not symbols:
+                continue
+            for alias in stmt.names:
+                if alias.name == '*':
+                    imports.update((name, symbol) for name, symbol in symbols.items() if not name.startswith('_'))
+                elif alias.name in symbols:
+                    imports[alias.asname or alias.name] = symbols[alias.name]
+        return imports
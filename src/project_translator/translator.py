@@ -0,0 +1,288 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.java_generator.generator import JavaGenerator
+from src.java_generator.units import generate_units
+from src.project_translator.symbol_index import SymbolIndex, module_name
+from src.python_analyzer.analyzer import PythonAnalyzer
+from src.utils.pass_manager import PassManager
+from src.utils.source_file import MAX_SOURCE_BYTES, MappedSource
+
+# Directories that never contain project sources worth translating
+_SKIPPED_DIRS = {'__pycache__', '.git', '.hg', '.svn', '.tox', '.nox', '.venv', 'venv', 'node_modules'}
+
+# Analyzer/generator pair reused by every file a worker process translates
+_worker_components: Optional[Tuple[PythonAnalyzer, JavaGenerator]] = None
+_worker_options: Optional[Dict[str, Any]] = None
+# Symbol index the worker resolves imports through, if any
+_worker_index: Optional[SymbolIndex] = None
+
+
+def _init_worker(options: Optional[Dict[str, Any]] = None, index_path: Optional[str] = None) -> None:
+    """Create the translator components once per worker process."""
+    global _worker_components, _worker_options, _worker_index
+    _worker_components = (PythonAnalyzer(), JavaGenerator(**(options or {})))
+    _worker_options = options
+    if _worker_index is not None:
+        _worker_index.close()
+    _worker_index = SymbolIndex(index_path) if index_path else None
+
+
+def module_class_name(path: str) -> str:
+    """
+    Derives the Java class name for a Python module.
+    
+    Args:
+        path: Path of the Python module
+        
+    Returns:
+        CamelCase class name, e.g. ``word_count.py`` -> ``WordCount``
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if stem == '__init__':
+        stem = os.path.basename(os.path.dirname(os.path.abspath(path))) or 'package'
+    name = ''.join(part[:1].upper() + part[1:] for part in re.split(r'[^0-9A-Za-z]+', stem) if part)
+    if not name or name[0].isdigit():
+        name = f"Module{name}"
+    return name
+
+
+def collect_sources(paths: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Expands files and directories into the Python modules to translate.
+    
+    Args:
+        paths: Python files or directories to search recursively
+        
+    Returns:
+        Sorted list of (source path, path relative to its root) pairs
+    """
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = [d for d in dirs if d not in _SKIPPED_DIRS and not d.endswith('.egg-info')]
+                for filename in files:
+                    if filename.endswith('.py'):
+                        file_path = os.path.join(root, filename)
+                        sources.append((file_path, os.path.relpath(file_path, path)))
+        else:
+            sources.append((path, os.path.basename(path)))
+    return sorted(set(sources), key=lambda source: (source[1], source[0]))
+
+
+def _output_path(path: str, relative_path: str, split: bool) -> str:
+    """Where a module's Java goes, relative to the output directory: a file, or a directory of units when split."""
+    class_name = module_class_name(path)
+    return os.path.join(os.path.dirname(relative_path), class_name if split else f"{class_name}.java")
+
+
+def _translate_file(task: Tuple[str, str, Optional[str], Optional[int], bool, bool]) -> Dict[str, Any]:
+    """
+    Translates one module inside a worker, isolating any failure to that file.
+    
+    The module is memory-mapped and parsed without being decoded into a
+    Python string; the parser only makes one bytes copy. Split modules are
+    written as one file per class into a directory named after the module.
+    When only the semantic differences are requested, no Java is generated.
+    Names imported from other project modules are resolved through the
+    worker's symbol index, if any.
+    
+    Args:
+        task: (source path, relative path, output directory, size limit,
+            whether to split the module into units, whether to report the
+            semantic differences only)
+        
+    Returns:
+        Dictionary describing the translated module or its error
+    """
+    path, relative_path, output_dir, max_bytes, split, differences_only = task
+    analyzer, generator = _worker_components
+    
+    class_name = module_class_name(path)
+    result: Dict[str, Any] = {
+        'path': path,
+        'class_name': class_name,
+        'output': None,
+        'semantic_differences': [],
+        'error': None,
+    }
+    try:
+        if differences_only:
+            with MappedSource.open(path, max_bytes) as source:
+                result['semantic_differences'] = analyzer.differences_only(source.buffer)
+            return result
+        
+        passes = PassManager()
+        generator.register_passes(passes)
+        with MappedSource.open(path, max_bytes) as source:
+            tree = analyzer.analyze(source.buffer, passes)
+        result['semantic_differences'] = analyzer.get_semantic_differences()
+        if split:
+            imports = None
+            if _worker_index is not None:
+                imports = _worker_index.resolve_imports(tree, module_name(path, relative_path),
+                                                        os.path.basename(path) == '__init__.py')
+            units = generate_units(tree, class_name, _worker_options, imports=imports)
+            if output_dir is None:
+                result['java_files'] = dict(units)
+            else:
+                unit_dir = os.path.join(output_dir, _output_path(path, relative_path, split))
+                os.makedirs(unit_dir, exist_ok=True)
+                for name, code in units:
+                    with open(os.path.join(unit_dir, name), 'w', encoding='utf-8') as f:
+                        f.write(code)
+                result['output'] = unit_dir
+            return result
+        
+        java_code = generator.generate(tree, class_name)
+        if output_dir is None:
+            result['java_code'] = java_code
+        else:
+            # Write from the worker so the Java source never crosses processes
+            output_path = os.path.join(output_dir, _output_path(path, relative_path, split))
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(java_code)
+            result['output'] = output_path
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def _aggregate_differences(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merges per-file semantic differences into one entry per feature.
+    
+    Args:
+        results: Per-file translation results in output order
+        
+    Returns:
+        List of differences, each listing the files it was found in
+    """
+    aggregated: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        for difference in result['semantic_differences']:
+            entry = aggregated.get(difference['feature'])
+            if entry is None:
+                entry = aggregated[difference['feature']] = dict(difference, files=[])
+            entry['files'].append(result['path'])
+    return list(aggregated.values())
+
+
+def translate_project(paths: Iterable[str], output_dir: Optional[str] = None,
+                      workers: Optional[int] = None,
+                      report_path: Optional[str] = None,
+                      options: Optional[Dict[str, Any]] = None,
+                      max_source_bytes: Optional[int] = MAX_SOURCE_BYTES,
+                      split: bool = False,
+                      differences_only: bool = False,
+                      symbol_index: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Translates every Python module under the given paths.
+    
+    Files are fanned out to a process pool; each worker reuses a single
+    analyzer/generator pair. Results keep the sorted source order no matter
+    which worker finishes first, and a failing file is reported without
+    affecting the others. A module whose output would overwrite that of
+    an earlier one, e.g. ``a/main.py`` and ``b/main.py`` from two source
+    roots, is reported as failed instead of being translated.
+    
+    With a symbol index and split output, the modules are indexed first,
+    on the same pool, and imports between them are then resolved through
+    the index so that calls across modules keep their types and name the
+    classes and static members of the other modules' units.
+    
+    Args:
+        paths: Python files or directories to translate
+        output_dir: Directory receiving one ``.java`` file per module; when
+            omitted the Java code is returned in the report instead
+        workers: Number of worker processes, defaulting to the CPU count;
+            1 translates in the current process
+        report_path: Where to write the JSON report, defaulting to
+            ``translation_report.json`` inside output_dir
+        options: JavaGenerator options, e.g. ``{'optimize_numeric': True}``
+        max_source_bytes: Modules larger than this are reported as failed
+            without being read; None for no limit
+        split: Write one file per class plus a module functions class,
+            in a directory per module, instead of a single file
+        differences_only: Only scan the modules for semantic differences,
+            without generating or writing any Java
+        symbol_index: Path of the SQLite symbol index, created when
+            missing and updated incrementally; only used with split, as
+            a single-class module exposes no static members. None
+            translates every module on its own
+        
+    Returns:
+        Report with per-file results, aggregated semantic differences and
+        a summary
+    """
+    sources = collect_sources(paths)
+    tasks = []
+    collisions: Dict[int, Dict[str, Any]] = {}
+    owners: Dict[str, str] = {}
+    for position, (path, relative_path) in enumerate(sources):
+        if output_dir is not None and not differences_only:
+            target = _output_path(path, relative_path, split)
+            owner = owners.setdefault(os.path.normcase(target), path)
+            if owner != path:
+                collisions[position] = {
+                    'path': path,
+                    'class_name': module_class_name(path),
+                    'output': None,
+                    'semantic_differences': [],
+                    'error': f"{target} is already written for {owner}",
+                }
+                continue
+        tasks.append((path, relative_path, output_dir, max_source_bytes, split, differences_only))
+    workers = workers or os.cpu_count() or 1
+    index_path = symbol_index if split and not differences_only else None
+    modules = [(path, module_name(path, relative_path), module_class_name(path))
+               for path, relative_path in sources] if index_path else []
+    index_stats = None
+    
+    if workers == 1 or len(tasks) <= 1:
+        _init_worker(options, index_path)
+        if index_path:
+            with SymbolIndex(index_path) as index:
+                index_stats = index.update(modules, max_bytes=max_source_bytes)
+        results = [_translate_file(task) for task in tasks]
+    else:
+        # Batch several files per round trip to keep IPC overhead low
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(options, index_path)) as executor:
+            if index_path:
+                with SymbolIndex(index_path) as index:
+                    index_stats = index.update(modules, partial(executor.map, chunksize=chunksize),
+                                               max_source_bytes)
+            results = list(executor.map(_translate_file, tasks, chunksize=chunksize))
+    if collisions:
+        translated = iter(results)
+        results = [collisions.get(position) or next(translated) for position in range(len(sources))]
+    
+    failed = sum(1 for result in results if result['error'])
+    report = {
+        'files': [{key: value for key, value in result.items() if key != 'semantic_differences'}
+                  for result in results],
+        'semantic_differences': _aggregate_differences(results),
+        'summary': {
+            'total': len(results),
+            'translated': len(results) - failed,
+            'failed': failed,
+        },
+    }
+    if index_stats is not None:
+        report['symbol_index'] = index_stats
+    
+    if report_path is None and output_dir is not None:
+        report_path = os.path.join(output_dir, 'translation_report.json')
+    if report_path is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return report
@@ -1,195 +1,344 @@
 import ast
-from typing import Any, Dict, List, Optional, Set
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
 
-class PythonAnalyzer:
-    """
-    Analyzes Python code and creates an intermediate representation
-    that can be used to generate Java code.
+from src.python_analyzer import ir
+from src.utils.pass_manager import PassManager
+from src.utils.source_file import Source
+
+# Semantic differences recorded as soon as a node of the given type is seen
+_NODE_FEATURES = {
+    # Type System Differences
+    ir.AnnAssign: (
+        "Type Annotations",
+        "Optional type hints that don't affect runtime behavior",
+        "Mandatory static type declarations"
+    ),
+    
+    # Data Structures
+    ir.List: (
+        "List Implementation",
+        "Dynamic, resizable lists with mixed types",
+        "ArrayList<T> with fixed type or arrays with fixed size"
+    ),
+    ir.Dict: (
+        "Dictionary/Map Implementation",
+        "Dynamic dict with any hashable type as key",
+        "HashMap<K,V> with specific type parameters"
+    ),
+    ir.Set: (
+        "Set Implementation",
+        "Built-in set type with dynamic sizing",
+        "HashSet<T> with specific type parameter"
+    ),
+    ir.Tuple: (
+        "Tuple Implementation",
+        "Immutable tuple type with mixed types",
+        "No direct equivalent; requires custom class or array"
+    ),
+    
+    # Control Flow
+    ir.For: (
+        "For Loop Syntax",
+        "for item in iterable syntax",
+        "for(Type item : iterable) or traditional for loop"
+    ),
+    ir.With: (
+        "Resource Management",
+        "with statement for context management",
+        "try-with-resources statement"
+    ),
+    
+    # Functional Features
+    ir.ListComp: (
+        "List Comprehension",
+        "Concise list comprehension syntax",
+        "Stream API or explicit loops"
+    ),
+    ir.Lambda: (
+        "Lambda Functions",
+        "Simple lambda expressions",
+        "Lambda expressions with functional interfaces"
+    ),
+    ir.comprehension: (
+        "Comprehensions",
+        "List, set, and dictionary comprehensions",
+        "Stream API with map, filter, and collect"
+    ),
+    
+    # Exception Handling
+    ir.Try: (
+        "Exception Handling",
+        "try/except blocks with optional type checking",
+        "try/catch blocks with mandatory exception types"
+    ),
+    ir.Raise: (
+        "Exception Throwing",
+        "raise statement with any exception type",
+        "throw statement with Exception class hierarchy"
+    ),
+}
+
+# The same table keyed by the classes of the ast module, for raw parse trees
+_AST_NODE_FEATURES = {getattr(ast, node_type.__name__): feature for node_type, feature in _NODE_FEATURES.items()}
+
+# Differences found by inspecting class definitions
+_MULTIPLE_INHERITANCE = (
+    "Multiple Inheritance",
+    "Supports multiple inheritance directly",
+    "Only supports single inheritance with interfaces"
+)
+_SPECIAL_METHODS = (
+    "Special Methods",
+    "Magic methods for operator overloading and behavior customization",
+    "Limited operator overloading through specific method names"
+)
+
+# Differences found by inspecting function definitions
+_DEFAULT_ARGUMENTS = (
+    "Default Arguments",
+    "Supports default argument values",
+    "Requires method overloading for default values"
+)
+_VARIABLE_ARGUMENTS = (
+    "Variable Arguments",
+    "*args and **kwargs for variable arguments",
+    "varargs and no direct equivalent for kwargs"
+)
+_FUNCTION_TYPE_HINTS = (
+    "Function Type Hints",
+    "Optional type hints with -> return annotation",
+    "Mandatory return and parameter types"
+)
+
+# One bit per detectable feature, so the seen features form a bitmask
+_FEATURE_BITS = {
+    feature[0]: 1 << bit
+    for bit, feature in enumerate(list(_NODE_FEATURES.values()) + [
+        _MULTIPLE_INHERITANCE, _SPECIAL_METHODS,
+        _DEFAULT_ARGUMENTS, _VARIABLE_ARGUMENTS, _FUNCTION_TYPE_HINTS,
+    ])
+}
+_CLASS_FEATURES = _FEATURE_BITS[_MULTIPLE_INHERITANCE[0]] | _FEATURE_BITS[_SPECIAL_METHODS[0]]
+_FUNCTION_FEATURES = (_FEATURE_BITS[_DEFAULT_ARGUMENTS[0]] | _FEATURE_BITS[_VARIABLE_ARGUMENTS[0]] |
+                      _FEATURE_BITS[_FUNCTION_TYPE_HINTS[0]])
+
+
+def _walk_ast(node: ast.AST) -> Iterator[ast.AST]:
     """
+    Yields the nodes of a raw parse tree in the same breadth-first order
+    as ast.walk, without a child generator per node.
     
-    def __init__(self):
-        self.semantic_differences: List[Dict[str, str]] = []
-        self._seen_features: Set[str] = set()
+    Args:
+        node: Root of the tree
         
-    def analyze(self, python_code: str) -> ast.AST:
+    Yields:
+        Each node of the tree
+    """
+    todo = deque([node])
+    push = todo.append
+    while todo:
+        node = todo.popleft()
+        for name in node._fields:
+            value = getattr(node, name, None)
+            if isinstance(value, ast.AST):
+                push(value)
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        push(item)
+        yield node
+
+
+class AnalysisContext:
+    """
+    State of one semantic scan: the differences found so far and the
+    features already seen, as a bitmask.
+    
+    Each handler unregisters from the pass manager once its features are
+    recorded, so the traversal ends as soon as every feature has been
+    found and no other analysis shares it.
+    """
+    
+    def __init__(self, passes: PassManager, syntax=ir):
         """
-        Analyzes Python code and returns its AST representation.
+        Registers the scan's handlers on a traversal.
         
         Args:
-            python_code: String containing Python source code
-            
-        Returns:
-            The AST representation of the code
+            passes: The pass manager that will walk the tree
+            syntax: Module defining the tree's node classes: ir, or ast
+                for raw parse trees
         """
-        try:
-            tree = ast.parse(python_code)
-            self.semantic_differences = []  # Reset differences for new analysis
-            self._seen_features = set()    # Reset seen features
-            self._analyze_semantic_differences(tree)
-            return tree
-        except SyntaxError as e:
-            raise ValueError(f"Invalid Python code: {str(e)}")
+        self.semantic_differences: List[Dict[str, str]] = []
+        self._seen_features = 0
+        self._passes = passes
+        self._node_features = _NODE_FEATURES if syntax is ir else _AST_NODE_FEATURES
+        self._function_type = syntax.FunctionDef
+        for node_type in self._node_features:
+            passes.register(node_type, self._analyze_node_feature)
+        passes.register(syntax.ClassDef, self._analyze_class_differences)
+        passes.register(syntax.FunctionDef, self._analyze_function_differences)
             
     def _add_difference(self, feature: str, python: str, java: str) -> None:
         """Add a semantic difference if not already seen."""
-        if feature not in self._seen_features:
+        bit = _FEATURE_BITS[feature]
+        if not self._seen_features & bit:
             self.semantic_differences.append({
                 "feature": feature,
                 "python": python,
                 "java": java
             })
-            self._seen_features.add(feature)
-            
-    def _analyze_semantic_differences(self, tree: ast.AST) -> None:
-        """
-        Analyzes the AST for semantic differences between Python and Java.
+            self._seen_features |= bit
         
-        Args:
-            tree: The AST to analyze
-        """
-        for node in ast.walk(tree):
-            # Type System Differences
-            if isinstance(node, ast.AnnAssign):
-                self._add_difference(
-                    "Type Annotations",
-                    "Optional type hints that don't affect runtime behavior",
-                    "Mandatory static type declarations"
-                )
-            
-            # Data Structures
-            elif isinstance(node, ast.List):
-                self._add_difference(
-                    "List Implementation",
-                    "Dynamic, resizable lists with mixed types",
-                    "ArrayList<T> with fixed type or arrays with fixed size"
-                )
-            elif isinstance(node, ast.Dict):
-                self._add_difference(
-                    "Dictionary/Map Implementation",
-                    "Dynamic dict with any hashable type as key",
-                    "HashMap<K,V> with specific type parameters"
-                )
-            elif isinstance(node, ast.Set):
-                self._add_difference(
-                    "Set Implementation",
-                    "Built-in set type with dynamic sizing",
-                    "HashSet<T> with specific type parameter"
-                )
-            elif isinstance(node, ast.Tuple):
-                self._add_difference(
-                    "Tuple Implementation",
-                    "Immutable tuple type with mixed types",
-                    "No direct equivalent; requires custom class or array"
-                )
-                
-            # Control Flow
-            elif isinstance(node, ast.For):
-                self._add_difference(
-                    "For Loop Syntax",
-                    "for item in iterable syntax",
-                    "for(Type item : iterable) or traditional for loop"
-                )
-            elif isinstance(node, ast.With):
-                self._add_difference(
-                    "Resource Management",
-                    "with statement for context management",
-                    "try-with-resources statement"
-                )
-                
-            # Functional Features
-            elif isinstance(node, ast.ListComp):
-                self._add_difference(
-                    "List Comprehension",
-                    "Concise list comprehension syntax",
-                    "Stream API or explicit loops"
-                )
-            elif isinstance(node, ast.Lambda):
-                self._add_difference(
-                    "Lambda Functions",
-                    "Simple lambda expressions",
-                    "Lambda expressions with functional interfaces"
-                )
-            elif isinstance(node, ast.comprehension):
-                self._add_difference(
-                    "Comprehensions",
-                    "List, set, and dictionary comprehensions",
-                    "Stream API with map, filter, and collect"
-                )
-                
-            # Exception Handling
-            elif isinstance(node, ast.Try):
-                self._add_difference(
-                    "Exception Handling",
-                    "try/except blocks with optional type checking",
-                    "try/catch blocks with mandatory exception types"
-                )
-            elif isinstance(node, ast.Raise):
-                self._add_difference(
-                    "Exception Throwing",
-                    "raise statement with any exception type",
-                    "throw statement with Exception class hierarchy"
-                )
-                
-            # OOP Features
-            elif isinstance(node, ast.ClassDef):
-                self._analyze_class_differences(node)
-                
-            # Function Features
-            elif isinstance(node, ast.FunctionDef):
-                self._analyze_function_differences(node)
+    def _analyze_node_feature(self, node: ir.Node) -> None:
+        """Record the difference associated with a node type; later nodes of that type add nothing."""
+        self._add_difference(*self._node_features[type(node)])
+        self._passes.unregister(type(node), self._analyze_node_feature)
                 
-    def _analyze_class_differences(self, node: ast.ClassDef) -> None:
+    def _analyze_class_differences(self, node: ir.ClassDef) -> None:
         """Analyze class-specific differences."""
         # Check for multiple inheritance
         if len(node.bases) > 1:
-            self._add_difference(
-                "Multiple Inheritance",
-                "Supports multiple inheritance directly",
-                "Only supports single inheritance with interfaces"
-            )
+            self._add_difference(*_MULTIPLE_INHERITANCE)
             
         # Check for special methods
         for item in node.body:
-            if isinstance(item, ast.FunctionDef):
+            if isinstance(item, self._function_type):
                 if item.name.startswith('__') and item.name.endswith('__'):
-                    self._add_difference(
-                        "Special Methods",
-                        "Magic methods for operator overloading and behavior customization",
-                        "Limited operator overloading through specific method names"
-                    )
+                    self._add_difference(*_SPECIAL_METHODS)
                     break
+        
+        if self._seen_features & _CLASS_FEATURES == _CLASS_FEATURES:
+            self._passes.unregister(type(node), self._analyze_class_differences)
                     
-    def _analyze_function_differences(self, node: ast.FunctionDef) -> None:
+    def _analyze_function_differences(self, node: ir.FunctionDef) -> None:
         """Analyze function-specific differences."""
         # Check for default arguments
-        if any(isinstance(d, ast.AST) for d in node.args.defaults):
-            self._add_difference(
-                "Default Arguments",
-                "Supports default argument values",
-                "Requires method overloading for default values"
-            )
+        if node.args.defaults:
+            self._add_difference(*_DEFAULT_ARGUMENTS)
             
         # Check for *args and **kwargs
         if node.args.vararg or node.args.kwarg:
-            self._add_difference(
-                "Variable Arguments",
-                "*args and **kwargs for variable arguments",
-                "varargs and no direct equivalent for kwargs"
-            )
+            self._add_difference(*_VARIABLE_ARGUMENTS)
             
         # Check for type annotations
         if node.returns or any(a.annotation for a in node.args.args):
-            self._add_difference(
-                "Function Type Hints",
-                "Optional type hints with -> return annotation",
-                "Mandatory return and parameter types"
-            )
+            self._add_difference(*_FUNCTION_TYPE_HINTS)
+        
+        if self._seen_features & _FUNCTION_FEATURES == _FUNCTION_FEATURES:
+            self._passes.unregister(type(node), self._analyze_function_differences)
+
+
+class PythonAnalyzer:
+    """
+    Analyzes Python code and creates an intermediate representation
+    that can be used to generate Java code.
+    
+    Source is parsed and converted to the immutable IR of
+    src.python_analyzer.ir once; analysis, type inference and generation
+    all run on that tree.
+    
+    The analyzer holds no state of its own: every analysis runs in a fresh
+    AnalysisContext, so one instance can serve any number of threads.
+    get_semantic_differences() reports the last analysis of the calling
+    thread.
+    """
+    
+    def __init__(self):
+        self._last = threading.local()
+        
+    @property
+    def semantic_differences(self) -> List[Dict[str, str]]:
+        """The differences found by the calling thread's last analysis."""
+        return getattr(self._last, 'differences', [])
+        
+    def analyze(self, python_code: Source, passes: Optional[PassManager] = None) -> ir.Node:
+        """
+        Analyzes Python code and returns its intermediate representation.
+        
+        Args:
+            python_code: Python source code, see parse()
+            passes: Optional pass manager whose other handlers should run
+                during the same traversal as the semantic analysis
+            
+        Returns:
+            The IR of the code
+        """
+        tree = self.parse(python_code)
+        self.analyze_tree(tree, passes)
+        return tree
+        
+    def parse(self, python_code: Source) -> ir.Node:
+        """
+        Parses Python code into the IR without analyzing it.
+        
+        Args:
+            python_code: String containing Python source code, or its
+                bytes in any buffer; a memory-mapped file is parsed
+                without being decoded into a string, though the parser
+                makes one bytes copy of it
+            
+        Returns:
+            The IR of the code
+        """
+        return ir.from_ast(self._parse_ast(python_code))
+        
+    @staticmethod
+    def _parse_ast(python_code: Source) -> ast.AST:
+        """Parses Python code with the ast module, reporting syntax errors as ValueError."""
+        try:
+            return ast.parse(python_code)
+        except SyntaxError as e:
+            raise ValueError(f"Invalid Python code: {str(e)}")
+            
+    def analyze_tree(self, tree: ir.Node, passes: Optional[PassManager] = None) -> List[Dict[str, str]]:
+        """
+        Analyzes an already parsed tree for semantic differences.
+        
+        Args:
+            tree: The IR to analyze; an ast tree is converted first
+            passes: Optional pass manager whose other handlers should run
+                during the same traversal as the semantic analysis
+            
+        Returns:
+            List of dictionaries containing semantic differences
+        """
+        if passes is None:
+            passes = PassManager()
+        context = AnalysisContext(passes)
+        passes.run(ir.from_ast(tree))
+        self._last.differences = context.semantic_differences
+        return context.semantic_differences
+        
+    def differences_only(self, python_code: Source) -> List[Dict[str, str]]:
+        """
+        Finds the semantic differences of Python code without building
+        the IR, for lint-style checks that never generate Java.
+        
+        The raw parse tree is scanned directly and the scan stops as soon
+        as every detectable feature has been found. The differences are
+        the same, in the same order, as after analyze().
+        
+        Args:
+            python_code: Python source code, see parse()
+            
+        Returns:
+            List of dictionaries containing semantic differences
+        """
+        tree = self._parse_ast(python_code)
+        passes = PassManager()
+        context = AnalysisContext(passes, syntax=ast)
+        passes.run(tree, walk=_walk_ast)
+        self._last.differences = context.semantic_differences
+        return context.semantic_differences
                 
     def get_semantic_differences(self) -> List[Dict[str, str]]:
         """
         Returns the list of semantic differences found during analysis.
         
         Returns:
-            List of dictionaries containing semantic differences
+            List of dictionaries containing semantic differences found by
+            the calling thread's last analysis
         """
         return self.semantic_differences 
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""
+Compact, immutable intermediate representation between analysis and
+generation.
+
+``from_ast`` converts a parsed module once into ``__slots__`` nodes that
+mirror the ``ast`` classes, with the same class and field names, so code
+dispatching on ``ast`` node types only swaps the module it refers to.
+Compared to the ``ast`` tree, the IR:
+
+* keeps fields in slots instead of a per-node ``__dict__`` and drops
+  line and column attributes,
+* stores sequences as tuples, shares one instance of every field-less
+  node (``Load``, ``Add``, ...) and interns identifiers,
+* records per class which fields hold child nodes, so traversals skip
+  identifiers and constants,
+* cannot be mutated, so a tree can be shared between threads and cache
+  entries,
+* serializes to compact bytes with ``dumps``/``loads``.
+"""
+import _ast
+import ast
+import marshal
+import re
+import sys
+# Generics stay qualified: the node classes mirrored below shadow Dict, List, Tuple
+import typing
+from collections import deque
+from typing import Any, Callable, Iterator
+
+# ASDL field types holding plain values rather than child nodes
+_PRIMITIVE_TYPES = frozenset(('identifier', 'string', 'constant', 'int'))
+
+_FIELD_PATTERN = re.compile(r'(\w+)[*?]? (\w+)')
+
+# Serialized trees are only readable by the Python version that wrote them,
+# since the node classes follow its grammar. Marshal format 2 writes no
+# back-references, so equal trees always produce equal bytes.
+_FORMAT = ('ir', 1) + tuple(sys.version_info[:2])
+_MARSHAL_VERSION = 2
+
+
+class Node:
+    """
+    Base class of the IR node classes.
+
+    Nodes compare by identity, so they can key per-tree side tables such
+    as inferred types and scopes, and raise AttributeError on assignment.
+    """
+    __slots__ = ()
+    _fields: typing.Tuple[str, ...] = ()
+    # Fields that hold child nodes, None or tuples of them
+    _child_fields: typing.Tuple[str, ...] = ()
+    _setters: typing.Tuple[typing.Tuple[str, Callable[[Any, Any], None]], ...] = ()
+    # Whether string fields are identifiers worth interning
+    _interned = True
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        fields = self._fields
+        if len(args) > len(fields):
+            raise TypeError(f"{type(self).__name__} takes at most {len(fields)} positional arguments")
+        values = list(args) + [kwargs.pop(name, None) for name in fields[len(args):]]
+        if kwargs:
+            raise TypeError(f"{type(self).__name__} has no field {next(iter(kwargs))!r}")
+        for (_, setter), value in zip(self._setters, values):
+            setter(self, tuple(value) if isinstance(value, list) else value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} nodes are immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} nodes are immutable")
+
+    def __reduce__(self):
+        return loads, (dumps(self),)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+# IR class of every ast class, abstract ones included
+_IR_CLASSES: typing.Dict[type, typing.Type[Node]] = {ast.AST: Node}
+
+# The shared instance of each field-less node class
+_SINGLETONS: typing.Dict[typing.Type[Node], Node] = {}
+
+
+def _child_fields(ast_class: type) -> typing.Tuple[str, ...]:
+    """Returns the fields of a node class that can hold child nodes."""
+    signature = (ast_class.__doc__ or '').split('\n')[0]
+    types = {field: field_type for field_type, field in _FIELD_PATTERN.findall(signature)}
+    return tuple(field for field in ast_class._fields if types.get(field) not in _PRIMITIVE_TYPES)
+
+
+def _node_class(ast_class: type) -> typing.Type[Node]:
+    """Returns the IR class mirroring an ast class, creating it once."""
+    ir_class = _IR_CLASSES.get(ast_class)
+    if ir_class is None:
+        base = _node_class(ast_class.__bases__[0])
+        fields = tuple(ast_class._fields)
+        ir_class = type(ast_class.__name__, (base,), {
+            '__slots__': fields,
+            '__doc__': ast_class.__doc__,
+            '__module__': __name__,
+            '_fields': fields,
+            '_child_fields': _child_fields(ast_class),
+        })
+        ir_class._setters = tuple((name, ir_class.__dict__[name].__set__) for name in fields)
+        ir_class._interned = ast_class is not ast.Constant
+        _IR_CLASSES[ast_class] = ir_class
+    return ir_class
+
+
+# Mirror every concrete and abstract node class of the running grammar,
+# skipping the deprecated aliases defined in ast.py itself
+for _name, _value in vars(_ast).items():
+    if isinstance(_value, type) and issubclass(_value, ast.AST):
+        _ir_class = _node_class(_value)
+        globals()[_name] = _ir_class
+        if not _ir_class._fields and _ir_class.__doc__ == _name:
+            _SINGLETONS[_ir_class] = object.__new__(_ir_class)
+del _name, _value, _ir_class
+
+# Stable numbering of the concrete classes used by the serialized form
+_CLASSES: typing.Tuple[typing.Type[Node], ...] = tuple(sorted(
+    (cls for cls in _IR_CLASSES.values() if cls._fields or cls in _SINGLETONS),
+    key=lambda cls: cls.__name__))
+_CLASS_INDEX: typing.Dict[typing.Type[Node], int] = {cls: index for index, cls in enumerate(_CLASSES)}
+
+_intern = sys.intern
+
+
+def from_ast(node: Any) -> Node:
+    """
+    Converts an ast tree to the IR.
+
+    Args:
+        node: Root of the ast tree; IR nodes are returned unchanged
+
+    Returns:
+        The root of the equivalent IR tree
+    """
+    if isinstance(node, Node):
+        return node
+    ir_class = _IR_CLASSES[type(node)]
+    singleton = _SINGLETONS.get(ir_class)
+    if singleton is not None:
+        return singleton
+    converted = object.__new__(ir_class)
+    interned = ir_class._interned
+    for name, setter in ir_class._setters:
+        value = getattr(node, name, None)
+        if isinstance(value, ast.AST):
+            value = from_ast(value)
+        elif isinstance(value, list):
+            value = tuple([from_ast(item) if isinstance(item, ast.AST) else
+                           _intern(item) if type(item) is str else item for item in value])
+        elif interned and type(value) is str:
+            value = _intern(value)
+        setter(converted, value)
+    return converted
+
+
+def iter_child_nodes(node: Node) -> Iterator[Node]:
+    """
+    Yields the direct children of a node in field order, like
+    ast.iter_child_nodes.
+
+    Args:
+        node: The parent node
+
+    Yields:
+        Each child node
+    """
+    for name in node._child_fields:
+        value = getattr(node, name)
+        if type(value) is tuple:
+            for item in value:
+                if item is not None:
+                    yield item
+        elif value is not None:
+            yield value
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """
+    Yields a node and all its descendants breadth-first, in the same order
+    as ast.walk.
+
+    Args:
+        node: Root of the subtree
+
+    Yields:
+        Each node of the subtree
+    """
+    todo = deque([node])
+    while todo:
+        node = todo.popleft()
+        todo.extend(iter_child_nodes(node))
+        yield node
+
+
+def dumps(node: Node) -> bytes:
+    """
+    Serializes a subtree to bytes.
+
+    Nodes are encoded as lists starting with their class number, sequences
+    as tuples, so the whole tree goes through a single marshal call. Equal
+    subtrees serialize to equal bytes, which also makes the result usable
+    as a structural fingerprint.
+
+    Args:
+        node: Root of the subtree
+
+    Returns:
+        The serialized subtree
+    """
+    return marshal.dumps((_FORMAT, _encode(node)), _MARSHAL_VERSION)
+
+
+def loads(data: bytes) -> Node:
+    """
+    Rebuilds a subtree serialized by dumps().
+
+    Args:
+        data: Bytes returned by dumps()
+
+    Returns:
+        Root of the rebuilt subtree
+
+    Raises:
+        ValueError: If the data is corrupt or was written by another
+            Python version
+    """
+    try:
+        header, payload = marshal.loads(data)
+    except (EOFError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid serialized IR: {e}")
+    if header != _FORMAT:
+        raise ValueError("Serialized IR was written by an incompatible version")
+    return _decode(payload)
+
+
+def _encode(node: Node) -> typing.List[Any]:
+    """Encodes a node as a list of its class number and field values."""
+    encoded: typing.List[Any] = [_CLASS_INDEX[type(node)]]
+    for name, _ in node._setters:
+        value = getattr(node, name)
+        if isinstance(value, Node):
+            value = _encode(value)
+        elif type(value) is tuple:
+            value = tuple([_encode(item) if isinstance(item, Node) else item for item in value])
+        encoded.append(value)
+    return encoded
+
+
+def _decode(encoded: typing.List[Any]) -> Node:
+    """Rebuilds a node encoded by _encode()."""
+    ir_class = _CLASSES[encoded[0]]
+    singleton = _SINGLETONS.get(ir_class)
+    if singleton is not None:
+        return singleton
+    node = object.__new__(ir_class)
+    interned = ir_class._interned
+    for (_, setter), value in zip(ir_class._setters, encoded[1:]):
+        if type(value) is list:
+            value = _decode(value)
+        elif type(value) is tuple:
+            value = tuple([_decode(item) if type(item) is list else
+                           _intern(item) if type(item) is str else item for item in value])
+        elif interned and type(value) is str:
+            value = _intern(value)
+        setter(node, value)
+    return node
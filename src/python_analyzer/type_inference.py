@@ -0,0 +1,1317 @@
+import ast
+from contextlib import contextmanager
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+from src.python_analyzer import ir
+from src.utils.mapping_registry import get_registry
+
+
+class PyType(NamedTuple):
+    """
+    Inferred Python type: a base name plus type arguments for containers,
+    e.g. ``PyType('dict', (STR, INT))`` for ``dict[str, int]``.
+    """
+    name: str
+    args: Tuple['PyType', ...] = ()
+
+
+UNKNOWN = PyType('object')
+BOTTOM = PyType('?')  # Element type of an empty literal, refined by later use
+INT = PyType('int')
+FLOAT = PyType('float')
+STR = PyType('str')
+BOOL = PyType('bool')
+NONE = PyType('None')
+RANGE = PyType('range')
+FILE = PyType('file')
+FUNCTION = PyType('function')
+EXCEPTION = PyType('Exception')
+
+_NUMERIC_RANK = {'bool': 0, 'int': 1, 'float': 2}
+_VALUE_TYPES = ('int', 'float', 'bool')
+
+# Builtins that accept a primitive array as their only argument
+_ARRAY_REDUCTIONS = ('len', 'sum', 'min', 'max')
+
+# Nodes a literal may consist of to initialize a static table
+_CONSTANT_NODES = (ir.Constant, ir.List, ir.Set, ir.Dict, ir.UnaryOp, ir.USub, ir.UAdd, ir.Load)
+
+# Builtins and methods that only read the collection passed to or called on them
+_READING_BUILTINS = frozenset((
+    'len', 'sum', 'min', 'max', 'any', 'all', 'sorted', 'list', 'set', 'dict', 'tuple',
+    'frozenset', 'str', 'print', 'enumerate', 'zip', 'reversed', 'iter', 'isinstance',
+))
+_READING_METHODS = frozenset((
+    'get', 'keys', 'values', 'items', 'copy', 'count', 'index', 'union', 'intersection',
+    'difference', 'symmetric_difference', 'issubset', 'issuperset', 'isdisjoint',
+))
+
+
+def list_of(element: PyType) -> PyType:
+    """Returns the type of a list holding the given elements."""
+    return PyType('list', (element,))
+
+
+def set_of(element: PyType) -> PyType:
+    """Returns the type of a set holding the given elements."""
+    return PyType('set', (element,))
+
+
+def dict_of(key: PyType, value: PyType) -> PyType:
+    """Returns the type of a dict with the given key and value types."""
+    return PyType('dict', (key, value))
+
+
+def iterator_of(element: PyType) -> PyType:
+    """Returns the type of a lazily produced sequence of elements."""
+    return PyType('iterator', (element,))
+
+
+def join(a: Optional[PyType], b: Optional[PyType]) -> PyType:
+    """
+    Computes the least common type of two types.
+
+    ``None`` stands for "no binding yet" and BOTTOM for the element of an
+    empty container; both are absorbed by the other operand.
+
+    Args:
+        a: First type
+        b: Second type
+
+    Returns:
+        The joined type, UNKNOWN when the types have nothing in common
+    """
+    if a is None or a == BOTTOM:
+        return b if b is not None else BOTTOM
+    if b is None or b == BOTTOM or a == b:
+        return a
+    if a.name in _NUMERIC_RANK and b.name in _NUMERIC_RANK:
+        return a if _NUMERIC_RANK[a.name] > _NUMERIC_RANK[b.name] else b
+    if a == NONE:
+        return b if b.name not in _VALUE_TYPES else UNKNOWN
+    if b == NONE:
+        return a if a.name not in _VALUE_TYPES else UNKNOWN
+    if a.name == b.name and len(a.args) == len(b.args):
+        return PyType(a.name, tuple(join(x, y) for x, y in zip(a.args, b.args)))
+    return UNKNOWN
+
+
+def is_numeric_list(py_type: PyType) -> bool:
+    """Whether a type is a list of ints or floats."""
+    return py_type.name == 'list' and py_type.args[0] in (INT, FLOAT)
+
+
+def is_array_literal(node: ir.Node) -> bool:
+    """
+    Whether an expression can initialize a primitive array: a list literal
+    or a zero-filled ``[0] * n``.
+    """
+    if isinstance(node, ir.List):
+        return not any(isinstance(elt, ir.Starred) for elt in node.elts)
+    if isinstance(node, ir.BinOp) and isinstance(node.op, ir.Mult):
+        for fill, _ in ((node.left, node.right), (node.right, node.left)):
+            if (isinstance(fill, ir.List) and len(fill.elts) == 1
+                    and isinstance(fill.elts[0], ir.Constant)
+                    and fill.elts[0].value == 0 and not isinstance(fill.elts[0].value, bool)):
+                return True
+    return False
+
+
+def is_constant_literal(node: ir.Node) -> bool:
+    """
+    Whether an expression is a list, set or dict literal built only from
+    constants and nested literals, which can initialize a static table.
+    """
+    return (isinstance(node, (ir.List, ir.Set, ir.Dict))
+            and all(isinstance(inner, _CONSTANT_NODES) for inner in ir.walk(node))
+            and all(key is not None for inner in ir.walk(node) if isinstance(inner, ir.Dict)
+                    for key in inner.keys))
+
+
+def string_append(stmt: ir.Node) -> Optional[Tuple[str, Tuple[ir.Node, ...]]]:
+    """
+    Recognizes ``s += x`` and ``s = s + x + ...`` appending to a variable.
+
+    Args:
+        stmt: Any statement
+
+    Returns:
+        The variable and the appended operands in order, or None
+    """
+    if isinstance(stmt, ir.AugAssign):
+        if isinstance(stmt.op, ir.Add) and isinstance(stmt.target, ir.Name):
+            return stmt.target.id, (stmt.value,)
+        return None
+    if not (isinstance(stmt, ir.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ir.Name)):
+        return None
+    operands: List[ir.Node] = []
+    value = stmt.value
+    while isinstance(value, ir.BinOp) and isinstance(value.op, ir.Add):
+        operands.append(value.right)
+        value = value.left
+    if operands and isinstance(value, ir.Name) and value.id == stmt.targets[0].id:
+        return value.id, tuple(reversed(operands))
+    return None
+
+
+def element_type(iterable: PyType) -> PyType:
+    """
+    Returns the type produced by iterating over a value.
+
+    Args:
+        iterable: Type of the iterated value
+
+    Returns:
+        The element type, UNKNOWN when it cannot be determined
+    """
+    name = iterable.name
+    if name in ('list', 'set', 'iterator', 'dict') and iterable.args:
+        element = iterable.args[0]
+        return UNKNOWN if element == BOTTOM else element
+    if name == 'tuple':
+        element = None
+        for arg in iterable.args:
+            element = join(element, arg)
+        return element if element not in (None, BOTTOM) else UNKNOWN
+    if name == 'items':
+        return PyType('tuple', iterable.args)
+    if name in ('str', 'file'):
+        return STR
+    if name == 'range':
+        return INT
+    return UNKNOWN
+
+
+# Builtins whose result type does not depend on their arguments
+_BUILTIN_RESULTS = {
+    'len': INT, 'str': STR, 'int': INT, 'float': FLOAT, 'bool': BOOL,
+    'input': STR, 'repr': STR, 'chr': STR, 'ord': INT, 'hash': INT,
+    'id': INT, 'round': INT, 'isinstance': BOOL, 'callable': BOOL,
+    'any': BOOL, 'all': BOOL, 'print': NONE, 'open': FILE, 'range': RANGE,
+    'format': STR, 'hex': STR, 'bin': STR, 'oct': STR,
+}
+
+# Methods of str and the type they return
+_STR_METHODS = {
+    'lower': STR, 'upper': STR, 'strip': STR, 'lstrip': STR, 'rstrip': STR,
+    'replace': STR, 'join': STR, 'format': STR, 'title': STR,
+    'capitalize': STR, 'casefold': STR, 'center': STR, 'ljust': STR,
+    'rjust': STR, 'zfill': STR, 'swapcase': STR,
+    'split': list_of(STR), 'rsplit': list_of(STR), 'splitlines': list_of(STR),
+    'startswith': BOOL, 'endswith': BOOL, 'isdigit': BOOL, 'isalpha': BOOL,
+    'isalnum': BOOL, 'isspace': BOOL, 'islower': BOOL, 'isupper': BOOL,
+    'isnumeric': BOOL, 'find': INT, 'rfind': INT, 'index': INT,
+    'rindex': INT, 'count': INT,
+}
+
+# Python annotation names and the types they denote
+_ANNOTATION_NAMES = {
+    'int': INT, 'float': FLOAT, 'str': STR, 'bool': BOOL, 'None': NONE,
+    'Any': UNKNOWN, 'object': UNKNOWN,
+    'list': list_of(UNKNOWN), 'List': list_of(UNKNOWN),
+    'set': set_of(UNKNOWN), 'Set': set_of(UNKNOWN),
+    'dict': dict_of(UNKNOWN, UNKNOWN), 'Dict': dict_of(UNKNOWN, UNKNOWN),
+    'tuple': PyType('tuple'), 'Tuple': PyType('tuple'),
+    'Iterable': iterator_of(UNKNOWN), 'Iterator': iterator_of(UNKNOWN),
+    'Sequence': list_of(UNKNOWN),
+}
+
+
+def annotation_source(py_type: PyType, classes: Iterable[str] = ()) -> str:
+    """
+    Writes a type as a Python annotation that TypeInfo.annotation_type()
+    reads back as the same type.
+
+    Args:
+        py_type: The inferred type
+        classes: Class names the annotation may refer to
+
+    Returns:
+        Annotation source, ``object`` for types annotations cannot express
+    """
+    name, args = py_type
+    if name in ('list', 'set') and args:
+        return f"{name}[{annotation_source(args[0], classes)}]"
+    if name == 'iterator' and args:
+        return f"Iterator[{annotation_source(args[0], classes)}]"
+    if name == 'dict' and len(args) == 2:
+        return f"dict[{annotation_source(args[0], classes)}, {annotation_source(args[1], classes)}]"
+    if name == 'tuple' and args:
+        return f"tuple[{', '.join(annotation_source(arg, classes) for arg in args)}]"
+    if name in _ANNOTATION_NAMES and _ANNOTATION_NAMES[name] == py_type or name in classes:
+        return name
+    return 'object'
+
+
+class ImportedSymbol(NamedTuple):
+    """
+    A definition another module of the project makes importable, as
+    recorded by a symbol index.
+
+    Attributes:
+        module: Dotted name of the defining module
+        name: Name of the definition in that module
+        java_class: Java class translated from the defining module
+        unit_class: Module functions class of the module when it is split
+            into one compilation unit per class
+        stub: The definition with every signature type annotated and
+            bodies reduced to ``...``: a FunctionDef, a ClassDef, or an
+            AnnAssign for a module variable
+    """
+    module: str
+    name: str
+    java_class: str
+    unit_class: str
+    stub: ir.stmt
+
+
+class ScopeTypes:
+    """
+    Inference results of one function, class body or module.
+
+    Attributes:
+        node: The scope's defining node
+        receiver: Name of the ``self`` parameter, for methods
+        params: Parameter names and types excluding the receiver
+        return_type: Joined type of the returned values, for functions
+        fields: Instance attribute types, for classes
+        dependencies: Inferred types of other definitions consulted while
+            inferring this scope, keyed by qualified name
+    """
+
+    def __init__(self, node: ir.Node, parent: Optional['ScopeTypes'] = None,
+                 class_name: Optional[str] = None):
+        self.node = node
+        self.parent = parent
+        self.class_name = class_name
+        self.receiver: Optional[str] = None
+        self.params: List[Tuple[str, PyType]] = []
+        self.return_type: Optional[PyType] = None
+        self.fields: Dict[str, PyType] = {}
+        self.env: Dict[str, PyType] = {}
+        self.dependencies: Dict[str, PyType] = {}
+        self.arrays: Optional[FrozenSet[str]] = None
+        self.builders: Optional[FrozenSet[str]] = None
+        self.reassigned: Optional[FrozenSet[str]] = None
+
+
+class TypeInfo:
+    """
+    Flow-sensitive type inference over a module with scoped symbol tables.
+
+    The module body is inferred eagerly; function and class bodies are
+    inferred on first use and memoized per scope, so every scope is
+    visited at most once and inference stays linear in module size.
+    Within a scope, statements are processed in order, branches are
+    inferred on copies of the environment and joined afterwards.
+
+    Names imported from other modules of the project are typed from the
+    stubs of their symbols, so calls across modules keep their types
+    without the defining modules being parsed again.
+    """
+
+    def __init__(self, tree: ir.Node, imports: Optional[Mapping[str, ImportedSymbol]] = None):
+        self.tree = tree
+        self.imports: Dict[str, ImportedSymbol] = dict(imports or {})
+        self._expression_types: Dict[ir.Node, PyType] = {}
+        self._block_bindings: Dict[int, Dict[str, PyType]] = {}
+        self._scopes: Dict[ir.Node, ScopeTypes] = {}
+        self._in_progress: Set[ir.Node] = set()
+        self._tracking: List[Dict[str, PyType]] = []
+        self._block_stack: List[Dict[str, PyType]] = []
+
+        self.functions: Dict[str, ir.FunctionDef] = {}
+        self.classes: Dict[str, ir.ClassDef] = {}
+        self.module_first_binding: Dict[str, ir.stmt] = {}
+        self._method_classes: Dict[ir.Node, str] = {}
+        self._static_tables: Optional[Dict[str, bool]] = None
+        body = getattr(tree, 'body', [])
+        # Module-level definitions shadow imported names
+        for stmt in body:
+            if isinstance(stmt, (ir.FunctionDef, ir.AsyncFunctionDef, ir.ClassDef)):
+                self.imports.pop(stmt.name, None)
+        imported_variables: Dict[str, ir.AnnAssign] = {}
+        for local_name, symbol in self.imports.items():
+            if isinstance(symbol.stub, ir.FunctionDef):
+                self.functions[local_name] = symbol.stub
+            elif isinstance(symbol.stub, ir.ClassDef):
+                self.classes[local_name] = symbol.stub
+                for item in symbol.stub.body:
+                    if isinstance(item, ir.FunctionDef):
+                        self._method_classes[item] = local_name
+            else:
+                imported_variables[local_name] = symbol.stub
+        for stmt in body:
+            if isinstance(stmt, (ir.FunctionDef, ir.AsyncFunctionDef)):
+                self.functions[stmt.name] = stmt
+            elif isinstance(stmt, ir.ClassDef):
+                self.classes[stmt.name] = stmt
+                for item in stmt.body:
+                    if isinstance(item, (ir.FunctionDef, ir.AsyncFunctionDef)):
+                        self._method_classes[item] = stmt.name
+
+        self.module = ScopeTypes(tree)
+        self._scopes[tree] = self.module
+        self._current = self.module
+        self._top_level: Optional[ir.stmt] = None
+        for local_name, stub in imported_variables.items():
+            self.module.env[local_name] = self.annotation_type(stub.annotation)
+        bindings: Dict[str, PyType] = {}
+        self._block_bindings[id(body)] = bindings
+        self._block_stack.append(bindings)
+        for stmt in body:
+            self._top_level = stmt
+            self._infer_statement(stmt, self.module.env)
+        self._block_stack.pop()
+        self._top_level = None
+
+    # ------------------------------------------------------------------
+    # Queries used by the generator
+
+    def expression_type(self, node: ir.Node) -> PyType:
+        """
+        Returns the inferred type of an expression node.
+
+        Args:
+            node: An expression inside an already inferred scope
+
+        Returns:
+            The type at that program point, UNKNOWN if not inferred
+        """
+        return self._expression_types.get(node, UNKNOWN)
+
+    def block_bindings(self, body: Sequence[ir.stmt]) -> Dict[str, PyType]:
+        """
+        Returns the joined types of all names bound within a block,
+        including its nested blocks but not nested scopes.
+
+        Args:
+            body: A statement list of an inferred scope
+
+        Returns:
+            Mapping of variable name to the type to declare it with
+        """
+        return self._block_bindings.get(id(body), {})
+
+    def function_scope(self, node: ir.Node, parent: Optional[ScopeTypes] = None) -> ScopeTypes:
+        """
+        Returns the inference results of a function, inferring it on first use.
+
+        Args:
+            node: The function definition
+            parent: Enclosing function scope of a nested function
+
+        Returns:
+            The memoized scope results
+        """
+        scope = self._function_scope(node, parent)
+        for tracking in self._tracking:
+            tracking.update(scope.dependencies)
+        return scope
+
+    def class_scope(self, node: ir.ClassDef) -> ScopeTypes:
+        """
+        Returns the inference results of a class, including field types.
+
+        Args:
+            node: The class definition
+
+        Returns:
+            The memoized scope results
+        """
+        scope = self._scopes.get(node)
+        if scope is None:
+            scope = self._infer_class(node)
+        for tracking in self._tracking:
+            tracking.update(scope.dependencies)
+        return scope
+
+    def reassigned_locals(self, scope: ScopeTypes) -> FrozenSet[str]:
+        """
+        Returns the parameters and locals of a function that are bound more
+        than once, memoized per scope.
+
+        Augmented assignments and range() loop targets, which Java
+        increments, count as a second binding. Java lambdas may only
+        capture the other locals, which are effectively final.
+
+        Args:
+            scope: An inferred function scope
+
+        Returns:
+            Names of the locals that are not effectively final in Java
+        """
+        if scope.reassigned is not None:
+            return scope.reassigned
+        node = scope.node
+        scope.reassigned = frozenset()
+        if not isinstance(node, (ir.FunctionDef, ir.AsyncFunctionDef)):
+            return scope.reassigned
+
+        bindings: Dict[str, int] = {name: 1 for name, _ in scope.params}
+        stack: List[ir.Node] = list(node.body)
+        while stack:
+            current = stack.pop()
+            if isinstance(current, (ir.FunctionDef, ir.AsyncFunctionDef, ir.Lambda, ir.ClassDef)):
+                continue
+            if isinstance(current, ir.Name) and isinstance(current.ctx, ir.Store):
+                bindings[current.id] = bindings.get(current.id, 0) + 1
+            elif isinstance(current, ir.AugAssign) and isinstance(current.target, ir.Name):
+                bindings[current.target.id] = bindings.get(current.target.id, 0) + 1
+            elif (isinstance(current, ir.For) and isinstance(current.target, ir.Name)
+                  and isinstance(current.iter, ir.Call) and isinstance(current.iter.func, ir.Name)
+                  and current.iter.func.id == 'range'):
+                bindings[current.target.id] = bindings.get(current.target.id, 0) + 1
+            stack.extend(ir.iter_child_nodes(current))
+        scope.reassigned = frozenset(name for name, count in bindings.items() if count > 1)
+        return scope.reassigned
+
+    def array_variables(self, scope: ScopeTypes) -> FrozenSet[str]:
+        """
+        Returns the numeric lists of a function that can become primitive
+        arrays, memoized per scope.
+
+        A list qualifies when it holds ints or floats, is only initialized
+        from literals or ``[0] * n``, and is otherwise only indexed,
+        iterated, passed to len/sum/min/max or passed where a module
+        function takes an array. Anything that could resize it, alias it
+        or leak it disqualifies it.
+
+        Args:
+            scope: An inferred function scope
+
+        Returns:
+            Names of the parameters and locals to emit as arrays
+        """
+        if scope.arrays is not None:
+            return scope.arrays
+        node = scope.node
+        if not isinstance(node, (ir.FunctionDef, ir.AsyncFunctionDef)):
+            scope.arrays = frozenset()
+            return scope.arrays
+        scope.arrays = frozenset()  # Recursive calls see no array parameters
+
+        bindings = self.block_bindings(node.body)
+        candidates = {name for name, py_type in scope.params if is_numeric_list(join(py_type, bindings.get(name)))}
+        params = {name for name, _ in scope.params}
+        candidates.update(name for name, py_type in bindings.items()
+                          if name not in params and is_numeric_list(py_type))
+
+        stack: List[Tuple[ir.Node, ir.Node]] = [(stmt, node) for stmt in node.body]
+        while stack and candidates:
+            current, parent = stack.pop()
+            if isinstance(current, (ir.FunctionDef, ir.AsyncFunctionDef, ir.Lambda, ir.ClassDef)):
+                # Closures may alias the list; give up on everything they use
+                candidates.difference_update(
+                    inner.id for inner in ir.walk(current) if isinstance(inner, ir.Name))
+                continue
+            if isinstance(current, ir.Name) and current.id in candidates:
+                if not self._is_array_use(current, parent):
+                    candidates.discard(current.id)
+                continue
+            stack.extend((child, current) for child in ir.iter_child_nodes(current))
+
+        scope.arrays = frozenset(candidates)
+        return scope.arrays
+
+    def _is_array_use(self, name: ir.Name, parent: ir.Node) -> bool:
+        """Whether one occurrence of a name is compatible with an array."""
+        if isinstance(name.ctx, ir.Store):
+            if isinstance(parent, ir.Assign):
+                return name in parent.targets and is_array_literal(parent.value)
+            if isinstance(parent, ir.AnnAssign):
+                return parent.value is None or is_array_literal(parent.value)
+            return False
+        if isinstance(parent, ir.Subscript):
+            return (parent.value is name and not isinstance(parent.slice, ir.Slice)
+                    and not isinstance(parent.ctx, ir.Del))
+        if isinstance(parent, (ir.For, ir.comprehension)):
+            return parent.iter is name
+        if isinstance(parent, ir.Call) and isinstance(parent.func, ir.Name) and not parent.keywords:
+            func = parent.func.id
+            if func in _ARRAY_REDUCTIONS and func not in self.functions:
+                return len(parent.args) == 1
+            callee = self.functions.get(func)
+            if callee is not None and name in parent.args:
+                callee_scope = self._function_scope(callee)
+                position = parent.args.index(name)
+                return (position < len(callee_scope.params)
+                        and callee_scope.params[position][0] in self.array_variables(callee_scope))
+        return False
+
+    def string_builders(self, scope: ScopeTypes) -> FrozenSet[str]:
+        """
+        Returns the string accumulators of a function that can become
+        StringBuilders, memoized per scope.
+
+        A local string qualifies when it is appended to inside a loop, with
+        ``s += x`` or ``s = s + x``, and is never read inside the innermost
+        loop of any of those appends, where each read would copy the
+        builder. It may be reassigned and read anywhere else. Parameters,
+        globals and names used by closures never qualify.
+
+        Args:
+            scope: An inferred function scope
+
+        Returns:
+            Names of the locals to emit as StringBuilders
+        """
+        if scope.builders is not None:
+            return scope.builders
+        node = scope.node
+        scope.builders = frozenset()
+        if not isinstance(node, (ir.FunctionDef, ir.AsyncFunctionDef)):
+            return scope.builders
+
+        params = {name for name, _ in scope.params}
+        params.add(scope.receiver)
+        candidates = {name for name, py_type in self.block_bindings(node.body).items()
+                      if py_type == STR and name not in params}
+        # Innermost loops of the appends, and loops enclosing the reads
+        append_loops: Dict[str, Set[ir.Node]] = {}
+        read_loops: Dict[str, Set[ir.Node]] = {}
+
+        stack: List[Tuple[ir.Node, ir.Node, Tuple[ir.Node, ...]]] = [(stmt, node, ()) for stmt in node.body]
+        while stack and candidates:
+            current, parent, loops = stack.pop()
+            if isinstance(current, (ir.FunctionDef, ir.AsyncFunctionDef, ir.Lambda, ir.ClassDef)):
+                candidates.difference_update(
+                    inner.id for inner in ir.walk(current) if isinstance(inner, ir.Name))
+                continue
+            if isinstance(current, (ir.Global, ir.Nonlocal)):
+                candidates.difference_update(current.names)
+                continue
+            if isinstance(current, ir.Name):
+                if current.id in candidates:
+                    if isinstance(current.ctx, ir.Load):
+                        read_loops.setdefault(current.id, set()).update(loops)
+                    elif not (isinstance(parent, (ir.Assign, ir.AnnAssign)) or
+                              isinstance(parent, ir.AugAssign) and isinstance(parent.op, ir.Add)):
+                        candidates.discard(current.id)
+                continue
+            appended = string_append(current)
+            if appended is not None and appended[0] in candidates:
+                name, operands = appended
+                if loops:
+                    append_loops.setdefault(name, set()).add(loops[-1])
+                stack.extend((operand, current, loops) for operand in operands)
+                continue
+            if isinstance(current, (ir.For, ir.AsyncFor)):
+                inner = loops + (current,)
+                stack.extend((child, current, loops) for child in (current.target, current.iter))
+                stack.extend((stmt, current, inner) for stmt in current.body + current.orelse)
+                continue
+            if isinstance(current, (ir.While, ir.ListComp, ir.SetComp, ir.DictComp, ir.GeneratorExp)):
+                loops = loops + (current,)
+            stack.extend((child, current, loops) for child in ir.iter_child_nodes(current))
+
+        scope.builders = frozenset(
+            name for name in candidates
+            if name in append_loops and not append_loops[name] & read_loops.get(name, set()))
+        return scope.builders
+
+    def static_tables(self) -> Dict[str, bool]:
+        """
+        Returns the module variables that can become static final tables,
+        with whether each is read-only, computed once per module.
+
+        A variable qualifies when a single top-level statement binds it to
+        a constant literal (see is_constant_literal) and nothing rebinds,
+        deletes or declares it global. It is read-only when every use
+        anywhere in the module only subscripts it, iterates it, tests
+        membership, calls a reading method such as ``get`` on it or passes
+        it to a reading builtin such as ``len``.
+
+        Returns:
+            Mapping of variable name to whether it is read-only
+        """
+        if self._static_tables is not None:
+            return self._static_tables
+        definitions: Dict[str, ir.Node] = {}
+        for stmt in getattr(self.tree, 'body', []):
+            if (isinstance(stmt, ir.Assign) and len(stmt.targets) == 1
+                    and isinstance(stmt.targets[0], ir.Name) or
+                    isinstance(stmt, ir.AnnAssign) and isinstance(stmt.target, ir.Name)
+                    and stmt.value is not None):
+                target = stmt.targets[0] if isinstance(stmt, ir.Assign) else stmt.target
+                if is_constant_literal(stmt.value) and self.module_first_binding.get(target.id) is stmt:
+                    definitions[target.id] = target
+
+        tables = {name: True for name in definitions}
+        stack: List[Tuple[ir.Node, ir.Node]] = [(self.tree, self.tree)]
+        while stack and tables:
+            current, parent = stack.pop()
+            if isinstance(current, ir.Global):
+                for name in current.names:
+                    tables.pop(name, None)
+            elif isinstance(current, ir.Name) and current.id in tables:
+                if not isinstance(current.ctx, ir.Load):
+                    if definitions[current.id] is not current:
+                        tables.pop(current.id)
+                elif not self._is_reading_use(current, parent):
+                    tables[current.id] = False
+            stack.extend((child, current) for child in ir.iter_child_nodes(current))
+
+        self._static_tables = tables
+        return tables
+
+    def _is_reading_use(self, name: ir.Name, parent: ir.Node) -> bool:
+        """Whether one occurrence of a collection can neither modify it nor let it escape."""
+        if isinstance(parent, ir.Subscript):
+            return parent.value is name and isinstance(parent.ctx, ir.Load)
+        if isinstance(parent, ir.Attribute):
+            return parent.attr in _READING_METHODS
+        if isinstance(parent, (ir.For, ir.AsyncFor, ir.comprehension)):
+            return parent.iter is name
+        if isinstance(parent, ir.Compare):
+            return all(isinstance(op, (ir.In, ir.NotIn)) for op in parent.ops) and parent.left is not name
+        if isinstance(parent, ir.Call) and isinstance(parent.func, ir.Name):
+            return parent.func.id in _READING_BUILTINS and parent.func.id not in self.functions
+        return False
+
+    def resolve_dependency(self, key: str) -> PyType:
+        """
+        Re-resolves a dependency recorded by track_dependencies().
+
+        Args:
+            key: Qualified name such as ``func`` or ``Class.method``
+
+        Returns:
+            The current inferred type of that definition
+        """
+        class_name, _, member = key.rpartition('.')
+        if class_name:
+            return self._member_type(class_name, member, record=False)
+        return self._function_return(key, record=False)
+
+    @contextmanager
+    def track_dependencies(self) -> Iterator[Dict[str, PyType]]:
+        """
+        Collects the inferred types of other definitions consulted while
+        the enclosed block runs, so cached output depending on them can be
+        validated later.
+
+        Yields:
+            Dictionary filled with qualified name -> type entries
+        """
+        dependencies: Dict[str, PyType] = {}
+        self._tracking.append(dependencies)
+        try:
+            yield dependencies
+        finally:
+            self._tracking.remove(dependencies)
+
+    def symbol_signature(self, name: str) -> str:
+        """
+        Fingerprints what a module-level name resolves to: the variable's
+        final and declared types and whether it is a static table, the
+        signature of a function, and the method signatures of a class.
+
+        Args:
+            name: A name read or bound by a top-level definition
+
+        Returns:
+            String that changes whenever the resolution of the name changes
+        """
+        declared = self.block_bindings(getattr(self.tree, 'body', ())).get(name)
+        parts = [repr(self.module.env.get(name)), repr(declared), repr(self.static_tables().get(name))]
+        function = self.functions.get(name)
+        if function is not None:
+            parts.append(ir.dumps(function.args).hex() + (ir.dumps(function.returns).hex() if function.returns else ''))
+        class_node = self.classes.get(name)
+        if class_node is not None:
+            for stmt in class_node.body:
+                if isinstance(stmt, (ir.FunctionDef, ir.AsyncFunctionDef)):
+                    parts.append(stmt.name + ir.dumps(stmt.args).hex())
+        return '\0'.join(parts)
+
+    def annotation_type(self, annotation: Optional[ir.Node]) -> PyType:
+        """
+        Converts a type annotation to a PyType.
+
+        Args:
+            annotation: Annotation expression, possibly None
+
+        Returns:
+            The annotated type, UNKNOWN when it is missing or unsupported
+        """
+        if annotation is None:
+            return UNKNOWN
+        if isinstance(annotation, ir.Constant):
+            if annotation.value is None:
+                return NONE
+            if isinstance(annotation.value, str):
+                try:
+                    return self.annotation_type(ir.from_ast(ast.parse(annotation.value, mode='eval').body))
+                except SyntaxError:
+                    return UNKNOWN
+            return UNKNOWN
+        if isinstance(annotation, ir.Attribute):
+            return self.annotation_type(ir.Name(id=annotation.attr, ctx=ir.Load()))
+        if isinstance(annotation, ir.Name):
+            if annotation.id in _ANNOTATION_NAMES:
+                return _ANNOTATION_NAMES[annotation.id]
+            if annotation.id in self.classes or annotation.id in get_registry().types:
+                # Module classes, and library types given a Java mapping by a plugin
+                return PyType(annotation.id)
+            return UNKNOWN
+        if isinstance(annotation, ir.Subscript):
+            base = self.annotation_type(annotation.value)
+            arg_nodes = annotation.slice
+            if type(arg_nodes).__name__ == 'Index':  # Python 3.8
+                arg_nodes = arg_nodes.value
+            arg_nodes = arg_nodes.elts if isinstance(arg_nodes, ir.Tuple) else [arg_nodes]
+            args = tuple(self.annotation_type(arg) for arg in arg_nodes)
+            name = getattr(annotation.value, 'id', getattr(annotation.value, 'attr', ''))
+            if name == 'Optional':
+                return join(args[0], NONE)
+            if base.name in ('list', 'set', 'iterator') and args:
+                return PyType(base.name, args[:1])
+            if base.name == 'dict' and len(args) == 2:
+                return dict_of(*args)
+            if base.name == 'tuple':
+                return PyType('tuple', tuple(arg for arg in args if arg != PyType('...')))
+            return base
+        if isinstance(annotation, ir.BinOp) and isinstance(annotation.op, ir.BitOr):
+            return join(self.annotation_type(annotation.left), self.annotation_type(annotation.right))
+        return UNKNOWN
+
+    # ------------------------------------------------------------------
+    # Scopes
+
+    def _function_scope(self, node: ir.Node, parent: Optional[ScopeTypes] = None) -> ScopeTypes:
+        """Returns a function's memoized results without recording dependencies."""
+        scope = self._scopes.get(node)
+        if scope is None:
+            class_name = self._method_classes.get(node)
+            class_node = self.classes.get(class_name)
+            if class_node is not None and class_node not in self._scopes:
+                # Fields assigned by any method must be known before one is generated
+                self._infer_class(class_node)
+                scope = self._scopes.get(node)
+            if scope is None:
+                scope = self._infer_function(node, class_name, parent)
+        return scope
+
+    @contextmanager
+    def _scope(self, scope: ScopeTypes) -> Iterator[None]:
+        """Makes a scope current while its body is inferred."""
+        previous, previous_blocks = self._current, self._block_stack
+        self._current, self._block_stack = scope, []
+        self._in_progress.add(scope.node)
+        try:
+            yield
+        finally:
+            self._in_progress.discard(scope.node)
+            self._current, self._block_stack = previous, previous_blocks
+
+    def _infer_function(self, node: ir.Node, class_name: Optional[str],
+                        parent: Optional[ScopeTypes] = None) -> ScopeTypes:
+        """Infers the parameters, body and return type of a function."""
+        scope = ScopeTypes(node, parent or self.module, class_name)
+        self._scopes[node] = scope
+
+        args = node.args
+        positional = args.posonlyargs + args.args
+        defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+        with self._scope(scope):
+            for index, (arg, default) in enumerate(zip(positional, defaults)):
+                if index == 0 and class_name and not self._is_static(node):
+                    scope.receiver = arg.arg
+                    scope.env[arg.arg] = PyType(class_name)
+                    continue
+                if arg.annotation is not None:
+                    arg_type = self.annotation_type(arg.annotation)
+                elif default is not None:
+                    arg_type = self._expr(default, scope.env)
+                else:
+                    arg_type = UNKNOWN
+                scope.params.append((arg.arg, arg_type))
+                scope.env[arg.arg] = arg_type
+            for arg in args.kwonlyargs:
+                scope.env[arg.arg] = self.annotation_type(arg.annotation)
+            if args.vararg:
+                scope.env[args.vararg.arg] = PyType('tuple')
+            if args.kwarg:
+                scope.env[args.kwarg.arg] = dict_of(STR, UNKNOWN)
+
+            if node.returns is not None:
+                scope.return_type = self.annotation_type(node.returns)
+            self._infer_block(node.body, scope.env)
+
+        if node.returns is None:
+            if scope.return_type is None:
+                scope.return_type = NONE
+            elif scope.return_type == BOTTOM:
+                scope.return_type = UNKNOWN
+        return scope
+
+    def _infer_class(self, node: ir.ClassDef) -> ScopeTypes:
+        """
+        Infers the class-level fields and the attributes any method sets.
+
+        Every method is inferred here, __init__ first, so that the fields
+        of a class do not depend on which other definitions were inferred
+        before it.
+        """
+        scope = ScopeTypes(node, self.module, node.name)
+        self._scopes[node] = scope
+        with self._scope(scope):
+            for stmt in node.body:
+                if isinstance(stmt, ir.AnnAssign) and isinstance(stmt.target, ir.Name):
+                    scope.fields[stmt.target.id] = self.annotation_type(stmt.annotation)
+                elif isinstance(stmt, ir.Assign):
+                    value_type = self._expr(stmt.value, scope.env)
+                    for target in stmt.targets:
+                        if isinstance(target, ir.Name):
+                            scope.fields[target.id] = join(scope.fields.get(target.id), value_type)
+        methods = [stmt for stmt in node.body if isinstance(stmt, ir.FunctionDef)]
+        methods.sort(key=lambda method: method.name != '__init__')
+        for method in methods:
+            if method in self._in_progress:
+                continue
+            method_scope = self._scopes.get(method) or self._infer_function(method, node.name)
+            scope.dependencies.update(method_scope.dependencies)
+        return scope
+
+    @staticmethod
+    def _is_static(node: ir.Node) -> bool:
+        """Whether a method is declared with @staticmethod."""
+        return any(isinstance(d, ir.Name) and d.id == 'staticmethod' for d in node.decorator_list)
+
+    # ------------------------------------------------------------------
+    # Symbol resolution
+
+    def _record_dependency(self, key: str, value: PyType) -> None:
+        """Notes that the current scope used another definition's type."""
+        self._current.dependencies[key] = value
+        for tracking in self._tracking:
+            tracking[key] = value
+
+    def _function_return(self, name: str, record: bool = True) -> PyType:
+        """Returns the return type of a module-level function."""
+        node = self.functions.get(name)
+        if node is None:
+            return UNKNOWN
+        if node.returns is not None:
+            return self.annotation_type(node.returns)
+        if node in self._in_progress:
+            return UNKNOWN  # Recursive call: the type is still being inferred
+        result = self._function_scope(node).return_type or UNKNOWN
+        if record:
+            self._record_dependency(name, result)
+        return result
+
+    def _member_type(self, class_name: str, member: str, record: bool = True) -> PyType:
+        """Returns the type of an attribute or the return type of a method."""
+        class_node = self.classes.get(class_name)
+        if class_node is None:
+            return UNKNOWN
+        for stmt in class_node.body:
+            if isinstance(stmt, ir.FunctionDef) and stmt.name == member:
+                if stmt.returns is not None:
+                    return PyType('method', (self.annotation_type(stmt.returns),))
+                if stmt in self._in_progress:
+                    return UNKNOWN
+                result = PyType('method', (self._function_scope(stmt).return_type or UNKNOWN,))
+                break
+        else:
+            if class_node in self._in_progress:
+                return self._scopes[class_node].fields.get(member, UNKNOWN)
+            scope = self._scopes.get(class_node) or self._infer_class(class_node)
+            result = scope.fields.get(member, UNKNOWN)
+        if record:
+            self._record_dependency(f"{class_name}.{member}", result)
+        return result
+
+    def _lookup(self, name: str, env: Dict[str, PyType]) -> PyType:
+        """Resolves a name through the enclosing scopes."""
+        if name in env:
+            return env[name]
+        scope = self._current.parent
+        while scope is not None:
+            if name in scope.env:
+                return scope.env[name]
+            scope = scope.parent
+        if name in self.classes:
+            return PyType('class', (PyType(name),))
+        if name in self.functions:
+            return FUNCTION
+        return UNKNOWN
+
+    # ------------------------------------------------------------------
+    # Statements
+
+    def _bind(self, name: str, value: PyType, env: Dict[str, PyType]) -> None:
+        """Binds a name in the environment and in every enclosing block."""
+        env[name] = value
+        for bindings in self._block_stack:
+            bindings[name] = join(bindings.get(name), value)
+        if self._current is self.module and self._top_level is not None:
+            self.module_first_binding.setdefault(name, self._top_level)
+
+    def _bind_target(self, target: ir.Node, value: PyType, env: Dict[str, PyType]) -> None:
+        """Binds an assignment target, unpacking tuples elementwise."""
+        if isinstance(target, ir.Name):
+            self._bind(target.id, value, env)
+        elif isinstance(target, (ir.Tuple, ir.List)):
+            for index, element in enumerate(target.elts):
+                if value.name == 'tuple' and index < len(value.args):
+                    self._bind_target(element, value.args[index], env)
+                else:
+                    self._bind_target(element, element_type(value), env)
+        elif isinstance(target, ir.Attribute):
+            receiver = target.value
+            if (isinstance(receiver, ir.Name) and receiver.id == 'self'
+                    and self._current.class_name):
+                class_scope = self._scopes.get(self.classes.get(self._current.class_name))
+                if class_scope is not None:
+                    fields = class_scope.fields
+                    fields[target.attr] = join(fields.get(target.attr), value)
+        elif isinstance(target, ir.Subscript):
+            # d[k] = v and xs[i] = v refine the container's element types
+            self._expr(target.value, env)
+            key_type = self._expr(target.slice, env)
+            if isinstance(target.value, ir.Name):
+                current = env.get(target.value.id)
+                if current is not None and current.name == 'dict':
+                    self._bind(target.value.id, join(current, dict_of(key_type, value)), env)
+                elif current is not None and current.name == 'list':
+                    self._bind(target.value.id, join(current, list_of(value)), env)
+
+    def _infer_block(self, body: Sequence[ir.stmt], env: Dict[str, PyType]) -> None:
+        """Infers a block, recording the names it binds for declarations."""
+        bindings: Dict[str, PyType] = {}
+        self._block_bindings[id(body)] = bindings
+        self._block_stack.append(bindings)
+        try:
+            for stmt in body:
+                self._infer_statement(stmt, env)
+        finally:
+            self._block_stack.pop()
+
+    def _infer_branches(self, blocks: List[Sequence[ir.stmt]], env: Dict[str, PyType]) -> None:
+        """Infers alternative blocks on copies of env and joins the results."""
+        results = []
+        for block in blocks:
+            branch_env = dict(env)
+            self._infer_block(block, branch_env)
+            results.append(branch_env)
+        for name in set().union(*results) if results else ():
+            merged = None
+            for branch_env in results:
+                merged = join(merged, branch_env.get(name, env.get(name)))
+            env[name] = merged
+
+    def _infer_statement(self, stmt: ir.stmt, env: Dict[str, PyType]) -> None:
+        """Infers one statement, updating the environment in place."""
+        if isinstance(stmt, ir.Assign):
+            value = self._expr(stmt.value, env)
+            for target in stmt.targets:
+                self._bind_target(target, value, env)
+        elif isinstance(stmt, ir.AnnAssign):
+            declared = self.annotation_type(stmt.annotation)
+            if stmt.value is not None:
+                value = self._expr(stmt.value, env)
+                if declared == UNKNOWN:
+                    declared = value
+                elif declared.args and all(arg == UNKNOWN for arg in declared.args):
+                    # Bare List/Dict annotations take their arguments from the value
+                    declared = join(PyType(declared.name, tuple(BOTTOM for _ in declared.args)), value)
+            self._bind_target(stmt.target, declared, env)
+        elif isinstance(stmt, ir.AugAssign):
+            value = self._binop_type(self._expr(stmt.target, env), stmt.op, self._expr(stmt.value, env))
+            self._bind_target(stmt.target, value, env)
+        elif isinstance(stmt, (ir.For, ir.AsyncFor)):
+            self._bind_target(stmt.target, element_type(self._expr(stmt.iter, env)), env)
+            self._infer_branches([stmt.body, stmt.orelse], env)
+        elif isinstance(stmt, ir.While):
+            self._expr(stmt.test, env)
+            self._infer_branches([stmt.body, stmt.orelse], env)
+        elif isinstance(stmt, ir.If):
+            self._expr(stmt.test, env)
+            self._infer_branches([stmt.body, stmt.orelse], env)
+        elif isinstance(stmt, (ir.With, ir.AsyncWith)):
+            for item in stmt.items:
+                value = self._expr(item.context_expr, env)
+                if item.optional_vars is not None:
+                    self._bind_target(item.optional_vars, value, env)
+            self._infer_branches([stmt.body], env)
+        elif isinstance(stmt, ir.Try) or type(stmt).__name__ == 'TryStar':
+            blocks = [stmt.body, stmt.orelse, stmt.finalbody]
+            for handler in stmt.handlers:
+                if handler.name:
+                    env[handler.name] = EXCEPTION
+                blocks.append(handler.body)
+            self._infer_branches(blocks, env)
+        elif isinstance(stmt, ir.Return):
+            if stmt.value is not None:
+                value = self._expr(stmt.value, env)
+                scope = self._current
+                if isinstance(scope.node, (ir.FunctionDef, ir.AsyncFunctionDef)) and scope.node.returns is None:
+                    scope.return_type = join(scope.return_type, value)
+        elif isinstance(stmt, ir.Expr):
+            self._expr(stmt.value, env)
+        elif isinstance(stmt, (ir.FunctionDef, ir.AsyncFunctionDef)):
+            env[stmt.name] = FUNCTION
+        elif isinstance(stmt, ir.ClassDef):
+            env.setdefault(stmt.name, PyType('class', (PyType(stmt.name),)))
+
+    # ------------------------------------------------------------------
+    # Expressions
+
+    def _expr(self, node: ir.Node, env: Dict[str, PyType]) -> PyType:
+        """Infers an expression and memoizes its type."""
+        result = self._infer_expression(node, env)
+        self._expression_types[node] = result
+        return result
+
+    def _binop_type(self, left: PyType, op: ir.operator, right: PyType) -> PyType:
+        """Result type of a binary operator."""
+        if left.name in _NUMERIC_RANK and right.name in _NUMERIC_RANK:
+            if isinstance(op, ir.Div):
+                return FLOAT
+            return join(join(left, right), INT)
+        if left == STR and isinstance(op, (ir.Add, ir.Mod)):
+            return STR
+        if left == STR and isinstance(op, ir.Mult) and right.name in ('int', 'bool'):
+            return STR
+        if left.name == 'list' and isinstance(op, ir.Add) and right.name == 'list':
+            return join(left, right)
+        if left.name == 'list' and isinstance(op, ir.Mult):
+            return left
+        return UNKNOWN
+
+    def _comprehension_env(self, generators: Sequence[ir.comprehension],
+                           env: Dict[str, PyType]) -> Dict[str, PyType]:
+        """Binds the targets of comprehension clauses in a private environment."""
+        inner = dict(env)
+        for generator in generators:
+            iterable = self._expr(generator.iter, inner)
+            self._bind_local(generator.target, element_type(iterable), inner)
+            for condition in generator.ifs:
+                self._expr(condition, inner)
+        return inner
+
+    def _bind_local(self, target: ir.Node, value: PyType, env: Dict[str, PyType]) -> None:
+        """Binds a comprehension or lambda target without touching the blocks."""
+        if isinstance(target, ir.Name):
+            env[target.id] = value
+            self._expression_types[target] = value
+        elif isinstance(target, (ir.Tuple, ir.List)):
+            for index, element in enumerate(target.elts):
+                if value.name == 'tuple' and index < len(value.args):
+                    self._bind_local(element, value.args[index], env)
+                else:
+                    self._bind_local(element, element_type(value), env)
+
+    def _infer_expression(self, node: ir.Node, env: Dict[str, PyType]) -> PyType:
+        """Computes the type of an expression in the given environment."""
+        if isinstance(node, ir.Constant):
+            value = node.value
+            if isinstance(value, bool):
+                return BOOL
+            if isinstance(value, int):
+                return INT
+            if isinstance(value, float):
+                return FLOAT
+            if isinstance(value, str):
+                return STR
+            if value is None:
+                return NONE
+            return UNKNOWN
+        if isinstance(node, ir.Name):
+            return self._lookup(node.id, env)
+        if isinstance(node, (ir.List, ir.Set)):
+            element = BOTTOM
+            for elt in node.elts:
+                element = join(element, self._expr(elt, env))
+            return PyType('list' if isinstance(node, ir.List) else 'set', (element,))
+        if isinstance(node, ir.Tuple):
+            return PyType('tuple', tuple(self._expr(elt, env) for elt in node.elts))
+        if isinstance(node, ir.Dict):
+            key_type, value_type = BOTTOM, BOTTOM
+            for key, value in zip(node.keys, node.values):
+                if key is not None:
+                    key_type = join(key_type, self._expr(key, env))
+                    value_type = join(value_type, self._expr(value, env))
+                else:
+                    unpacked = self._expr(value, env)
+                    if unpacked.name == 'dict':
+                        key_type = join(key_type, unpacked.args[0])
+                        value_type = join(value_type, unpacked.args[1])
+            return dict_of(key_type, value_type)
+        if isinstance(node, ir.BinOp):
+            return self._binop_type(self._expr(node.left, env), node.op, self._expr(node.right, env))
+        if isinstance(node, ir.UnaryOp):
+            operand = self._expr(node.operand, env)
+            if isinstance(node.op, ir.Not):
+                return BOOL
+            return INT if operand == BOOL else operand
+        if isinstance(node, ir.BoolOp):
+            result = None
+            for value in node.values:
+                result = join(result, self._expr(value, env))
+            return result
+        if isinstance(node, ir.Compare):
+            self._expr(node.left, env)
+            for comparator in node.comparators:
+                self._expr(comparator, env)
+            return BOOL
+        if isinstance(node, ir.IfExp):
+            self._expr(node.test, env)
+            return join(self._expr(node.body, env), self._expr(node.orelse, env))
+        if isinstance(node, ir.JoinedStr):
+            for value in node.values:
+                self._expr(value, env)
+            return STR
+        if isinstance(node, ir.FormattedValue):
+            self._expr(node.value, env)
+            return STR
+        if isinstance(node, ir.Call):
+            return self._call_type(node, env)
+        if isinstance(node, ir.Attribute):
+            receiver = self._expr(node.value, env)
+            if receiver.name in self.classes:
+                member = self._member_type(receiver.name, node.attr)
+                return UNKNOWN if member.name == 'method' else member
+            return UNKNOWN
+        if isinstance(node, ir.Subscript):
+            container = self._expr(node.value, env)
+            self._expr(node.slice, env)
+            if isinstance(node.slice, ir.Slice):
+                return container if container.name in ('list', 'str', 'tuple') else UNKNOWN
+            if container.name == 'dict':
+                return container.args[1] if container.args[1] != BOTTOM else UNKNOWN
+            if container.name == 'tuple':
+                if (isinstance(node.slice, ir.Constant) and isinstance(node.slice.value, int)
+                        and -len(container.args) <= node.slice.value < len(container.args)):
+                    return container.args[node.slice.value]
+                return element_type(container)
+            if container.name in ('list', 'str'):
+                return element_type(container)
+            return UNKNOWN
+        if isinstance(node, ir.Slice):
+            for part in (node.lower, node.upper, node.step):
+                if part is not None:
+                    self._expr(part, env)
+            return UNKNOWN
+        if isinstance(node, (ir.ListComp, ir.SetComp, ir.GeneratorExp)):
+            inner = self._comprehension_env(node.generators, env)
+            element = self._expr(node.elt, inner)
+            kind = {ir.ListComp: 'list', ir.SetComp: 'set', ir.GeneratorExp: 'iterator'}[type(node)]
+            return PyType(kind, (element,))
+        if isinstance(node, ir.DictComp):
+            inner = self._comprehension_env(node.generators, env)
+            return dict_of(self._expr(node.key, inner), self._expr(node.value, inner))
+        if isinstance(node, ir.Lambda):
+            return FUNCTION
+        if isinstance(node, ir.Starred):
+            return self._expr(node.value, env)
+        return UNKNOWN
+
+    def _call_type(self, node: ir.Call, env: Dict[str, PyType]) -> PyType:
+        """Infers the result of a call to a builtin, function, class or method."""
+        arg_types = [self._expr(arg, env) for arg in node.args]
+        for keyword in node.keywords:
+            self._expr(keyword.value, env)
+        func = node.func
+
+        if isinstance(func, ir.Name):
+            name = func.id
+            shadowed = env.get(name)
+            if shadowed is not None and shadowed != FUNCTION and shadowed.name != 'class':
+                return UNKNOWN  # A local variable holding some callable
+            if name in self.classes:
+                return PyType(name)
+            if name in self.functions:
+                return self._function_return(name)
+            if name in _BUILTIN_RESULTS:
+                return _BUILTIN_RESULTS[name]
+            first = arg_types[0] if arg_types else UNKNOWN
+            if name == 'abs':
+                return first
+            if name == 'sum':
+                element = element_type(first)
+                return element if element.name in _NUMERIC_RANK else INT
+            if name in ('min', 'max'):
+                if len(arg_types) == 1:
+                    return element_type(first)
+                result = None
+                for arg in arg_types:
+                    result = join(result, arg)
+                return result or UNKNOWN
+            if name in ('sorted', 'list'):
+                return list_of(element_type(first)) if arg_types else list_of(BOTTOM)
+            if name == 'set':
+                return set_of(element_type(first)) if arg_types else set_of(BOTTOM)
+            if name in ('reversed', 'iter'):
+                return iterator_of(element_type(first))
+            if name == 'enumerate':
+                return iterator_of(PyType('tuple', (INT, element_type(first))))
+            if name == 'zip':
+                return iterator_of(PyType('tuple', tuple(element_type(arg) for arg in arg_types)))
+            if name == 'dict':
+                return first if first.name == 'dict' else dict_of(BOTTOM, BOTTOM)
+            if name == 'tuple':
+                return PyType('tuple')
+            if name == 'next':
+                return element_type(first)
+            return UNKNOWN
+
+        if isinstance(func, ir.Attribute):
+            receiver = self._expr(func.value, env)
+            method = func.attr
+            if receiver == STR:
+                return _STR_METHODS.get(method, UNKNOWN)
+            if receiver.name in self.classes:
+                member = self._member_type(receiver.name, method)
+                return member.args[0] if member.name == 'method' else UNKNOWN
+            if receiver.name == 'list':
+                if method in ('append', 'insert') and arg_types:
+                    self._refine(func.value, list_of(arg_types[-1]), env)
+                elif method == 'extend' and arg_types:
+                    self._refine(func.value, list_of(element_type(arg_types[0])), env)
+                if method == 'pop':
+                    return element_type(receiver)
+                if method in ('index', 'count'):
+                    return INT
+                if method == 'copy':
+                    return receiver
+                return NONE
+            if receiver.name == 'set':
+                if method == 'add' and arg_types:
+                    self._refine(func.value, set_of(arg_types[0]), env)
+                if method in ('union', 'intersection', 'difference', 'copy'):
+                    return receiver
+                if method == 'pop':
+                    return element_type(receiver)
+                return NONE
+            if receiver.name == 'dict':
+                key_type, value_type = receiver.args
+                if method in ('get', 'pop', 'setdefault'):
+                    result = value_type if value_type != BOTTOM else UNKNOWN
+                    if len(arg_types) > 1:
+                        result = join(value_type, arg_types[1])
+                    return result
+                if method == 'keys':
+                    return set_of(key_type)
+                if method == 'values':
+                    return list_of(value_type)
+                if method == 'items':
+                    return PyType('items', (key_type, value_type))
+                if method == 'copy':
+                    return receiver
+                return NONE
+            if receiver == FILE:
+                if method in ('read', 'readline'):
+                    return STR
+                if method == 'readlines':
+                    return list_of(STR)
+                return NONE
+        return UNKNOWN
+
+    def _refine(self, receiver: ir.Node, refinement: PyType, env: Dict[str, PyType]) -> None:
+        """Widens a container variable with elements added by a method call."""
+        if isinstance(receiver, ir.Name) and receiver.id in env:
+            self._bind(receiver.id, join(env[receiver.id], refinement), env)
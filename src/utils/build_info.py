@@ -0,0 +1,57 @@
+import hashlib
+import os
+from typing import Optional
+
+from src import __version__
+
+# Sources whose code decides the translation of a module, relative to src/
+_TRANSLATION_SOURCES = (
+    'python_analyzer',
+    'java_generator',
+    os.path.join('utils', 'mapping_registry.py'),
+    os.path.join('utils', 'pass_manager.py'),
+)
+
+_SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_translator_version: Optional[str] = None
+
+
+def _source_files():
+    """Yields the translation sources in a stable order, as (relative path, absolute path)."""
+    for entry in _TRANSLATION_SOURCES:
+        path = os.path.join(_SOURCE_ROOT, entry)
+        if os.path.isfile(path):
+            yield entry, path
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories[:] = sorted(name for name in subdirectories if name != '__pycache__')
+            for name in sorted(files):
+                if name.endswith('.py'):
+                    absolute = os.path.join(directory, name)
+                    yield os.path.relpath(absolute, _SOURCE_ROOT), absolute
+
+
+def translator_version() -> str:
+    """
+    Returns the package version together with a digest of the analyzer and
+    generator sources, computed once per process.
+
+    Every change to the code producing the Java output changes the result,
+    so keys derived from it expire with the translator that produced them
+    even when the release version was not bumped.
+
+    Returns:
+        String such as ``0.1+3f2a9c0d1b7e4a65``
+    """
+    global _translator_version
+    if _translator_version is None:
+        digest = hashlib.blake2b(digest_size=8)
+        for relative, path in _source_files():
+            digest.update(relative.replace(os.sep, '/').encode('utf-8'))
+            digest.update(b'\0')
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+            digest.update(b'\0')
+        _translator_version = f"{__version__}+{digest.hexdigest()}"
+    return _translator_version
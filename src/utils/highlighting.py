@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+# Lexer and formatter instances reused by each worker thread
+_pool = threading.local()
+
+# Serializes the first Pygments import, whose lexer loading is not thread-safe
+_import_lock = threading.Lock()
+
+# Executor running highlight jobs next to the translation, created on first use
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+LANGUAGES = ('python', 'java')
+
+
+def _instances():
+    """Return this thread's lexers and formatter, building them once."""
+    instances = getattr(_pool, 'instances', None)
+    if instances is None:
+        # Pygments is only imported once something is highlighted
+        with _import_lock:
+            from pygments.formatters import HtmlFormatter
+            from pygments.lexers import JavaLexer, PythonLexer
+        instances = _pool.instances = {
+            'python': PythonLexer(),
+            'java': JavaLexer(),
+            'formatter': HtmlFormatter(),
+        }
+    return instances
+
+
+def highlight_code(code: str, language: str) -> str:
+    """
+    Highlights source code as HTML using pooled Pygments objects.
+
+    Args:
+        code: The source code to highlight
+        language: Either "python" or "java"
+
+    Returns:
+        HTML markup of the highlighted code
+    """
+    if language not in LANGUAGES:
+        raise ValueError(f"Unsupported language: {language}")
+    instances = _instances()
+    from pygments import highlight
+    return highlight(code, instances[language], instances['formatter'])
+
+
+def highlight_async(code: str, language: str) -> Future:
+    """
+    Starts highlighting code on the shared highlight thread pool.
+
+    Args:
+        code: The source code to highlight
+        language: Either "python" or "java"
+
+    Returns:
+        Future resolving to the HTML markup
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='highlight')
+    return _executor.submit(highlight_code, code, language)
@@ -0,0 +1,197 @@
+import bisect
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Upper bounds of the stage latency histogram buckets, in seconds
+DEFAULT_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the stage block delta histogram buckets, in memory blocks
+DEFAULT_BLOCK_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+class RequestTimings:
+    """
+    Records the wall time and memory block delta of each stage of one request.
+
+    The block delta is how many memory blocks the whole process gained
+    during the stage, as reported by sys.getallocatedblocks(), which is
+    cheap enough to sample on every request. It is approximate and not an
+    allocation count: blocks freed during the stage offset those
+    allocated, a net loss is recorded as 0, and other threads, such as
+    concurrent requests and the highlight pool, contribute to it.
+    """
+
+    def __init__(self):
+        self.stages: List[Tuple[str, float, int]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block as the named stage.
+
+        Args:
+            name: Stage name, e.g. "parse" or "highlight"
+        """
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages.append((name, elapsed, max(0, sys.getallocatedblocks() - blocks)))
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns the recorded stages for inclusion in a JSON response.
+
+        Returns:
+            Mapping of stage name to its duration in ms and block delta
+        """
+        return {
+            name: {'ms': round(elapsed * 1000.0, 3), 'block_delta': blocks}
+            for name, elapsed, blocks in self.stages
+        }
+
+    def server_timing(self) -> str:
+        """
+        Formats the recorded stages as a Server-Timing header value.
+
+        Returns:
+            Header value such as ``parse;dur=1.20, generate;dur=3.41``
+        """
+        return ", ".join(f"{name};dur={elapsed * 1000.0:.2f}" for name, elapsed, _ in self.stages)
+
+
+class Histogram:
+    """
+    Cumulative histogram with one series per label value, rendered in the
+    Prometheus text exposition format.
+    """
+
+    def __init__(self, name: str, description: str, label: str, buckets: Sequence[float]):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        """
+        Records one observation.
+
+        Args:
+            label_value: Value of the histogram's label, e.g. the stage name
+            value: The observed value
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # Per-bucket counts followed by the +Inf count, sum and total
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        """
+        Renders the histogram in the Prometheus text format.
+
+        Returns:
+            Exposition lines without trailing newlines
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for label_value in sorted(snapshot):
+            series = snapshot[label_value]
+            label = f'{self.label}="{label_value}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{label}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{label}}} {series[-1]}")
+        return lines
+
+
+class StageMetrics:
+    """
+    Aggregates the per-stage timings of all requests handled by a worker.
+    """
+
+    def __init__(self):
+        self.durations = Histogram(
+            'translator_stage_duration_seconds',
+            'Wall time spent in each translation stage.',
+            'stage', DEFAULT_TIME_BUCKETS
+        )
+        self.block_deltas = Histogram(
+            'translator_stage_block_delta',
+            'Approximate process-wide change in allocated memory blocks during each translation stage.',
+            'stage', DEFAULT_BLOCK_BUCKETS
+        )
+
+    def record(self, timings: RequestTimings) -> None:
+        """
+        Adds a finished request's stages to the histograms.
+
+        Args:
+            timings: The request's recorded stages
+        """
+        for name, elapsed, blocks in timings.stages:
+            self.durations.observe(name, elapsed)
+            self.block_deltas.observe(name, blocks)
+
+    def render(self, counters: Optional[Dict[str, Tuple[str, float]]] = None) -> str:
+        """
+        Renders all metrics in the Prometheus text format.
+
+        Args:
+            counters: Extra counters as name -> (description, value)
+
+        Returns:
+            The complete exposition document
+        """
+        lines = self.durations.render() + self.block_deltas.render()
+        for name, (description, value) in (counters or {}).items():
+            lines.extend([f"# HELP {name} {description}", f"# TYPE {name} counter", f"{name} {value}"])
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profiled(output_dir: str, name: str = "translate") -> Iterator[List[str]]:
+    """
+    Profiles the enclosed block with cProfile and dumps the statistics.
+
+    The resulting ``.prof`` file can be opened with pstats, snakeviz or
+    converted to a flame graph with tools such as flameprof. Only the
+    calling thread is profiled: work handed to pools, such as the input
+    highlighting, is missing from the profile.
+
+    Args:
+        output_dir: Directory receiving the profile
+        name: Prefix of the profile file name
+
+    Yields:
+        A list that receives the path of the written profile on exit
+    """
+    import cProfile
+
+    written: List[str] = []
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield written
+    finally:
+        profiler.disable()
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident()}.prof")
+        profiler.dump_stats(path)
+        written.append(path)
@@ -0,0 +1,262 @@
+import hashlib
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+from src.python_analyzer import ir
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Plugin files merged over the built-in mappings, separated by os.pathsep
+MAPPINGS_ENV = 'TRANSLATOR_MAPPINGS'
+
+_TYPES = {
+    'int': 'int',
+    'float': 'double',
+    'str': 'String',
+    'bool': 'boolean',
+    'list': 'ArrayList',
+    'dict': 'HashMap',
+    'set': 'HashSet',
+    'tuple': 'List',
+    'None': 'void',
+    'Any': 'Object',
+}
+
+# Wrapper classes used for primitives inside generic types
+_BOXED = {'int': 'Integer', 'double': 'Double', 'boolean': 'Boolean'}
+
+# Builtin name -> (Java method, required import or None)
+_BUILTINS = {
+    'len': ('size()', None),
+    'print': ('System.out.println', None),
+    'str': ('String.valueOf', None),
+    'int': ('Integer.parseInt', None),
+    'float': ('Double.parseDouble', None),
+    'list': ('new ArrayList', 'java.util.ArrayList'),
+    'dict': ('new HashMap', 'java.util.HashMap'),
+    'set': ('new HashSet', 'java.util.HashSet'),
+    'sum': ('stream().mapToInt(Integer::intValue).sum()', None),
+    'max': ('Collections.max', 'java.util.Collections'),
+    'min': ('Collections.min', 'java.util.Collections'),
+    'sorted': ('stream().sorted().collect(Collectors.toCollection(ArrayList::new))',
+               'java.util.stream.Collectors'),
+    'abs': ('Math.abs', None),
+}
+
+_COLLECTION_METHODS = {
+    'list': {
+        'append': 'add',
+        'extend': 'addAll',
+        'insert': 'add',
+        'remove': 'remove',
+        'pop': 'remove',
+        'clear': 'clear',
+        'index': 'indexOf',
+        'count': 'Collections.frequency',
+        'sort': 'sort',
+        'reverse': 'Collections.reverse',  # Requires Collections
+    },
+    'dict': {
+        'get': 'get',
+        'keys': 'keySet',
+        'values': 'values',
+        'items': 'entrySet',
+        'clear': 'clear',
+        'pop': 'remove',
+        'update': 'putAll',
+    },
+    'set': {
+        'add': 'add',
+        'remove': 'remove',
+        'clear': 'clear',
+        'union': 'addAll',
+        'intersection': 'retainAll',
+        'difference': 'removeAll',
+        'discard': 'remove',
+    },
+    'str': {
+        'upper': 'toUpperCase',
+        'lower': 'toLowerCase',
+        'strip': 'strip',
+        'lstrip': 'stripLeading',
+        'rstrip': 'stripTrailing',
+        'startswith': 'startsWith',
+        'endswith': 'endsWith',
+        'find': 'indexOf',
+        'rfind': 'lastIndexOf',
+        'replace': 'replace',
+    },
+}
+
+# Operators by IR node class name
+_OPERATORS = {
+    'binary': {'Add': '+', 'Sub': '-', 'Mult': '*', 'Div': '/', 'Mod': '%'},
+    'compare': {'Eq': '==', 'NotEq': '!=', 'Lt': '<', 'LtE': '<=', 'Gt': '>', 'GtE': '>='},
+    'unary': {'USub': '-', 'UAdd': '+', 'Not': '!', 'Invert': '~'},
+}
+
+# IR base class each operator table may contain
+_OPERATOR_BASES = {'binary': ir.operator, 'compare': ir.cmpop, 'unary': ir.unaryop}
+
+
+class MappingRegistry:
+    """
+    Immutable Python-to-Java mapping tables shared by the generator and the
+    semantic mapper.
+
+    Every table is a read-only MappingProxyType built once, so lookups
+    during generation allocate nothing and one registry can be shared by
+    all threads. Operator tables are keyed by IR node class for direct
+    ``type(node.op)`` lookups. A Java method containing a dot, such as
+    ``Collections.reverse``, is a static method taking the receiver as its
+    first argument.
+    """
+
+    def __init__(self, types: Mapping[str, str], boxed: Mapping[str, str],
+                 builtins: Mapping[str, Tuple[str, Optional[str]]],
+                 collection_methods: Mapping[str, Mapping[str, str]],
+                 operators: Mapping[str, Mapping[str, str]], fingerprint: str = '',
+                 plugin_methods: Iterable[Tuple[str, str]] = ()):
+        self.types = MappingProxyType(dict(types))
+        self.boxed = MappingProxyType(dict(boxed))
+        self.builtins = MappingProxyType(dict(builtins))
+        self.collection_methods = MappingProxyType({
+            collection: MappingProxyType(dict(methods))
+            for collection, methods in collection_methods.items()
+        })
+        # (receiver type, Python method) -> Java method, for call dispatch
+        self.method_calls = MappingProxyType({
+            (collection, method): java_method
+            for collection, methods in collection_methods.items()
+            for method, java_method in methods.items()
+        })
+        # (receiver type, Python method) pairs mapped by plugin files, which
+        # take precedence over the generator's dedicated translations
+        self.plugin_methods: FrozenSet[Tuple[str, str]] = frozenset(plugin_methods)
+        self.binary_operators = self._operator_table(operators['binary'])
+        self.compare_operators = self._operator_table(operators['compare'])
+        self.unary_operators = self._operator_table(operators['unary'])
+        # Identifies the plugin files merged in, empty for the built-in tables
+        self.fingerprint = fingerprint
+
+    @staticmethod
+    def _operator_table(symbols: Mapping[str, str]) -> Mapping[type, str]:
+        """Keys an operator table by IR node class."""
+        return MappingProxyType({getattr(ir, name): symbol for name, symbol in symbols.items()})
+
+    @classmethod
+    def load(cls, paths: Iterable[str] = ()) -> 'MappingRegistry':
+        """
+        Builds a registry from the built-in tables and TOML plugin files.
+
+        A plugin file may contain any of the tables below; its entries are
+        added to, or replace, the built-in ones, and later files win. The
+        ``import`` of a builtin is added to every class calling it, and a
+        collection method mapped here replaces the generator's own
+        translation of that method::
+
+            [types]
+            Decimal = "BigDecimal"
+
+            [builtins]
+            abs = { java = "Math.abs" }
+            deque = { java = "new ArrayDeque", import = "java.util.ArrayDeque" }
+
+            [collection_methods.list]
+            copy = "clone"
+
+            [operators.binary]
+            FloorDiv = "/"
+
+        Args:
+            paths: TOML files to merge, in order
+
+        Returns:
+            The loaded registry
+
+        Raises:
+            ValueError: If a plugin file is malformed
+            RuntimeError: If plugins are given but no TOML parser is available
+        """
+        types = dict(_TYPES)
+        boxed = dict(_BOXED)
+        builtins = dict(_BUILTINS)
+        collection_methods = {name: dict(methods) for name, methods in _COLLECTION_METHODS.items()}
+        operators = {kind: dict(symbols) for kind, symbols in _OPERATORS.items()}
+        plugin_methods = set()
+        digest = hashlib.sha256()
+
+        for path in paths:
+            if tomllib is None:
+                raise RuntimeError("Mapping plugins require Python 3.11 or the tomli package")
+            with open(path, 'rb') as f:
+                content = f.read()
+            digest.update(content)
+            try:
+                plugin = tomllib.loads(content.decode('utf-8'))
+                types.update(_strings(plugin.get('types', {}), 'types'))
+                boxed.update(_strings(plugin.get('boxed', {}), 'boxed'))
+                for name, entry in plugin.get('builtins', {}).items():
+                    builtins[name] = _builtin(name, entry)
+                for collection, methods in plugin.get('collection_methods', {}).items():
+                    collection_methods.setdefault(collection, {}).update(
+                        _strings(methods, f'collection_methods.{collection}'))
+                    plugin_methods.update((collection, method) for method in methods)
+                for kind, symbols in plugin.get('operators', {}).items():
+                    if kind not in operators:
+                        raise ValueError(f"unknown operator table '{kind}'")
+                    for name, symbol in _strings(symbols, f'operators.{kind}').items():
+                        if not isinstance(getattr(ir, name, None), type) or \
+                                not issubclass(getattr(ir, name), _OPERATOR_BASES[kind]):
+                            raise ValueError(f"'{name}' is not a {kind} operator")
+                        operators[kind][name] = symbol
+            except (ValueError, AttributeError, tomllib.TOMLDecodeError) as e:
+                raise ValueError(f"Invalid mapping plugin {path}: {e}")
+
+        fingerprint = digest.hexdigest() if paths else ''
+        return cls(types, boxed, builtins, collection_methods, operators, fingerprint, plugin_methods)
+
+
+def _strings(table: Any, section: str) -> Dict[str, str]:
+    """Validates a plugin table mapping names to strings."""
+    if not isinstance(table, dict) or not all(isinstance(value, str) for value in table.values()):
+        raise ValueError(f"[{section}] must map names to strings")
+    return table
+
+
+def _builtin(name: str, entry: Any) -> Tuple[str, Optional[str]]:
+    """Converts a plugin builtin entry to a (Java method, import) pair."""
+    if isinstance(entry, str):
+        return entry, None
+    if isinstance(entry, dict) and isinstance(entry.get('java'), str):
+        return entry['java'], entry.get('import')
+    raise ValueError(f"builtin '{name}' needs a 'java' string")
+
+
+_registry: Optional[MappingRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> MappingRegistry:
+    """
+    Returns the process-wide registry, loading it on first use from the
+    built-in tables and the plugin files listed in TRANSLATOR_MAPPINGS.
+
+    Returns:
+        The shared registry
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                paths = [path for path in os.environ.get(MAPPINGS_ENV, '').split(os.pathsep) if path]
+                _registry = MappingRegistry.load(paths)
+    return _registry
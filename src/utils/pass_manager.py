@@ -0,0 +1,67 @@
+from typing import Callable, Dict, Iterator, Optional, Tuple, Type
+
+from src.python_analyzer import ir
+
+NodeHandler = Callable[[ir.Node], None]
+
+
+class PassManager:
+    """
+    Runs the handlers of several analyses over an IR tree in a single traversal.
+
+    Handlers are registered per node type and looked up through a
+    type-keyed table, so every node costs one dictionary lookup no matter
+    how many analyses are attached to the walk. A handler that has found
+    everything it looks for unregisters itself, and the walk ends as soon
+    as no handler is left. Handlers removed during a run stay removed, so
+    every tree needs a fresh manager.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[Type[ir.Node], Tuple[NodeHandler, ...]] = {}
+        self.last_tree: Optional[ir.Node] = None
+
+    def register(self, node_type: Type[ir.Node], handler: NodeHandler) -> None:
+        """
+        Registers a handler to be called for every node of the given type.
+
+        Args:
+            node_type: The exact IR node class to dispatch on
+            handler: Callable receiving the matching node
+        """
+        self._handlers[node_type] = self._handlers.get(node_type, ()) + (handler,)
+
+    def unregister(self, node_type: Type[ir.Node], handler: NodeHandler) -> None:
+        """
+        Stops calling a handler for a node type, also during a running walk.
+
+        Args:
+            node_type: The node class the handler was registered for
+            handler: The registered callable; unknown handlers are ignored
+        """
+        remaining = tuple(registered for registered in self._handlers.get(node_type, ())
+                          if registered != handler)
+        if remaining:
+            self._handlers[node_type] = remaining
+        else:
+            self._handlers.pop(node_type, None)
+
+    def run(self, tree: ir.Node, walk: Callable[[ir.Node], Iterator[ir.Node]] = ir.walk) -> None:
+        """
+        Walks the tree once and dispatches each node to its handlers,
+        stopping early once every handler has unregistered.
+
+        Args:
+            tree: The AST to traverse
+            walk: Traversal yielding the nodes, e.g. ast.walk for handlers
+                registered on the classes of the ast module
+        """
+        handlers = self._handlers
+        for node in walk(tree):
+            if not handlers:
+                break
+            node_handlers = handlers.get(type(node))
+            if node_handlers:
+                for handler in node_handlers:
+                    handler(node)
+        self.last_tree = tree
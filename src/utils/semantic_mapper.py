@@ -1,54 +1,35 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from src.utils.mapping_registry import get_registry
 
 class SemanticMapper:
     """
     Maps Python language constructs to their Java equivalents and
     provides explanations of semantic differences.
+    
+    The mappings are the shared tables of src.utils.mapping_registry,
+    built once per process instead of on every call.
     """
     
     @staticmethod
-    def get_type_mapping() -> Dict[str, str]:
+    def get_type_mapping() -> Mapping[str, str]:
         """
         Returns a mapping of Python types to Java types.
         
         Returns:
-            Dictionary mapping Python type names to Java type names
+            Read-only mapping of Python type names to Java type names
         """
-        return {
-            'int': 'int',
-            'float': 'double',
-            'str': 'String',
-            'bool': 'boolean',
-            'list': 'ArrayList',
-            'dict': 'HashMap',
-            'set': 'HashSet',
-            'tuple': 'List',
-            'None': 'void',
-            'Any': 'Object',
-        }
+        return get_registry().types
     
     @staticmethod
-    def get_builtin_method_mapping() -> Dict[str, Tuple[str, str]]:
+    def get_builtin_method_mapping() -> Mapping[str, Tuple[str, Optional[str]]]:
         """
         Returns a mapping of Python builtin methods to Java equivalents.
         
         Returns:
-            Dictionary mapping Python method names to (Java method, Required import)
+            Read-only mapping of Python method names to (Java method, Required import)
         """
-        return {
-            'len': ('size()', None),
-            'print': ('System.out.println', None),
-            'str': ('String.valueOf', None),
-            'int': ('Integer.parseInt', None),
-            'float': ('Double.parseDouble', None),
-            'list': ('new ArrayList', 'java.util.ArrayList'),
-            'dict': ('new HashMap', 'java.util.HashMap'),
-            'set': ('new HashSet', 'java.util.HashSet'),
-            'sum': ('stream().mapToInt(Integer::intValue).sum()', 'java.util.stream.Collectors'),
-            'max': ('Collections.max', 'java.util.Collections'),
-            'min': ('Collections.min', 'java.util.Collections'),
-            'sorted': ('stream().sorted().collect(Collectors.toList())', 'java.util.stream.Collectors'),
-        }
+        return get_registry().builtins
     
     @staticmethod
     def get_semantic_differences() -> List[Dict[str, str]]:
@@ -97,41 +78,11 @@ class SemanticMapper:
         ]
     
     @staticmethod
-    def get_collection_operations() -> Dict[str, Dict[str, str]]:
+    def get_collection_operations() -> Mapping[str, Mapping[str, str]]:
         """
         Returns mappings for common collection operations between Python and Java.
         
         Returns:
-            Dictionary mapping Python operations to Java equivalents
+            Read-only mapping of collection type to Python operation to Java equivalent
         """
-        return {
-            "list": {
-                "append": "add",
-                "extend": "addAll",
-                "insert": "add",
-                "remove": "remove",
-                "pop": "remove",
-                "clear": "clear",
-                "index": "indexOf",
-                "count": "frequency",  # Requires Collections.frequency
-                "sort": "sort",
-                "reverse": "Collections.reverse",  # Requires Collections
-            },
-            "dict": {
-                "get": "get",
-                "keys": "keySet",
-                "values": "values",
-                "items": "entrySet",
-                "clear": "clear",
-                "pop": "remove",
-                "update": "putAll",
-            },
-            "set": {
-                "add": "add",
-                "remove": "remove",
-                "clear": "clear",
-                "union": "addAll",
-                "intersection": "retainAll",
-                "difference": "removeAll",
-            }
-        } 
\ No newline at end of file
+        return get_registry().collection_methods 
\ No newline at end of file
@@ -0,0 +1,142 @@
+import mmap
+import os
+import tempfile
+from typing import BinaryIO, Optional, Union
+
+# Largest source file accepted by the CLI and the upload endpoint
+MAX_SOURCE_BYTES = int(os.environ.get('TRANSLATOR_MAX_SOURCE_BYTES', 32 * 1024 * 1024))
+
+# Size of the reads spooling a request body to disk
+_CHUNK_SIZE = 64 * 1024
+
+# Python source as text, or UTF-8 bytes in any buffer such as a memory map
+Source = Union[str, bytes, bytearray, mmap.mmap]
+
+
+class SourceTooLarge(ValueError):
+    """Raised when a source file exceeds the configured size limit."""
+
+    def __init__(self, size: int, limit: int):
+        super().__init__(f"Source of {size} bytes exceeds the limit of {limit} bytes")
+        self.size = size
+        self.limit = limit
+
+
+class MappedSource:
+    """
+    Read-only memory map of a Python source file.
+
+    ``buffer`` is handed to PythonAnalyzer.parse() and
+    TranslationCache.make_key() as it is. The hash reads the mapped pages
+    directly. The parser still copies the buffer once into the bytes object
+    the tokenizer reads, but the source is never decoded into a Python
+    string unless text() is called, e.g. for highlighting. The size limit
+    is checked before anything is mapped.
+    """
+
+    def __init__(self, file: BinaryIO, max_bytes: Optional[int] = MAX_SOURCE_BYTES):
+        """
+        Args:
+            file: An open file with a file descriptor; it may be closed
+                once the map is created
+            max_bytes: Size limit, None for no limit
+
+        Raises:
+            SourceTooLarge: If the file is larger than max_bytes
+        """
+        self.size = os.fstat(file.fileno()).st_size
+        if max_bytes is not None and self.size > max_bytes:
+            raise SourceTooLarge(self.size, max_bytes)
+        # Empty files cannot be mapped
+        self.buffer: Union[bytes, mmap.mmap] = (
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        )
+        self._text: Optional[str] = None
+
+    @classmethod
+    def open(cls, path: str, max_bytes: Optional[int] = MAX_SOURCE_BYTES) -> 'MappedSource':
+        """
+        Maps a source file by path.
+
+        Args:
+            path: The Python file
+            max_bytes: Size limit, None for no limit
+
+        Returns:
+            The mapped source, to be closed by the caller
+        """
+        with open(path, 'rb') as f:
+            return cls(f, max_bytes)
+
+    def text(self) -> str:
+        """Returns the source decoded as UTF-8, decoding it once; invalid bytes are replaced."""
+        if self._text is None:
+            self._text = source_text(self.buffer)
+        return self._text
+
+    def close(self) -> None:
+        """Unmaps the file."""
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.buffer = b''
+        self._text = None
+
+    def __enter__(self) -> 'MappedSource':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def source_text(source: Source) -> str:
+    """
+    Returns Python source as a string, decoding buffers as UTF-8.
+
+    Bytes that are not valid UTF-8, e.g. from a file declaring another
+    encoding, become replacement characters, since the text is only
+    displayed.
+
+    Args:
+        source: A string, or bytes in any buffer
+
+    Returns:
+        The source text
+    """
+    if isinstance(source, str):
+        return source
+    return str(source, 'utf-8', 'replace')
+
+
+def spool(stream: BinaryIO, max_bytes: Optional[int] = MAX_SOURCE_BYTES) -> BinaryIO:
+    """
+    Copies a stream, e.g. a request body, to an anonymous temporary file in
+    fixed-size chunks so it can be memory-mapped.
+
+    Args:
+        stream: Readable binary stream
+        max_bytes: Size limit, None for no limit
+
+    Returns:
+        The temporary file, positioned at its start
+
+    Raises:
+        SourceTooLarge: As soon as the stream exceeds max_bytes
+    """
+    spooled = tempfile.TemporaryFile()
+    try:
+        size = 0
+        while True:
+            chunk = stream.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise SourceTooLarge(size, max_bytes)
+            spooled.write(chunk)
+        spooled.flush()
+        spooled.seek(0)
+        return spooled
+    except BaseException:
+        spooled.close()
+        raise
+
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from src.utils.build_info import translator_version
+from src.utils.mapping_registry import get_registry
+from src.utils.source_file import Source
+
+
+class TranslationCache:
+    """
+    Content-addressed cache for translation results.
+
+    Entries are keyed by a hash of the normalized Python source together
+    with the translator version, options and mapping plugins, kept in
+    memory with LRU eviction and optionally mirrored to disk so that warm
+    entries survive worker restarts. The version includes a digest of the
+    analyzer and generator sources, so persisted entries expire with any
+    change to the generated Java.
+    """
+
+    def __init__(self, max_entries: int = 256, persist_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.persist_dir = persist_dir
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+    @staticmethod
+    def normalize_source(python_code: str) -> str:
+        """
+        Normalizes Python source so that equivalent submissions share a key.
+
+        Line endings are unified and surrounding blank lines are dropped,
+        neither of which changes the parsed program or its highlighting.
+
+        Args:
+            python_code: String containing Python source code
+
+        Returns:
+            The normalized source
+        """
+        return python_code.replace('\r\n', '\n').replace('\r', '\n').strip('\n')
+
+    @staticmethod
+    def _normalized_buffer(source: Any) -> Any:
+        """
+        Normalizes UTF-8 source held in a buffer like normalize_source().
+
+        Without carriage returns the result is a view of the buffer, so
+        memory-mapped files are hashed without being copied.
+        """
+        if source.find(b'\r') != -1:
+            return bytes(source).replace(b'\r\n', b'\n').replace(b'\r', b'\n').strip(b'\n')
+        view = memoryview(source)
+        start, end = 0, len(view)
+        while start < end and view[start] == 0x0A:
+            start += 1
+        while end > start and view[end - 1] == 0x0A:
+            end -= 1
+        return view[start:end]
+
+    @classmethod
+    def make_key(cls, python_code: Source, options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Computes the cache key for a submission.
+
+        Args:
+            python_code: String containing Python source code, or its UTF-8
+                bytes in a buffer; both forms of a source share a key
+            options: Translator options that influence the output
+
+        Returns:
+            Hex digest identifying the translation result
+        """
+        digest = hashlib.sha256()
+        digest.update(translator_version().encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(json.dumps(options or {}, sort_keys=True).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(get_registry().fingerprint.encode('utf-8'))
+        digest.update(b'\0')
+        if isinstance(python_code, str):
+            digest.update(cls.normalize_source(python_code).encode('utf-8'))
+        else:
+            normalized = cls._normalized_buffer(python_code)
+            digest.update(normalized)
+            if isinstance(normalized, memoryview):
+                normalized.release()
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a translation result, falling back to the on-disk store.
+
+        Args:
+            key: Cache key returned by make_key
+
+        Returns:
+            A copy of the stored result, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry)
+
+        entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, entry)
+            return dict(entry)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Stores a translation result.
+
+        Args:
+            key: Cache key returned by make_key
+            result: JSON-serializable translation result
+        """
+        entry = dict(result)
+        with self._lock:
+            self._store(key, entry)
+        self._save(key, entry)
+
+    def clear(self) -> None:
+        """Drops all in-memory entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            Dictionary with hit, miss, eviction and size information
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'persistent': bool(self.persist_dir),
+            }
+
+    def _store(self, key: str, entry: Dict[str, Any]) -> None:
+        """Inserts an entry and evicts the least recently used ones. Caller holds the lock."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        """Returns the on-disk location of an entry."""
+        return os.path.join(self.persist_dir, key[:2], f"{key}.json")
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Reads an entry from disk, ignoring missing or corrupt files."""
+        if not self.persist_dir:
+            return None
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, key: str, entry: Dict[str, Any]) -> None:
+        """Writes an entry to disk atomically so concurrent workers never see partial files."""
+        if not self.persist_dir:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Persistence is best effort; the in-memory entry is still valid
+            pass
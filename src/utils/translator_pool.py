@@ -0,0 +1,113 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.java_generator.generator import JavaGenerator
+from src.python_analyzer.analyzer import PythonAnalyzer
+
+# Generators kept per option set: one per request thread of a gunicorn worker
+POOL_SIZE = int(os.environ.get('TRANSLATOR_POOL_SIZE', 4))
+
+OptionsKey = Tuple[Tuple[str, Any], ...]
+
+
+class TranslatorPool:
+    """
+    Translator components shared by the request threads of a worker.
+
+    The analyzer keeps no state between calls and is shared by every
+    thread. A generator holds the state of one translation, so each is
+    lent to a single thread at a time and returned afterwards, ready for
+    the next request with the same options. Up to ``size`` idle generators
+    are kept per option set; a thread finding none idle builds its own
+    instead of waiting, so a burst beyond the pool size never blocks.
+    """
+
+    def __init__(self, size: int = POOL_SIZE):
+        self.size = size
+        self.analyzer = PythonAnalyzer()
+        self._idle: Dict[OptionsKey, List[JavaGenerator]] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def _key(options: Optional[Dict[str, Any]]) -> OptionsKey:
+        """Identifies an option set regardless of its key order."""
+        return tuple(sorted((options or {}).items()))
+
+    def resize(self, size: int) -> None:
+        """
+        Changes how many idle generators are kept per option set.
+
+        Args:
+            size: New pool size; idle generators beyond it are dropped
+        """
+        with self._lock:
+            self.size = size
+            for idle in self._idle.values():
+                del idle[size:]
+
+    def warm(self, option_sets: Iterable[Optional[Dict[str, Any]]] = (None,)) -> None:
+        """
+        Fills the pool ahead of the first requests.
+
+        Args:
+            option_sets: Generator options to build ``size`` idle
+                generators for, the defaults unless given
+        """
+        for options in option_sets:
+            key = self._key(options)
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                missing = self.size - len(idle)
+            generators = [JavaGenerator(**(options or {})) for _ in range(missing)]
+            with self._lock:
+                idle.extend(generators[:max(0, self.size - len(idle))])
+                self.created += len(generators)
+
+    @contextmanager
+    def acquire(self, options: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[PythonAnalyzer, JavaGenerator]]:
+        """
+        Lends an analyzer and a generator to the calling thread.
+
+        Args:
+            options: Generator options, e.g. ``{'optimize_numeric': True}``
+
+        Yields:
+            The shared analyzer and a generator no other thread is using
+        """
+        key = self._key(options)
+        with self._lock:
+            idle = self._idle.get(key)
+            generator = idle.pop() if idle else None
+            if generator is not None:
+                self.reused += 1
+        if generator is None:
+            generator = JavaGenerator(**(options or {}))
+            with self._lock:
+                self.created += 1
+        try:
+            yield self.analyzer, generator
+        finally:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.size:
+                    idle.append(generator)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the pool counters.
+
+        Returns:
+            Dictionary with the pool size, idle generators and how many
+            were created and reused
+        """
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': sum(len(idle) for idle in self._idle.values()),
+                'created': self.created,
+                'reused': self.reused,
+            }
@@ -1,15 +1,98 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Request, Response, request, jsonify, render_template, stream_with_context
 from flask_cors import CORS
-from src.python_analyzer.analyzer import PythonAnalyzer
-from src.java_generator.generator import JavaGenerator
-from pygments import highlight
-from pygments.lexers import PythonLexer, JavaLexer
-from pygments.formatters import HtmlFormatter
+from werkzeug.exceptions import RequestEntityTooLarge
+from src.java_generator.generator import COMPREHENSION_MODES, JavaGenerator
+from src.java_generator.incremental import IncrementalGenerator
+from src.utils.highlighting import LANGUAGES, highlight_async, highlight_code
+from src.utils.mapping_registry import get_registry
+from src.utils.instrumentation import RequestTimings, StageMetrics, profiled
+from src.utils.pass_manager import PassManager
+from src.utils.source_file import MAX_SOURCE_BYTES, MappedSource, Source, SourceTooLarge, source_text, spool
+from src.utils.translation_cache import TranslationCache
+from src.utils.translator_pool import POOL_SIZE, TranslatorPool
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+import json
 import os
+import tempfile
+import threading
+
+class _Request(Request):
+    """Request spooling every uploaded file to disk, where it can be memory-mapped."""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.TemporaryFile('wb+')
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
+app.request_class = _Request
 CORS(app)
 
+# Request bodies over this size are refused before being read
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('TRANSLATE_MAX_REQUEST_BYTES', 2 * MAX_SOURCE_BYTES))
+
+translation_cache = TranslationCache(
+    max_entries=int(os.environ.get('TRANSLATION_CACHE_SIZE', 256)),
+    persist_dir=os.environ.get('TRANSLATION_CACHE_DIR') or None,
+)
+
+stage_metrics = StageMetrics()
+
+# Analyzer and generators shared by the request and batch threads; gunicorn.conf.py
+# resizes it to the threads of a gunicorn worker
+translator_pool = TranslatorPool(POOL_SIZE)
+
+# Profiling is only honoured when a dump directory has been configured
+PROFILE_DIR = os.environ.get('TRANSLATOR_PROFILE_DIR') or None
+
+# Limits of the /translate/batch endpoint
+BATCH_MAX_ITEMS = int(os.environ.get('TRANSLATE_BATCH_MAX_ITEMS', 500))
+BATCH_WORKERS = int(os.environ.get('TRANSLATE_BATCH_WORKERS', 4))
+
+# Pool translating batch items, created on first use so it is never forked
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+# Uploads processed at once and how long further ones wait for a slot
+UPLOAD_SLOTS = int(os.environ.get('TRANSLATE_UPLOAD_SLOTS', 2))
+UPLOAD_WAIT = float(os.environ.get('TRANSLATE_UPLOAD_WAIT', 5))
+_upload_slots = threading.BoundedSemaphore(UPLOAD_SLOTS)
+
+# Room for the multipart framing around an uploaded file
+_MULTIPART_OVERHEAD = 64 * 1024
+
+# Processes generating the units of /translate/units, and the number of
+# units from which a module is worth distributing over them
+UNITS_WORKERS = int(os.environ.get('TRANSLATE_UNITS_WORKERS', min(4, os.cpu_count() or 1)))
+UNITS_PARALLEL_MIN = int(os.environ.get('TRANSLATE_UNITS_PARALLEL_MIN', 16))
+# Top-level classes and functions from which /translate generates a module
+# on the same pool; 0 keeps single-class translations serial
+PARALLEL_MIN = int(os.environ.get('TRANSLATE_PARALLEL_MIN', 64))
+_units_executor = None
+_units_executor_lock = threading.Lock()
+
+# Editor sessions of /translate/incremental kept per worker, least recently used first
+INCREMENTAL_SESSIONS = int(os.environ.get('TRANSLATE_INCREMENTAL_SESSIONS', 64))
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+def _flag(name: str, default: bool = False) -> bool:
+    """Return whether a boolean query-string flag is enabled."""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+def _translation_options() -> dict:
+    """
+    Return the generator options selected by query-string flags;
+    ``?numeric=1`` emits primitive arrays for numeric lists and
+    ``?comprehensions=streams`` translates comprehensions to streams.
+    """
+    comprehensions = request.args.get('comprehensions', 'loops')
+    if comprehensions not in COMPREHENSION_MODES:
+        raise ValueError(f"Unsupported comprehension mode: {comprehensions}")
+    return {'optimize_numeric': _flag('numeric'), 'comprehensions': comprehensions}
+
 @app.route('/')
 def index():
     """Render the main page."""
@@ -19,30 +102,474 @@ def index():
 def translate():
     """
     Translate Python code to Java and return the result with semantic differences.
+    
+    Per-stage timings are always reported in the Server-Timing header and
+    are added to the JSON body with ``?timings=1``. When
+    TRANSLATOR_PROFILE_DIR is set, an ``X-Profile: 1`` request header
+    dumps a cProfile of the request into that directory. ``?highlight=0``
+    skips the Pygments highlighting of the input and output, and
+    ``?numeric=1`` enables the primitive-array mode for numeric code.
+    """
+    timings = RequestTimings()
+    profile_path = None
+    try:
+        data = request.get_json()
+        python_code = data.get('python_code', '')
+        with_highlight = _flag('highlight', default=True)
+        options = _translation_options()
+
+        if PROFILE_DIR and request.headers.get('X-Profile') == '1':
+            with profiled(PROFILE_DIR) as written:
+                result = _translate(python_code, timings, with_highlight, options=options)
+            profile_path = written[0]
+        else:
+            result = _translate(python_code, timings, with_highlight, options=options)
+        body = {'status': 'success', **result}
+
+    except Exception as e:
+        body = {
+            'status': 'error',
+            'message': str(e)
+        }
+
+    stage_metrics.record(timings)
+    if _flag('timings'):
+        body['timings'] = timings.as_dict()
+    response = jsonify(body)
+    if body['status'] != 'success':
+        response.status_code = 400
+    response.headers['Server-Timing'] = timings.server_timing()
+    if profile_path:
+        response.headers['X-Profile-File'] = os.path.basename(profile_path)
+    return response
+
+def _translate(python_code: Source, timings: RequestTimings, with_highlight: bool = True,
+               options: dict = None):
+    """
+    Run the translation pipeline, recording each stage.
+    
+    The input is highlighted on the highlight thread pool while the
+    translation runs; cached results missing the highlighted variants are
+    completed on demand. The analyzer and generator are borrowed from the
+    translator pool for the translation only. Modules with at least
+    TRANSLATE_PARALLEL_MIN top-level classes and functions are generated
+    on the unit generation process pool.
+    
+    Args:
+        python_code: The source, as a string or a buffer such as a
+            memory-mapped upload, which is only decoded for highlighting
+        options: Generator options, part of the cache key
+    
+    Returns:
+        The translation result without the response status
+    """
+    # Serve repeat submissions straight from the cache
+    with timings.stage('cache'):
+        cache_key = TranslationCache.make_key(python_code, options)
+        cached = translation_cache.get(cache_key)
+    if cached is not None:
+        if not with_highlight:
+            cached.pop('highlighted_python', None)
+            cached.pop('highlighted_java', None)
+        elif 'highlighted_python' not in cached:
+            with timings.stage('highlight'):
+                cached['highlighted_python'] = highlight_code(source_text(python_code), 'python')
+                cached['highlighted_java'] = highlight_code(cached['java_code'], 'java')
+            translation_cache.put(cache_key, cached)
+        return cached
+
+    highlighted_python = highlight_async(source_text(python_code), 'python') if with_highlight else None
+
+    # Analyze and translate; import discovery shares the analyzer's traversal
+    with translator_pool.acquire(options) as (analyzer, generator):
+        with timings.stage('parse'):
+            ast = analyzer.parse(python_code)
+        with timings.stage('analyze'):
+            passes = PassManager()
+            generator.register_passes(passes)
+            differences = analyzer.analyze_tree(ast, passes)
+        with timings.stage('generate'):
+            if _generate_in_parallel(ast):
+                from src.java_generator.units import generate_parallel
+                java_code = generate_parallel(ast, options=options, executor=_get_units_executor(),
+                                              workers=UNITS_WORKERS)
+            else:
+                java_code = generator.generate(ast)
+
+    result = {
+        'java_code': java_code,
+        'semantic_differences': differences
+    }
+
+    # Highlight the code for better presentation
+    if with_highlight:
+        with timings.stage('highlight'):
+            result['highlighted_java'] = highlight_code(java_code, 'java')
+            result['highlighted_python'] = highlighted_python.result()
+
+    translation_cache.put(cache_key, result)
+    return result
+
+@app.route('/translate/batch', methods=['POST'])
+def translate_batch():
+    """
+    Translate many Python snippets in one request.
+    
+    The body is ``{"sources": ["...", ...]}``. Identical sources are
+    translated once, the distinct ones are spread over a bounded thread
+    pool borrowing generators from the translator pool, and the results
+    are returned in input order. A failing snippet yields an error entry
+    without affecting the others. Highlighting is off unless
+    ``?highlight=1`` is passed.
+    """
+    try:
+        data = request.get_json()
+        sources = data.get('sources')
+        if not isinstance(sources, list) or not all(isinstance(source, str) for source in sources):
+            raise ValueError("'sources' must be a list of strings")
+        if len(sources) > BATCH_MAX_ITEMS:
+            raise ValueError(f"Batch exceeds the limit of {BATCH_MAX_ITEMS} sources")
+        with_highlight = _flag('highlight', default=False)
+        options = _translation_options()
+
+        # De-duplicate identical inputs within the batch
+        keys = [TranslationCache.make_key(source, options) for source in sources]
+        unique = {}
+        for key, source in zip(keys, sources):
+            unique.setdefault(key, source)
+
+        executor = _get_batch_executor()
+        results = executor.map(_translate_batch_item, unique.values(),
+                               [with_highlight] * len(unique), [options] * len(unique))
+        translated = dict(zip(unique, results))
+
+        return jsonify({
+            'status': 'success',
+            'results': [translated[key] for key in keys]
+        })
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+def _get_batch_executor() -> ThreadPoolExecutor:
+    """Return the batch thread pool, creating it on first use."""
+    global _batch_executor
+    if _batch_executor is None:
+        with _batch_executor_lock:
+            if _batch_executor is None:
+                _batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS,
+                                                     thread_name_prefix='batch')
+    return _batch_executor
+
+def _generate_in_parallel(tree) -> bool:
+    """Return whether a module is large enough to generate on the process pool."""
+    if UNITS_WORKERS <= 1 or not PARALLEL_MIN or len(tree.body) < PARALLEL_MIN:
+        return False
+    from src.java_generator.units import definitions
+    return len(definitions(tree)) >= PARALLEL_MIN
+
+def _get_units_executor() -> Executor:
+    """Return the unit generation process pool, creating it on first use."""
+    global _units_executor
+    if _units_executor is None:
+        with _units_executor_lock:
+            if _units_executor is None:
+                # multiprocessing is only imported by workers that need the pool
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+                # Spawned rather than forked from this multithreaded process
+                _units_executor = ProcessPoolExecutor(max_workers=UNITS_WORKERS,
+                                                      mp_context=multiprocessing.get_context('spawn'))
+    return _units_executor
+
+def _translate_batch_item(python_code: str, with_highlight: bool, options: dict) -> dict:
+    """Translate one batch item on a pool thread, isolating its errors."""
+    timings = RequestTimings()
+    try:
+        result = _translate(python_code, timings, with_highlight, options=options)
+        return {'status': 'success', **result}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+    finally:
+        stage_metrics.record(timings)
+
+@app.route('/translate/upload', methods=['POST'])
+def translate_upload():
+    """
+    Translate a Python file sent as multipart form data (field ``file``)
+    or as the raw request body.
+    
+    The upload is spooled to a temporary file in chunks and memory-mapped,
+    so the source is parsed and hashed without being held as a Python
+    string. Files over TRANSLATOR_MAX_SOURCE_BYTES are refused with 413,
+    before the body is read whenever its length is declared. At most
+    TRANSLATE_UPLOAD_SLOTS uploads are processed at once; further ones
+    wait TRANSLATE_UPLOAD_WAIT seconds for a slot, then get 503.
+    Highlighting is off unless ``?highlight=1`` is passed.
+    """
+    if request.content_length is not None and request.content_length > MAX_SOURCE_BYTES + _MULTIPART_OVERHEAD:
+        return jsonify({
+            'status': 'error',
+            'message': str(SourceTooLarge(request.content_length, MAX_SOURCE_BYTES))
+        }), 413
+    if not _upload_slots.acquire(timeout=UPLOAD_WAIT):
+        response = jsonify({
+            'status': 'error',
+            'message': 'Too many uploads in progress, retry later'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '1'
+        return response
+    
+    timings = RequestTimings()
+    status = 200
+    try:
+        options = _translation_options()
+        with_highlight = _flag('highlight', default=False)
+        with timings.stage('upload'):
+            if request.mimetype == 'multipart/form-data':
+                upload = request.files.get('file')
+                if upload is None:
+                    raise ValueError("Missing 'file' field")
+                spooled = upload.stream
+            else:
+                spooled = spool(request.stream, MAX_SOURCE_BYTES)
+        with spooled, MappedSource(spooled, MAX_SOURCE_BYTES) as source:
+            result = _translate(source.buffer, timings, with_highlight, options=options)
+        body = {'status': 'success', **result}
+    
+    except (SourceTooLarge, RequestEntityTooLarge) as e:
+        status = 413
+        body = {'status': 'error', 'message': str(e)}
+    except Exception as e:
+        status = 400
+        body = {'status': 'error', 'message': str(e)}
+    finally:
+        _upload_slots.release()
+    
+    stage_metrics.record(timings)
+    response = jsonify(body)
+    response.status_code = status
+    response.headers['Server-Timing'] = timings.server_timing()
+    return response
+
+@app.route('/translate/units', methods=['POST'])
+def translate_units():
+    """
+    Translate Python code to one Java file per class plus a module
+    functions class, instead of a single class nesting everything.
+    
+    The body is ``{"python_code": "...", "class_name": "..."}``, the class
+    name defaulting to PythonTranslated. The response lists the files as
+    ``{"files": [{"name": "Foo.java", "java_code": "..."}, ...]}`` with the
+    semantic differences, or is a zip archive with ``?format=zip``.
+    Modules with at least TRANSLATE_UNITS_PARALLEL_MIN units are generated
+    on a pool of TRANSLATE_UNITS_WORKERS processes.
+    """
+    from src.java_generator.units import generate_units, partition, zip_units
+    
+    timings = RequestTimings()
+    try:
+        data = request.get_json()
+        python_code = data.get('python_code', '')
+        class_name = data.get('class_name') or 'PythonTranslated'
+        if not isinstance(class_name, str) or not class_name.isidentifier():
+            raise ValueError("'class_name' must be a Java identifier")
+        options = _translation_options()
+        
+        with timings.stage('cache'):
+            cache_key = TranslationCache.make_key(python_code, dict(options, units=class_name))
+            result = translation_cache.get(cache_key)
+        if result is None:
+            analyzer = translator_pool.analyzer
+            with timings.stage('parse'):
+                tree = analyzer.parse(python_code)
+            with timings.stage('analyze'):
+                differences = analyzer.analyze_tree(tree)
+            with timings.stage('generate'):
+                executor = None
+                if UNITS_WORKERS > 1 and len(partition(tree, class_name)) >= UNITS_PARALLEL_MIN:
+                    executor = _get_units_executor()
+                units = generate_units(tree, class_name, options, executor, UNITS_WORKERS)
+            result = {
+                'files': [{'name': name, 'java_code': code} for name, code in units],
+                'semantic_differences': differences
+            }
+            translation_cache.put(cache_key, result)
+    
+    except Exception as e:
+        stage_metrics.record(timings)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    stage_metrics.record(timings)
+    if request.args.get('format') == 'zip':
+        archive = zip_units([(unit['name'], unit['java_code']) for unit in result['files']])
+        response = Response(archive, mimetype='application/zip')
+        response.headers['Content-Disposition'] = f'attachment; filename="{class_name}.zip"'
+    else:
+        response = jsonify({'status': 'success', **result})
+    response.headers['Server-Timing'] = timings.server_timing()
+    return response
+
+@app.route('/translate/stream', methods=['POST'])
+def translate_stream():
+    """
+    Translate Python code to Java, streaming the output as it is generated.
+    
+    The response is newline-delimited JSON, or Server-Sent Events when the
+    client accepts ``text/event-stream`` or passes ``?format=sse``. It
+    carries one ``java`` event per generated chunk (the class header, each
+    top-level definition and the closing brace), then a
+    ``semantic_differences`` event and a final ``done`` event.
     """
+    timings = RequestTimings()
     try:
         data = request.get_json()
         python_code = data.get('python_code', '')
+        options = _translation_options()
+
+        with timings.stage('cache'):
+            cache_key = TranslationCache.make_key(python_code, options)
+            cached = translation_cache.get(cache_key)
+
+        if cached is not None:
+            differences = cached['semantic_differences']
+        else:
+            # Parse and analyze up front so invalid input still gets a 400;
+            # a generator is only borrowed while the response streams
+            analyzer = translator_pool.analyzer
+            with timings.stage('parse'):
+                tree = analyzer.parse(python_code)
+            with timings.stage('analyze'):
+                differences = analyzer.analyze_tree(tree)
+
+    except Exception as e:
+        stage_metrics.record(timings)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    use_sse = (request.args.get('format') == 'sse' or
+               request.accept_mimetypes.best == 'text/event-stream')
+
+    def encode(event: dict) -> str:
+        payload = json.dumps(event)
+        return f"event: {event['type']}\ndata: {payload}\n\n" if use_sse else payload + "\n"
+
+    def events():
+        try:
+            if cached is not None:
+                yield encode({'type': 'java', 'chunk': cached['java_code']})
+            else:
+                chunks = []
+                with timings.stage('generate'), translator_pool.acquire(options) as (_, generator):
+                    for chunk in generator.generate_iter(tree):
+                        chunks.append(chunk)
+                        yield encode({'type': 'java', 'chunk': chunk})
+                translation_cache.put(cache_key, {
+                    'java_code': "".join(chunks),
+                    'semantic_differences': differences
+                })
+            yield encode({'type': 'semantic_differences', 'semantic_differences': differences})
+            yield encode({'type': 'done'})
+        except Exception as e:
+            yield encode({'type': 'error', 'message': str(e)})
+        finally:
+            stage_metrics.record(timings)
 
-        # Initialize components
-        analyzer = PythonAnalyzer()
-        generator = JavaGenerator()
+    response = Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream' if use_sse else 'application/x-ndjson'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
-        # Analyze and translate
-        ast = analyzer.analyze(python_code)
-        java_code = generator.generate(ast)
-        differences = analyzer.get_semantic_differences()
+def _incremental_session(session_id: str, options: dict):
+    """Return the incremental generator of a session and its lock, creating them on first use."""
+    key = (session_id, tuple(sorted(options.items())))
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = (IncrementalGenerator(JavaGenerator(**options)), threading.Lock())
+            while len(_sessions) > INCREMENTAL_SESSIONS:
+                _sessions.popitem(last=False)
+        else:
+            _sessions.move_to_end(key)
+    return session
 
-        # Highlight the code for better presentation
-        highlighted_python = highlight(python_code, PythonLexer(), HtmlFormatter())
-        highlighted_java = highlight(java_code, JavaLexer(), HtmlFormatter())
+@app.route('/translate/incremental', methods=['POST'])
+def translate_incremental():
+    """
+    Re-translate a module being edited, regenerating only the top-level
+    definitions that changed since the session's previous request.
+    
+    The body is ``{"session": "...", "python_code": "..."}``, the session
+    being any identifier the editor picks per open file. The response
+    holds the Java code and semantic differences, plus how many top-level
+    statements were ``reused`` and ``regenerated``. Sessions live in the
+    worker's memory: an evicted session, or a request reaching another
+    worker, regenerates the whole module with the same result.
+    """
+    timings = RequestTimings()
+    try:
+        data = request.get_json()
+        session_id = data.get('session')
+        python_code = data.get('python_code', '')
+        if not isinstance(session_id, str) or not 0 < len(session_id) <= 128:
+            raise ValueError("'session' must be a string of 1 to 128 characters")
+        options = _translation_options()
+        
+        analyzer = translator_pool.analyzer
+        with timings.stage('parse'):
+            tree = analyzer.parse(python_code)
+        with timings.stage('analyze'):
+            differences = analyzer.analyze_tree(tree)
+        generator, lock = _incremental_session(session_id, options)
+        with lock, timings.stage('generate'):
+            java_code = generator.generate(tree)
+            reused, regenerated = generator.reused, generator.regenerated
+    
+    except Exception as e:
+        stage_metrics.record(timings)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    stage_metrics.record(timings)
+    response = jsonify({
+        'status': 'success',
+        'java_code': java_code,
+        'semantic_differences': differences,
+        'reused': reused,
+        'regenerated': regenerated
+    })
+    response.headers['Server-Timing'] = timings.server_timing()
+    return response
 
+@app.route('/highlight', methods=['POST'])
+def highlight():
+    """
+    Highlight Python or Java code on demand, for clients that translate
+    with ``?highlight=0`` and only need markup for some results.
+    """
+    try:
+        data = request.get_json()
+        code = data.get('code', '')
+        language = data.get('language', 'java')
+        if language not in LANGUAGES:
+            raise ValueError(f"Unsupported language: {language}")
         return jsonify({
             'status': 'success',
-            'java_code': java_code,
-            'highlighted_python': highlighted_python,
-            'highlighted_java': highlighted_java,
-            'semantic_differences': differences
+            'highlighted': highlight_code(code, language)
         })
 
     except Exception as e:
@@ -51,6 +578,107 @@ def translate():
             'message': str(e)
         }), 400
 
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Return the translation cache hit/miss counters."""
+    return jsonify(translation_cache.stats())
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Expose per-stage latency and memory block delta histograms in Prometheus text format."""
+    cache = translation_cache.stats()
+    pool = translator_pool.stats()
+    document = stage_metrics.render({
+        'translator_cache_hits_total': ('Translation cache hits.', cache['hits']),
+        'translator_cache_misses_total': ('Translation cache misses.', cache['misses']),
+        'translator_cache_evictions_total': ('Translation cache evictions.', cache['evictions']),
+        'translator_pool_created_total': ('Generators built by the translator pool.', pool['created']),
+        'translator_pool_reused_total': ('Generators lent again by the translator pool.', pool['reused']),
+    })
+    return Response(document, mimetype='text/plain; version=0.0.4')
+
+# Sample touching the common analysis, generation and highlighting paths
+_WARMUP_SOURCE = '''
+from typing import Dict, List
+
+LIMIT = 10
+
+def summarize(values: List[float], names: List[str]) -> str:
+    counts: Dict[str, int] = {}
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
+    total = sum(values)
+    squares = [v * v for v in values if v > 0]
+    text = ""
+    for i in range(len(names)):
+        text += names[i] + ", "
+    if total > LIMIT and any(v < 0 for v in values):
+        print(f"{total} over {LIMIT}")
+    return text + ", ".join(sorted(counts)) + str(len(squares))
+
+class Account:
+    def __init__(self, owner: str, balance: float = 0.0):
+        self.owner = owner
+        self.balance = balance
+
+    def deposit(self, amount: float) -> None:
+        try:
+            self.balance += amount
+        except ValueError as e:
+            raise RuntimeError("rejected") from e
+
+    def __str__(self) -> str:
+        return self.owner.upper()
+'''
+
+def warm_up() -> RequestTimings:
+    """
+    Build everything the first request would otherwise pay for: the
+    mapping registry, the compiled Pygments lexers, the translation code
+    paths of every optimization mode and the index template.
+
+    The translator pool is filled for every optimization mode. Everything
+    runs in the calling thread and no thread pool, cache entry or metric
+    is created, so the warm state can be inherited by forked workers.
+    gunicorn.conf.py calls this in the master process when ``preload_app``
+    is on, and in each worker before it serves otherwise.
+
+    Returns:
+        The time spent in each warm-up step
+    """
+    timings = RequestTimings()
+    with timings.stage('mappings'):
+        get_registry()
+    with timings.stage('translate'):
+        java_code = ''
+        option_sets = [{'optimize_numeric': numeric, 'comprehensions': comprehensions}
+                       for numeric in (False, True) for comprehensions in COMPREHENSION_MODES]
+        translator_pool.warm(option_sets)
+        for options in option_sets:
+            TranslationCache.make_key(_WARMUP_SOURCE, options)
+            with translator_pool.acquire(options) as (analyzer, generator):
+                tree = analyzer.parse(_WARMUP_SOURCE)
+                passes = PassManager()
+                generator.register_passes(passes)
+                analyzer.analyze_tree(tree, passes)
+                java_code = generator.generate(tree)
+    with timings.stage('highlight'):
+        highlight_code(_WARMUP_SOURCE, 'python')
+        highlight_code(java_code, 'java')
+    with timings.stage('render'):
+        with app.test_request_context('/'):
+            index()
+            jsonify({'status': 'success'})
+    return timings
+
+def warm_worker() -> None:
+    """
+    Start the highlight thread pool of a freshly forked worker and build
+    the lexers of its thread. Pools cannot be inherited across fork, so
+    this runs in the worker, after warm_up() and before it serves.
+    """
+    highlight_async(_WARMUP_SOURCE, 'python').result()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port) 
\ No newline at end of file